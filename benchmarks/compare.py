@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files
+Description: Flattens every numeric result, prints old/new/ratio, and exits
+             with status 1 when a timing or memory figure regresses by more
+             than the threshold (throughput figures regress when they drop).
+
+Usage:
+    python compare.py results/<old>.json results/<new>.json [--threshold 1.10]
+"""
+
+import argparse
+import json
+import sys
+
+# Only these leaves are compared; counts and settings are context, not results
+LOWER_IS_BETTER = ('_ms', '_seconds', '_mb')
+HIGHER_IS_BETTER = ('rows_per_second',)
+SKIP = ('environment', 'settings', 'rss_before_mb')
+
+
+def flatten(node, prefix=''):
+    """{'a.b.c': number} for numeric leaves; list items are keyed by their scale"""
+    if isinstance(node, dict):
+        items = node.items()
+    elif isinstance(node, list):
+        items = ((f"{item.get('scale', i)}x" if isinstance(item, dict) else str(i), item)
+                 for i, item in enumerate(node))
+    else:
+        if isinstance(node, (int, float)) and not isinstance(node, bool):
+            yield prefix, float(node)
+        return
+    for key, value in items:
+        if key in SKIP:
+            continue
+        yield from flatten(value, f"{prefix}.{key}" if prefix else str(key))
+
+
+def direction(key):
+    leaf = key.rsplit('.', 1)[-1]
+    if any(leaf.endswith(s) for s in HIGHER_IS_BETTER) or '.full_table_rows_per_second.' in f'.{key}.':
+        return -1
+    if any(leaf.endswith(s) for s in LOWER_IS_BETTER):
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two benchmark JSON files')
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=1.10,
+                        help='ratio beyond which a change counts as a regression')
+    parser.add_argument('--all', action='store_true', help='also print unchanged metrics')
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = dict(flatten(json.load(f)))
+    with open(args.new) as f:
+        new = dict(flatten(json.load(f)))
+
+    regressions = []
+    width = max((len(k) for k in old if k in new), default=10)
+    print(f"{'metric':<{width}} {'old':>12} {'new':>12} {'ratio':>8}")
+    for key in sorted(old.keys() & new.keys()):
+        sign = direction(key)
+        if sign == 0 or old[key] == 0:
+            continue
+        ratio = new[key] / old[key]
+        worse = ratio > args.threshold if sign > 0 else ratio < 1 / args.threshold
+        better = ratio < 1 / args.threshold if sign > 0 else ratio > args.threshold
+        if worse:
+            regressions.append(key)
+        if worse or better or args.all:
+            mark = ' REGRESSION' if worse else (' improved' if better else '')
+            print(f"{key:<{width}} {old[key]:>12.4g} {new[key]:>12.4g} {ratio:>8.2f}{mark}")
+
+    print(f"\n{len(regressions)} regression(s) beyond x{args.threshold:.2f}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
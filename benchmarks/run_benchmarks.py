@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite
+Description: Measures training, inference and dashboard startup on synthetic
+             datasets scaled from dataset_preprocessed.csv and writes the
+             results as JSON so runs can be compared across commits
+             (see compare.py).
+
+Suites:
+    fit        RandomForestAnalyzer load + train_model time and peak memory,
+               one fresh process per scale
+    inference  single-row and batch latency percentiles: sklearn predict_proba,
+               FlatForest, and the manual hitung_skor_kesejahteraan formula
+    startup    fresh-interpreter import time of streamlit, src and each view,
+               plus the first script run of app.py
+
+Usage:
+    python run_benchmarks.py [--scales 1 100 10000] [--suites fit inference startup]
+                             [--output results/<commit>.json]
+"""
+
+import argparse
+import contextlib
+import copy
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+if BENCH_DIR not in sys.path:
+    sys.path.insert(0, BENCH_DIR)
+from synthetic import APP_DIR, ROOT_DIR, synthetic_path, load_synthetic
+
+MODELLING_DIR = os.path.join(ROOT_DIR, 'modelling')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+DEFAULT_SCALES = [1, 100, 10000]
+SUITES = ('fit', 'inference', 'startup')
+VIEWS = ['views.home', 'views.prediction', 'views.dataset', 'views.evaluation', 'views.drift', 'views.about']
+# Manual formula needs jumlah_penduduk, which the model features do not include;
+# the synthetic rows use a fixed poor-population share instead
+POPULATION_PER_POOR = 12.0
+
+
+def summarize(seconds):
+    """Latency percentiles in milliseconds"""
+    ms = np.asarray(seconds, dtype=np.float64) * 1e3
+    return {
+        'n': int(ms.size),
+        'mean_ms': float(ms.mean()),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p90_ms': float(np.percentile(ms, 90)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'max_ms': float(ms.max()),
+    }
+
+
+def _time_calls(fn, n):
+    times = np.empty(n)
+    for i in range(n):
+        start = time.perf_counter()
+        fn()
+        times[i] = time.perf_counter() - start
+    return times
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import pandas as pd
+    import sklearn
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+# ---------------------------------------------------------------- fit
+
+def _fit_once(scale, seed, chunk_rows=None):
+    """Runs in a fresh (spawned) process so peak RSS belongs to this scale only"""
+    import resource
+    import tracemalloc
+    if MODELLING_DIR not in sys.path:
+        sys.path.insert(0, MODELLING_DIR)
+    from train_rf_model import RandomForestAnalyzer
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = RandomForestAnalyzer(synthetic_path(scale, seed), os.path.join(tmp, 'model.pkl'),
+                                        os.path.join(tmp, 'metrics.json'), tmp)
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            if chunk_rows:
+                X_train, X_test, y_train, y_test, _ = analyzer.load_and_prepare_data_chunked(chunk_rows)
+            else:
+                X_train, X_test, y_train, y_test, _ = analyzer.load_and_prepare_data()
+            loaded = time.perf_counter()
+            analyzer.train_model(X_train, y_train, prescaled=bool(chunk_rows))
+            trained = time.perf_counter()
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+
+    return {
+        'scale': scale,
+        'chunk_rows': chunk_rows,
+        'rows': len(X_train) + len(X_test),
+        'load_seconds': loaded - start,
+        'train_seconds': trained - loaded,
+        'nodes': int(sum(t.tree_.node_count for t in analyzer.model.estimators_)),
+        'peak_rss_mb': rss_peak / 1024,
+        'rss_before_mb': rss_before / 1024,
+        'peak_traced_mb': traced_peak / 2**20,
+    }
+
+
+def bench_fit(scales, seed, chunk_rows=None):
+    results = []
+    for scale in scales:
+        synthetic_path(scale, seed)  # build the cache outside the measured process
+        with ProcessPoolExecutor(1, mp_context=get_context('spawn')) as pool:
+            result = pool.submit(_fit_once, scale, seed, chunk_rows).result()
+        print(f"  fit {scale}x: {result['rows']} rows, load {result['load_seconds']:.2f}s, "
+              f"train {result['train_seconds']:.2f}s, peak RSS {result['peak_rss_mb']:.0f} MB")
+        results.append(result)
+    return results
+
+
+# ---------------------------------------------------------------- inference
+
+def _load_models():
+    if APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR)
+    import joblib
+    from src.artifacts import load_artifact
+    from src.config import ARTIFACT_DIR, MODEL_PATH
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # pickles from older sklearn versions
+        pickled = joblib.load(MODEL_PATH)
+    artifact = load_artifact(ARTIFACT_DIR, MODEL_PATH)
+    return pickled, artifact.forest
+
+
+def bench_inference(scales, seed, single_iters, batch_size, batch_iters):
+    from src.logic import hitung_skor_kesejahteraan, hitung_skor_kesejahteraan_batch
+
+    pickled, forest = _load_models()
+    model, features = pickled['model'], pickled['features']
+    # Drop fitted feature names so transform() on arrays does not warn on every
+    # call; the warning machinery would otherwise dominate single-row latency
+    scaler = copy.copy(pickled['scaler'])
+    if hasattr(scaler, 'feature_names_in_'):
+        del scaler.feature_names_in_
+    results = {'model_n_jobs': model.n_jobs, 'scales': []}
+
+    for scale in scales:
+        df = load_synthetic(scale, seed)
+        X = np.ascontiguousarray(df[features].to_numpy(dtype=np.float64))
+        P = X[:, 0] * POPULATION_PER_POOR
+        M, U, Y, S = (X[:, i] for i in range(4))
+        rng = np.random.default_rng(seed)
+        rows = rng.integers(0, len(X), single_iters)
+        batches = [slice(s, s + batch_size)
+                   for s in rng.integers(0, max(len(X) - batch_size, 0) + 1, batch_iters)]
+
+        def single(fn):
+            it = iter(rows)
+            return summarize(_time_calls(lambda: fn(next(it)), single_iters))
+
+        def batch(fn):
+            it = iter(batches)
+            return summarize(_time_calls(lambda: fn(next(it)), batch_iters))
+
+        entry = {
+            'scale': scale,
+            'rows': len(X),
+            'single_row': {
+                'sklearn_predict_proba': single(lambda i: model.predict_proba(scaler.transform(X[i:i + 1]))),
+                'flat_forest_predict_proba': single(lambda i: forest.predict_proba(X[i:i + 1])),
+                'manual_formula': single(lambda i: hitung_skor_kesejahteraan(P[i], M[i], U[i], Y[i], S[i])),
+            },
+            'batch': {
+                'batch_size': batch_size,
+                'sklearn_predict_proba': batch(lambda s: model.predict_proba(scaler.transform(X[s]))),
+                'flat_forest_predict_proba': batch(lambda s: forest.predict_proba(X[s])),
+                'manual_formula_batch': batch(lambda s: hitung_skor_kesejahteraan_batch(P[s], M[s], U[s], Y[s], S[s])),
+            },
+        }
+
+        # Whole-table throughput in one pass per engine
+        throughput = {}
+        for name, fn in (
+            ('sklearn_predict_proba', lambda: model.predict_proba(scaler.transform(X))),
+            ('flat_forest_predict_proba', lambda: forest.predict_proba(X)),
+            ('manual_formula_batch', lambda: hitung_skor_kesejahteraan_batch(P, M, U, Y, S)),
+        ):
+            start = time.perf_counter()
+            fn()
+            throughput[name] = len(X) / (time.perf_counter() - start)
+        entry['full_table_rows_per_second'] = throughput
+
+        single_p50 = entry['single_row']
+        print(f"  inference {scale}x: single-row p50 sklearn "
+              f"{single_p50['sklearn_predict_proba']['p50_ms']:.3f} ms, flat "
+              f"{single_p50['flat_forest_predict_proba']['p50_ms']:.3f} ms, manual "
+              f"{single_p50['manual_formula']['p50_ms']:.4f} ms")
+        results['scales'].append(entry)
+    return results
+
+
+# ---------------------------------------------------------------- startup
+
+_IMPORT_PROBE = (
+    "import sys, time; sys.path.insert(0, '.'); start = time.perf_counter(); "
+    "import {module}; print(time.perf_counter() - start)"
+)
+
+_APP_PROBE = (
+    "import sys, time, warnings; warnings.filterwarnings('ignore'); sys.path.insert(0, '.'); "
+    "from streamlit.testing.v1 import AppTest; at = AppTest.from_file('app.py', default_timeout=120); "
+    "start = time.perf_counter(); at.run(); elapsed = time.perf_counter() - start; "
+    "print(elapsed if not at.exception else -1)"
+)
+
+
+def _probe(code):
+    """(seconds reported by the probe, wall seconds including interpreter start)"""
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code], cwd=APP_DIR, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr else 'probe failed')
+    return float(out.stdout.strip().splitlines()[-1]), wall
+
+
+def bench_startup(repeat):
+    results = {}
+    for module in ['streamlit', 'src.loader', 'src.registry'] + VIEWS:
+        probes = [_probe(_IMPORT_PROBE.format(module=module)) for _ in range(repeat)]
+        results[f'import {module}'] = {
+            'import': summarize([p[0] for p in probes]),
+            'process_wall': summarize([p[1] for p in probes]),
+        }
+        print(f"  import {module}: p50 {results[f'import {module}']['import']['p50_ms']:.1f} ms")
+
+    runs = [_probe(_APP_PROBE) for _ in range(repeat)]
+    if any(r[0] < 0 for r in runs):
+        raise RuntimeError('app.py raised during the first script run')
+    results['app.py first run'] = {
+        'script_run': summarize([r[0] for r in runs]),
+        'process_wall': summarize([r[1] for r in runs]),
+    }
+    print(f"  app.py first run: p50 {results['app.py first run']['script_run']['p50_ms']:.1f} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the training / inference / startup benchmarks')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help='dataset sizes as multiples of dataset_preprocessed.csv')
+    parser.add_argument('--fit-scales', type=int, nargs='+', default=None,
+                        help='scales for the fit suite (default: --scales)')
+    parser.add_argument('--chunk-rows', type=int, default=None,
+                        help='fit suite: use the out-of-core loader with blocks of this many rows')
+    parser.add_argument('--suites', nargs='+', choices=SUITES, default=list(SUITES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--single-iters', type=int, default=200, help='single-row calls per engine')
+    parser.add_argument('--batch-size', type=int, default=1024)
+    parser.add_argument('--batch-iters', type=int, default=30, help='batch calls per engine')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh processes per startup probe')
+    parser.add_argument('--output', default=None, help='default: results/<commit>.json')
+    args = parser.parse_args()
+
+    meta = environment()
+    results = {'environment': meta, 'settings': vars(args).copy()}
+    if 'fit' in args.suites:
+        print("Fit:")
+        results['fit'] = bench_fit(args.fit_scales or args.scales, args.seed, args.chunk_rows)
+    if 'inference' in args.suites:
+        print("Inference:")
+        results['inference'] = bench_inference(args.scales, args.seed, args.single_iters,
+                                               args.batch_size, args.batch_iters)
+    if 'startup' in args.suites:
+        print("Startup:")
+        results['startup'] = bench_startup(args.repeat)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{(meta['commit'] or 'local')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f"✓ Results saved to: {os.path.abspath(output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Reproducible synthetic datasets scaled from dataset_preprocessed.csv.
+
+Scale 1 is the original table. Larger scales repeat every row `scale` times
+(so labels and class balance are unchanged) and jitter the count/PDRB
+features with a small multiplicative log-normal noise so trees see new split
+points rather than exact duplicates. The result is cached as a columnar table under
+benchmarks/.cache, keyed by scale, seed and the source file hash.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+APP_DIR = os.path.join(ROOT_DIR, 'streamlit')
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+from src.artifacts import sha256_file
+from src.columnar import read_columnar, read_metadata, write_columnar
+
+SOURCE_PATH = os.path.join(ROOT_DIR, 'preprocessing', 'dataset_preprocessed.csv')
+CACHE_DIR = os.path.join(ROOT_DIR, 'benchmarks', '.cache')
+TARGET = 'kesejahteraan'
+JITTER_COLUMNS = ['jumlah_penduduk_miskin', 'jumlah_pengangguran_terbuka', 'pdrb_total_adhk']
+JITTER_SIGMA = 0.05
+
+
+def make_synthetic(scale, seed=0, source_path=SOURCE_PATH):
+    """Build the `scale`x table in memory"""
+    base = pd.read_csv(source_path)
+    if scale == 1:
+        return base
+    rng = np.random.default_rng(seed)
+    n = len(base) * scale
+    index = np.tile(np.arange(len(base)), scale)
+    df = base.iloc[index].reset_index(drop=True)
+    for col in JITTER_COLUMNS:
+        noisy = df[col].to_numpy(dtype=np.float64) * rng.lognormal(0.0, JITTER_SIGMA, n)
+        if pd.api.types.is_integer_dtype(base[col]):
+            noisy = np.round(noisy).astype(base[col].dtype)
+        df[col] = noisy
+    return df
+
+
+def synthetic_path(scale, seed=0, cache_dir=CACHE_DIR):
+    """
+    Path usable as RandomForestAnalyzer(data_path=...): the columnar table next
+    to it is built on first use and reused while the source is unchanged
+    """
+    csv_path = os.path.join(cache_dir, f'synthetic_{scale}x_seed{seed}.csv')
+    table_dir = os.path.splitext(csv_path)[0]
+    source_hash = sha256_file(SOURCE_PATH)
+    meta = read_metadata(table_dir)
+    if not meta or meta['metadata'].get('source_hash') != source_hash:
+        df = make_synthetic(scale, seed)
+        write_columnar(df, table_dir, categorical=[TARGET],
+                       metadata={'scale': scale, 'seed': seed, 'source_hash': source_hash})
+    return csv_path
+
+
+def load_synthetic(scale, seed=0, mmap_mode='r'):
+    return read_columnar(os.path.splitext(synthetic_path(scale, seed))[0], mmap_mode=mmap_mode)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Forest compression stage
+Description: Shrinks the trained Random Forest artifact to fit a size and/or
+             single-row latency budget while guarding accuracy. Trees are
+             ordered by greedy ensemble selection on one half of the held-out
+             split, redundant subtrees are collapsed, and node arrays are stored
+             as float32 thresholds and uint8 feature ids / class distributions.
+             The smallest (or, under a size/latency budget, the most accurate)
+             prefix that meets every budget is written as a new artifact along
+             with a report comparing it to the full forest on the other half.
+             Nothing is chosen when that half is too small to bound the
+             accuracy drop; without an explicit bound, the tightest one the
+             half supports is used.
+
+Usage:
+    python compress_forest.py [--max-size-kb KB] [--max-p99-ms MS]
+                              [--max-accuracy-drop DROP] [--min-agreement 0.99]
+                              [--collapse-tolerance 0.05]
+                              [--artifact rf_model_kesejahteraan]
+                              [--output rf_model_kesejahteraan_compressed]
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from train_rf_model import RandomForestAnalyzer, SPLITS
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit')
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+from src.artifacts import load_artifact, save_artifact
+from src.compression import compress, forest_nbytes, greedy_selection, per_tree_proba
+
+REPORT_NAME = 'compression_report.json'
+LATENCY_REPEATS = 300
+# Share of held-out rows where the compressed forest must predict the full forest's class
+MIN_AGREEMENT = 0.99
+# Sibling leaves further apart than this (per-class probability) are kept
+COLLAPSE_TOLERANCE = 0.05
+# Confidence of the accuracy-drop bound that decides the minimum evaluation size
+BOUND_CONFIDENCE = 0.95
+
+
+def min_evaluation_rows(max_accuracy_drop, confidence=BOUND_CONFIDENCE):
+    """
+    Evaluation rows needed before a candidate can be trusted to stay within
+    `max_accuracy_drop`: even with no disagreement with the full forest on n
+    rows, a disagreement rate d (which bounds the accuracy drop) is only ruled
+    out at `confidence` once (1 - d) ** n <= 1 - confidence
+    """
+    if max_accuracy_drop is None:
+        return 0
+    if max_accuracy_drop >= 1:
+        return 1
+    return math.ceil(math.log(1 - confidence) / math.log1p(-max_accuracy_drop))
+
+
+def supported_accuracy_drop(n_rows, confidence=BOUND_CONFIDENCE):
+    """
+    Tightest accuracy-drop bound `n_rows` evaluation rows support: the
+    smallest drop d (rounded up to 0.001) with min_evaluation_rows(d) <= n_rows
+    """
+    if n_rows < 1:
+        return 1.0
+    return min(1.0, math.ceil((1 - (1 - confidence) ** (1 / n_rows)) * 1000) / 1000)
+
+
+def single_row_latency(forest, X, repeats=LATENCY_REPEATS):
+    """p50/p99 of one-row predict_proba calls, in milliseconds"""
+    rows = X[np.arange(repeats) % len(X)]
+    forest.predict_proba(rows[:1])  # warm-up
+    times = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        forest.predict_proba(rows[i:i + 1])
+        times[i] = time.perf_counter() - start
+    return {'p50_ms': float(np.percentile(times, 50) * 1e3), 'p99_ms': float(np.percentile(times, 99) * 1e3)}
+
+
+def describe(forest, X_eval, y_eval, reference_proba, X_latency):
+    """Size, latency and held-out quality of one forest"""
+    proba = forest.predict_proba(X_eval)
+    predicted = proba.argmax(axis=1)
+    return {
+        'n_trees': forest.n_trees,
+        'n_nodes': int(len(forest.feature)),
+        'max_depth': forest.max_depth,
+        'bytes': forest_nbytes(forest),
+        'dtypes': {name: str(np.asarray(arr).dtype) for name, arr in forest.arrays().items()},
+        'accuracy': float((predicted == y_eval).mean()),
+        'agreement_with_full': float((predicted == reference_proba.argmax(axis=1)).mean()),
+        'max_abs_proba_diff': float(np.abs(proba - reference_proba).max()),
+        **single_row_latency(forest, X_latency),
+    }
+
+
+def choose(candidates, full_accuracy, max_size_kb=None, max_p99_ms=None, max_accuracy_drop=None,
+           min_agreement=MIN_AGREEMENT):
+    """
+    Pick a candidate meeting every budget: under a size/latency budget the most
+    accurate one (fewest trees on ties), otherwise the fewest trees
+    """
+    def ok(c):
+        return ((max_size_kb is None or c['bytes'] <= max_size_kb * 1024)
+                and (max_p99_ms is None or c['p99_ms'] <= max_p99_ms)
+                and (max_accuracy_drop is None or full_accuracy - c['accuracy'] <= max_accuracy_drop + 1e-12)
+                and (min_agreement is None or c['agreement_with_full'] >= min_agreement))
+
+    feasible = [c for c in candidates if ok(c)]
+    if not feasible:
+        return None
+    if max_size_kb is not None or max_p99_ms is not None:
+        return max(feasible, key=lambda c: (c['accuracy'], -c['n_trees']))
+    return min(feasible, key=lambda c: c['n_trees'])
+
+
+def compress_forest(artifact_dir, model_path, data_path, output_dir, max_size_kb=None, max_p99_ms=None,
+                    max_accuracy_drop=None, min_agreement=MIN_AGREEMENT, collapse_tolerance=COLLAPSE_TOLERANCE,
+                    selection_fraction=0.5, split='stratified'):
+    """
+    Run the compression stage; no candidate is chosen (and no artifact is
+    written) when the evaluation half has fewer than
+    min_evaluation_rows(max_accuracy_drop) rows. Without `max_accuracy_drop`
+    the bound is supported_accuracy_drop(evaluation rows)
+
+    Returns:
+        dict: The report (also written to REPORT_NAME inside `output_dir`'s parent)
+    """
+    artifact = load_artifact(artifact_dir, model_path)
+    if artifact is None:
+        raise FileNotFoundError(f"Model artifact not found at {artifact_dir} or {model_path}")
+    forest = artifact.forest
+
+    # Same held-out rows as training; half picks trees, the other half judges them
+    analyzer = RandomForestAnalyzer(data_path, model_path, os.devnull, img_dir='.', split=split)
+    _, X_test, _, y_test, feature_names = analyzer.load_and_prepare_data()
+    if feature_names != list(artifact.features):
+        raise ValueError(f"Dataset features {feature_names} do not match the artifact {artifact.features}")
+    X_test = np.asarray(X_test, dtype=np.float64)
+    # Class codes -> column positions of predict_proba
+    y_test = np.searchsorted(np.asarray(forest.classes), np.asarray(y_test))
+    X_sel, X_eval, y_sel, y_eval = train_test_split(
+        X_test, y_test, train_size=selection_fraction, random_state=42, stratify=y_test
+    )
+    derived_drop = max_accuracy_drop is None
+    if derived_drop:
+        max_accuracy_drop = supported_accuracy_drop(len(y_eval))
+    budget = {'max_size_kb': max_size_kb, 'max_p99_ms': max_p99_ms, 'max_accuracy_drop': max_accuracy_drop,
+              'min_agreement': min_agreement}
+    report = {
+        'budget': budget,
+        'collapse_tolerance': collapse_tolerance,
+        'split': split,
+        'selection_rows': int(len(y_sel)),
+        'evaluation_rows': int(len(y_eval)),
+        'min_evaluation_rows': min_evaluation_rows(max_accuracy_drop),
+        'accuracy_drop_derived': derived_drop,
+        'refused': None,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(output_dir)), exist_ok=True)
+    report_path = os.path.join(os.path.dirname(os.path.abspath(output_dir)), REPORT_NAME)
+
+    reference = forest.predict_proba(X_eval)
+    report['full'] = describe(forest, X_eval, y_eval, reference, X_test)
+    if len(y_eval) < report['min_evaluation_rows']:
+        report['refused'] = (f"{len(y_eval)} evaluation rows cannot bound an accuracy drop of "
+                             f"{max_accuracy_drop} at {BOUND_CONFIDENCE:.0%} confidence "
+                             f"(need {report['min_evaluation_rows']})")
+        report['compressed'] = None
+        return _save_report(report, report_path)
+
+    start = time.perf_counter()
+    order, selection_curve = greedy_selection(per_tree_proba(forest, X_sel), y_sel)
+    selection_seconds = time.perf_counter() - start
+
+    full = report['full']
+    candidates = []
+    for k in range(1, forest.n_trees + 1):
+        compressed, collapsed = compress(forest, order[:k], collapse_tolerance)
+        entry = describe(compressed, X_eval, y_eval, reference, X_test)
+        entry.update(selection_accuracy=float(selection_curve[k - 1]), collapsed_splits=collapsed)
+        candidates.append(entry)
+
+    chosen = choose(candidates, full['accuracy'], max_size_kb, max_p99_ms, max_accuracy_drop, min_agreement)
+    report.update(selection_seconds=selection_seconds, tree_order=order.tolist(), compressed=chosen,
+                  candidates=candidates)
+    if chosen is not None:
+        compressed, _ = compress(forest, order[:chosen['n_trees']], collapse_tolerance)
+        # Thresholds already have the scaler folded in; its parameters are kept for reference
+        manifest = save_artifact(
+            output_dir, compressed, tuple(artifact.scaler_params), artifact.mapping, artifact.features,
+            hyperparameters=artifact.manifest.get('hyperparameters'),
+            data_hash=artifact.manifest.get('data_hash'),
+            compression={'source_model_version': artifact.version, 'budget': budget,
+                         'collapse_tolerance': collapse_tolerance, 'tree_order': report['tree_order'],
+                         'report': REPORT_NAME},
+        )
+        report['output'] = {'path': os.path.abspath(output_dir), 'model_version': manifest['model_version']}
+    return _save_report(report, report_path)
+
+
+def _save_report(report, report_path):
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=4, default=str)
+    report['report_path'] = report_path
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compress the Random Forest artifact to a size/latency budget')
+    parser.add_argument('--max-size-kb', type=float, default=None, help='max node-array size in KiB')
+    parser.add_argument('--max-p99-ms', type=float, default=None, help='max p99 single-row latency in ms')
+    parser.add_argument('--max-accuracy-drop', type=float, default=None,
+                        help='max held-out accuracy drop vs the full forest (default: the tightest '
+                             'bound the evaluation rows support, e.g. 0.071 for 41 rows)')
+    parser.add_argument('--min-agreement', type=float, default=MIN_AGREEMENT,
+                        help='min share of held-out rows where the compressed forest predicts the same class '
+                             f'as the full forest (default: {MIN_AGREEMENT})')
+    parser.add_argument('--collapse-tolerance', type=float, default=COLLAPSE_TOLERANCE,
+                        help='max per-class probability gap of same-class sibling leaves to merge '
+                             f'(0: identical leaves only; default: {COLLAPSE_TOLERANCE})')
+    parser.add_argument('--no-collapse', action='store_true', help='skip subtree collapsing')
+    parser.add_argument('--selection-fraction', type=float, default=0.5,
+                        help='share of the held-out split used to order trees (rest judges them)')
+    parser.add_argument('--split', choices=SPLITS, default='stratified', help='hold-out used for training')
+    parser.add_argument('--artifact', default='rf_model_kesejahteraan', help='artifact directory')
+    parser.add_argument('--model', default='rf_model_kesejahteraan.pkl', help='joblib fallback')
+    parser.add_argument('--data', default='../preprocessing/dataset_preprocessed.csv')
+    parser.add_argument('--output', default='rf_model_kesejahteraan_compressed')
+    args = parser.parse_args()
+
+    report = compress_forest(
+        args.artifact, args.model, args.data, args.output,
+        max_size_kb=args.max_size_kb, max_p99_ms=args.max_p99_ms, max_accuracy_drop=args.max_accuracy_drop,
+        min_agreement=args.min_agreement,
+        collapse_tolerance=None if args.no_collapse else args.collapse_tolerance,
+        selection_fraction=args.selection_fraction, split=args.split,
+    )
+
+    print("\n" + "="*60)
+    print("FOREST COMPRESSION")
+    print("="*60)
+    print(f"Evaluation rows: {report['evaluation_rows']} "
+          f"(at least {report['min_evaluation_rows']} needed to bound the accuracy drop)")
+    print(f"Max accuracy drop: {report['budget']['max_accuracy_drop']}"
+          + (" (derived from the evaluation rows)" if report['accuracy_drop_derived'] else ""))
+    full, chosen = report['full'], report['compressed']
+    rows = [('full', full)] + ([('compressed', chosen)] if chosen else [])
+    print(f"{'':<12}{'trees':>7}{'nodes':>8}{'KiB':>9}{'p99 ms':>9}{'accuracy':>10}{'agree':>8}")
+    for name, r in rows:
+        print(f"{name:<12}{r['n_trees']:>7}{r['n_nodes']:>8}{r['bytes'] / 1024:>9.1f}"
+              f"{r['p99_ms']:>9.3f}{r['accuracy']:>10.4f}{r['agreement_with_full']:>8.3f}")
+    print(f"✓ Report saved to: {report['report_path']}")
+    if report['refused']:
+        print(f"✗ {report['refused']}; no artifact written (use more held-out rows, a smaller "
+              f"--selection-fraction or a looser --max-accuracy-drop)")
+        sys.exit(1)
+    if chosen is None:
+        print(f"✗ No forest meets the budget {report['budget']}; no artifact written")
+        sys.exit(1)
+    print(f"✓ Compressed artifact saved to: {report['output']['path']} "
+          f"(version {report['output']['model_version']})")
+
+
+if __name__ == "__main__":
+    main()
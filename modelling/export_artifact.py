@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Convert an existing joblib model artifact to the memory-mappable artifact
+directory (JSON manifest + .npy node arrays).
+
+Usage:
+    python export_artifact.py [--model rf_model_kesejahteraan.pkl] [--output DIR]
+                              [--data ../preprocessing/dataset_preprocessed.csv]
+"""
+
+import argparse
+import os
+import sys
+import joblib
+import numpy as np
+import pandas as pd
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit')
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+from src.flat_forest import FlatForest
+from src.artifacts import ModelArtifact, save_artifact, sha256_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export joblib model to the artifact directory format')
+    parser.add_argument('--model', default='rf_model_kesejahteraan.pkl')
+    parser.add_argument('--output', default=None, help='default: model path without extension')
+    parser.add_argument('--data', default='../preprocessing/dataset_preprocessed.csv',
+                        help='training data, recorded in the manifest as data_hash')
+    args = parser.parse_args()
+    output = args.output or os.path.splitext(args.model)[0]
+
+    artifacts = joblib.load(args.model)
+    model = artifacts['model']
+    scaler = artifacts['scaler']
+    mapping = artifacts['mapping']
+    features = artifacts['features']
+
+    flat = FlatForest.from_sklearn(
+        model,
+        scaler,
+        feature_names=features,
+        class_labels=[mapping[int(c)] for c in model.classes_]
+    )
+    manifest = save_artifact(
+        output,
+        flat,
+        scaler,
+        mapping,
+        features,
+        hyperparameters=model.get_params(),
+        data_hash=sha256_file(args.data) if os.path.exists(args.data) else None
+    )
+
+    # Sanity check: reload memory-mapped and compare against sklearn
+    loaded = ModelArtifact.from_directory(output)
+    sample = pd.DataFrame(
+        np.random.default_rng(0).uniform(-2, 2, (256, len(features))) * scaler.scale_ + scaler.mean_,
+        columns=features
+    )
+    expected = model.predict_proba(scaler.transform(sample))
+    actual = loaded.forest.predict_proba(sample)
+
+    print("📦 ARTIFACT EXPORT:")
+    print("="*50)
+    print(f"Version: {manifest['model_version']}")
+    print(f"Trees: {flat.n_trees}")
+    print(f"Nodes: {len(flat.feature)}")
+    print(f"Max depth: {flat.max_depth}")
+    print(f"Max |proba diff| vs sklearn: {np.abs(expected - actual).max()}")
+    print(f"✓ Saved to: {os.path.abspath(output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Evaluation figure rendering stage
+Description: Draws the evaluation figures shown in the Streamlit app from the
+             saved metrics.json and the model artifact (the tree plot uses
+             the fitted estimator from the joblib file), outside the training
+             run. Figures are rendered in parallel worker processes and skipped
+             when their inputs (keyed by model hash) have not changed since the
+             last render.
+
+Usage:
+    python render_figures.py [--metrics metrics.json] [--artifact DIR]
+                             [--model rf_model_kesejahteraan.pkl] [--img-dir .]
+                             [--workers N] [--force]
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit')
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+from src.artifacts import load_artifact, sha256_file
+from src.flat_forest import fold_thresholds, scaler_params
+
+# Bump when a figure's drawing code changes to invalidate every cached figure
+RENDER_VERSION = 2
+CACHE_NAME = 'figures.json'
+DPI = 300
+TREE_INDEX = 0
+TREE_DEPTH = 3  # Limit depth for readability
+
+FIGURES = {
+    'confusion_matrix': 'confusion_matrix.png',
+    'feature_importance': 'feature_importance.png',
+    'decision_tree_viz': 'decision_tree_viz.png',
+    'performance_metrics': 'performance_metrics.png',
+}
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.style.use('default')
+    return plt
+
+
+def draw_confusion_matrix(inputs, path, artifacts):
+    plt = _pyplot()
+    import seaborn as sns
+    sns.set_palette("husl")
+
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(
+        np.asarray(inputs['confusion_matrix']),
+        annot=True,
+        fmt='d',
+        cmap='Blues',
+        xticklabels=inputs['labels'],
+        yticklabels=inputs['labels']
+    )
+    plt.title('Confusion Matrix - Random Forest Classifier', fontsize=16, pad=20)
+    plt.ylabel('Actual Label', fontsize=12)
+    plt.xlabel('Predicted Label', fontsize=12)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close()
+
+
+def draw_feature_importance(inputs, path, artifacts):
+    plt = _pyplot()
+    names = list(inputs['feature_importance'])
+    importances = np.array([inputs['feature_importance'][n] for n in names])
+    indices = np.argsort(importances)[::-1]
+
+    plt.figure(figsize=(12, 8))
+    plt.title('Feature Importance - Random Forest Classifier', fontsize=16, pad=20)
+    bars = plt.barh(range(len(indices)), importances[indices], align="center", alpha=0.8)
+
+    # Color bars differently for better aesthetics
+    colors = plt.cm.viridis(np.linspace(0, 1, len(indices)))
+    for bar, color in zip(bars, colors):
+        bar.set_color(color)
+
+    plt.yticks(range(len(indices)), [names[i] for i in indices])
+    plt.gca().invert_yaxis()
+    plt.xlabel('Importance Score', fontsize=12)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close()
+
+
+def raw_unit_tree(estimator, scaler):
+    """
+    Copy of a fitted tree whose split thresholds are in original feature
+    units: the scaler is folded into each threshold as in FlatForest, so the
+    plotted rules read like the inputs of the prediction form
+    """
+    tree = copy.deepcopy(estimator)
+    state = tree.tree_.__getstate__()
+    nodes = state['nodes'].copy()
+    split = nodes['left_child'] != -1
+    mean, scale = scaler_params(scaler, estimator.n_features_in_)
+    feature = nodes['feature'][split]
+    nodes['threshold'][split] = fold_thresholds(nodes['threshold'][split], mean[feature], scale[feature])
+    tree.tree_.__setstate__(dict(state, nodes=nodes))
+    return tree
+
+
+def draw_decision_tree(inputs, path, artifacts):
+    plt = _pyplot()
+    from sklearn.tree import plot_tree
+
+    model = artifacts['model']
+    plt.figure(figsize=(20, 12))
+    plot_tree(
+        raw_unit_tree(model.estimators_[inputs['tree_index']], artifacts['scaler']),
+        max_depth=inputs['max_depth'],
+        feature_names=artifacts['features'],
+        class_names=[artifacts['mapping'][int(c)] for c in model.classes_],
+        filled=True,
+        rounded=True,
+        fontsize=10
+    )
+    plt.title('Decision Tree Visualization (First Tree)', fontsize=16, pad=20)
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close()
+
+
+def draw_performance_metrics(inputs, path, artifacts):
+    plt = _pyplot()
+    report = inputs['classification_report']
+    classes = [cls for cls in inputs['labels'] if cls in report]
+    precision_scores = [report[cls]['precision'] for cls in classes]
+    recall_scores = [report[cls]['recall'] for cls in classes]
+    f1_scores = [report[cls]['f1-score'] for cls in classes]
+
+    # Create grouped bar chart
+    x = np.arange(len(classes))
+    width = 0.25
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    ax.bar(x - width, precision_scores, width, label='Precision', alpha=0.8)
+    ax.bar(x, recall_scores, width, label='Recall', alpha=0.8)
+    ax.bar(x + width, f1_scores, width, label='F1-Score', alpha=0.8)
+
+    ax.set_xlabel('Classes')
+    ax.set_ylabel('Score')
+    ax.set_title('Model Performance Metrics by Class', fontsize=16, pad=20)
+    ax.set_xticks(x)
+    ax.set_xticklabels(classes, rotation=45, ha='right')
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3)
+
+    # Set y-axis limits to ensure readability
+    ax.set_ylim([0, 1.1])
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close(fig)
+
+
+DRAWERS = {
+    'confusion_matrix': draw_confusion_matrix,
+    'feature_importance': draw_feature_importance,
+    'decision_tree_viz': draw_decision_tree,
+    'performance_metrics': draw_performance_metrics,
+}
+
+
+def figure_inputs(metrics):
+    """
+    Only the parts of metrics.json each figure depends on; None when the
+    metrics predate a field (re-run training to produce it)
+    """
+    def pick(*keys):
+        return {k: metrics[k] for k in keys} if all(k in metrics for k in keys) else None
+
+    return {
+        'confusion_matrix': pick('confusion_matrix', 'labels'),
+        'feature_importance': pick('feature_importance'),
+        'decision_tree_viz': {'tree_index': TREE_INDEX, 'max_depth': TREE_DEPTH},
+        'performance_metrics': pick('classification_report', 'labels'),
+    }
+
+
+def figure_key(name, model_hash, inputs):
+    payload = json.dumps({'figure': name, 'render_version': RENDER_VERSION,
+                          'model_hash': model_hash, 'inputs': inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _render_one(name, inputs, path, artifact_dir, model_path):
+    start = time.perf_counter()
+    # The tree figure needs the fitted sklearn estimator, only kept in the joblib file
+    artifacts = joblib.load(model_path) if name == 'decision_tree_viz' else None
+    DRAWERS[name](inputs, path, artifacts)
+    return time.perf_counter() - start
+
+
+def render_figures(metrics_path, artifact_dir, model_path, img_dir, workers=None, force=False):
+    """
+    Render stale figures in parallel
+
+    Returns:
+        dict: figure name -> 'cached', 'missing inputs' or render seconds
+    """
+    with open(metrics_path) as f:
+        metrics = json.load(f)
+    artifact = load_artifact(artifact_dir, model_path)
+    if artifact is None:
+        raise FileNotFoundError(f"Model artifact not found at {artifact_dir} or {model_path}")
+    model_hash = artifact.manifest.get('model_hash') or sha256_file(model_path)
+
+    os.makedirs(img_dir, exist_ok=True)
+    cache_path = os.path.join(img_dir, CACHE_NAME)
+    cache = {}
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+
+    status, stale = {}, {}
+    for name, inputs in figure_inputs(metrics).items():
+        if inputs is None or (name == 'decision_tree_viz' and not os.path.isfile(model_path)):
+            status[name] = 'missing inputs'
+            continue
+        path = os.path.join(img_dir, FIGURES[name])
+        key = figure_key(name, model_hash, inputs)
+        if not force and cache.get(name) == key and os.path.exists(path):
+            status[name] = 'cached'
+        else:
+            stale[name] = (inputs, path, key)
+
+    if stale:
+        max_workers = min(len(stale), workers or os.cpu_count() or 1)
+        args = {name: (name, inputs, path, artifact_dir, model_path) for name, (inputs, path, _) in stale.items()}
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = {name: pool.submit(_render_one, *a) for name, a in args.items()}
+                elapsed = {name: fut.result() for name, fut in futures.items()}
+        else:
+            elapsed = {name: _render_one(*a) for name, a in args.items()}
+        for name, seconds in elapsed.items():
+            cache[name] = stale[name][2]
+            status[name] = seconds
+        with open(cache_path, 'w') as f:
+            json.dump(cache, f, indent=4)
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render evaluation figures from metrics.json and the model artifact')
+    parser.add_argument('--metrics', default='metrics.json')
+    parser.add_argument('--artifact', default='rf_model_kesejahteraan', help='artifact directory')
+    parser.add_argument('--model', default='rf_model_kesejahteraan.pkl', help='joblib fallback')
+    parser.add_argument('--img-dir', default='.')
+    parser.add_argument('--workers', type=int, default=None, help='render processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='re-render even if inputs are unchanged')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    status = render_figures(args.metrics, args.artifact, args.model, args.img_dir, args.workers, args.force)
+    for name, result in status.items():
+        detail = result if isinstance(result, str) else f'{result:.2f}s'
+        print(f"  - {FIGURES[name]:<26} {detail}")
+    print(f"✓ Figures ready in {os.path.abspath(args.img_dir)} ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
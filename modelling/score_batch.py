@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Streaming batch scoring
+Description: Scores a CSV or Parquet file (or a prediction audit log
+             directory, replayed via src.audit.AuditReader) of regional
+             indicators with the
+             Random Forest artifact (and optionally the manual
+             hitung_skor_kesejahteraan formula) chunk by chunk. Chunks are
+             scored in worker processes and written in input order as soon
+             as they are ready; at most a few chunks are in flight, so memory
+             stays flat however large the input is. The StandardScaler is
+             folded into the artifact's thresholds, so raw feature columns are
+             scored directly (identical to scaler + sklearn predict_proba).
+
+Output columns (after the input columns kept with --keep-columns):
+    prediksi_rf              predicted class (empty if a feature is missing)
+    proba_<kelas>            one probability column per class
+    skor_manual, kategori_manual   with --manual (needs jumlah_penduduk)
+
+Usage:
+    python score_batch.py INPUT OUTPUT [--chunk-rows 65536] [--workers N]
+                          [--manual] [--keep-columns nama_kabupaten_kota tahun]
+    python score_batch.py ../audit_log replay.csv --manual --since 2026-10-01
+"""
+
+import argparse
+import os
+import re
+import resource
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit')
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+from src.artifacts import load_artifact
+from src.atomic import atomic_file
+from src.audit import AuditReader
+from src.logic import hitung_skor_kesejahteraan_batch, tentukan_kategori_batch
+
+FORMATS = ('csv', 'parquet')
+# Input only: a directory written by src.audit.AuditLog
+AUDIT_FORMAT = 'audit'
+CHUNK_ROWS = 65536
+# Chunks queued or being scored per worker; bounds memory to a few chunks
+IN_FLIGHT_PER_WORKER = 2
+# Needed only for the manual score; the RF features come from the artifact
+POPULATION_FIELD = 'jumlah_penduduk'
+MANUAL_INPUTS = ('jumlah_penduduk_miskin', 'jumlah_pengangguran_terbuka', 'pdrb_total_adhk',
+                 'harapan_lama_sekolah')
+
+# Scorer, created once per worker by _init_worker
+_SCORER = None
+
+
+def file_format(path, explicit=None, formats=FORMATS):
+    """'csv', 'parquet' or (input) 'audit', from the explicit format, a directory or the file extension"""
+    if explicit is None and AUDIT_FORMAT in formats and os.path.isdir(path):
+        return AUDIT_FORMAT
+    fmt = explicit or os.path.splitext(path)[1].lower().lstrip('.')
+    fmt = {'pq': 'parquet'}.get(fmt, fmt)
+    if fmt not in formats:
+        raise ValueError(f"Cannot tell the format of {path}; pass --input-format/--output-format "
+                         f"{'/'.join(FORMATS)}")
+    return fmt
+
+
+def read_chunks(path, fmt, chunk_rows, columns=None, since=None, until=None):
+    """
+    Yield DataFrames of at most `chunk_rows` rows without loading the whole
+    file; `since`/`until` (epoch seconds) select audit records by time
+    """
+    if fmt == AUDIT_FORMAT:
+        yield from AuditReader(path).iter_frames(since, until, chunk_rows, columns)
+        return
+    if fmt == 'csv':
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_rows)
+        return
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+        yield batch.to_pandas()
+
+
+def input_columns(path, fmt):
+    if fmt == AUDIT_FORMAT:
+        return AuditReader(path).columns()
+    if fmt == 'csv':
+        return list(pd.read_csv(path, nrows=0).columns)
+    import pyarrow.parquet as pq
+
+    return list(pq.ParquetFile(path).schema_arrow.names)
+
+
+def parse_time(value):
+    """Epoch seconds from a number or an ISO 8601 date/time (local time if no offset)"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def probability_column(label):
+    return 'proba_' + re.sub(r'[^0-9a-z]+', '_', str(label).lower()).strip('_')
+
+
+class ChunkScorer:
+    """
+    Scores one chunk: forest probabilities and class, plus the manual score
+    """
+
+    def __init__(self, artifact_dir, model_path, manual=False, keep_columns=None):
+        artifact = load_artifact(artifact_dir, model_path)
+        if artifact is None:
+            raise FileNotFoundError(f"Model artifact not found at {artifact_dir} or {model_path}")
+        self.version = artifact.version
+        self.forest = artifact.forest
+        self.features = list(artifact.features)
+        self.labels = list(self.forest.class_labels)
+        self.manual = manual
+        self.keep_columns = keep_columns
+
+    def required_columns(self):
+        return self.features + ([POPULATION_FIELD] if self.manual else [])
+
+    def score(self, chunk):
+        X = chunk[self.features].to_numpy(dtype=np.float64)
+        complete = ~np.isnan(X).any(axis=1)
+        proba = np.full((len(X), len(self.labels)), np.nan)
+        if complete.any():
+            proba[complete] = self.forest.predict_proba(X[complete])
+
+        keep = chunk.columns if self.keep_columns is None else self.keep_columns
+        out = chunk[list(keep)].reset_index(drop=True)
+        predicted = np.asarray(self.labels, dtype=object)[np.nan_to_num(proba).argmax(axis=1)]
+        predicted[~complete] = None
+        out['prediksi_rf'] = predicted
+        for k, label in enumerate(self.labels):
+            out[probability_column(label)] = proba[:, k]
+
+        if self.manual:
+            inputs = [chunk[POPULATION_FIELD].to_numpy(dtype=np.float64)]
+            inputs += [chunk[name].to_numpy(dtype=np.float64) for name in MANUAL_INPUTS]
+            skor = hitung_skor_kesejahteraan_batch(*inputs)[0]
+            valid = ~np.isnan(skor)
+            kategori = np.full(len(skor), None, dtype=object)
+            kategori[valid] = tentukan_kategori_batch(skor[valid])
+            out['skor_manual'] = skor
+            out['kategori_manual'] = kategori
+        return out, int((~complete).sum())
+
+
+def encode_chunk(frame, fmt):
+    """CSV chunks are formatted where they are scored, leaving only file I/O to the writer"""
+    if fmt == 'csv':
+        return list(frame.columns), frame.to_csv(header=False, index=False)
+    return frame
+
+
+def _init_worker(artifact_dir, model_path, manual, keep_columns):
+    global _SCORER
+    _SCORER = ChunkScorer(artifact_dir, model_path, manual, keep_columns)
+
+
+def _score_chunk(chunk, fmt):
+    out, skipped = _SCORER.score(chunk)
+    return encode_chunk(out, fmt), len(out), skipped
+
+
+class ChunkWriter:
+    """Appends encoded chunks (see encode_chunk) to a CSV or Parquet file"""
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self._parquet = None
+        self._csv = None
+
+    def write(self, payload):
+        if self.fmt == 'csv':
+            columns, text = payload
+            if self._csv is None:
+                self._csv = open(self.path, 'w', newline='')
+                self._csv.write(pd.DataFrame(columns=columns).to_csv(index=False))
+            self._csv.write(text)
+        else:
+            frame = payload
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            else:
+                # Columns inferred per chunk (e.g. int -> float once a NaN appears) follow the first chunk
+                table = table.cast(self._parquet.schema)
+            self._parquet.write_table(table)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        elif self._csv is not None:
+            self._csv.close()
+        elif self.fmt == 'csv':
+            open(self.path, 'w').close()
+
+
+def score_file(input_path, output_path, artifact_dir, model_path, chunk_rows=CHUNK_ROWS, n_workers=None,
+               manual=False, keep_columns=None, input_format=None, output_format=None, since=None, until=None):
+    """
+    Score `input_path` into `output_path` (written atomically when finished)
+
+    `since`/`until` (epoch seconds) restrict an audit log input to a time range.
+
+    Returns:
+        dict: Rows, chunks, workers, seconds, rows/sec and peak RSS
+    """
+    in_fmt = file_format(input_path, input_format, FORMATS + (AUDIT_FORMAT,))
+    out_fmt = file_format(output_path, output_format)
+    scorer = ChunkScorer(artifact_dir, model_path, manual, keep_columns)
+    available = input_columns(input_path, in_fmt)
+    missing = [c for c in scorer.required_columns() + list(keep_columns or []) if c not in available]
+    if missing:
+        raise ValueError(f"{input_path} is missing columns: {missing}")
+    columns = None
+    if keep_columns is not None:
+        columns = list(dict.fromkeys(list(keep_columns) + scorer.required_columns()))
+
+    workers = max(1, n_workers or os.cpu_count() or 1)
+    totals = {'rows': 0, 'chunks': 0, 'incomplete': 0}
+    start = time.perf_counter()
+    with atomic_file(output_path) as tmp_path:
+        writer = ChunkWriter(tmp_path, out_fmt)
+
+        def write(result):
+            payload, n_rows, skipped = result
+            writer.write(payload)
+            totals['rows'] += n_rows
+            totals['chunks'] += 1
+            totals['incomplete'] += skipped
+
+        try:
+            if workers == 1:
+                for chunk in read_chunks(input_path, in_fmt, chunk_rows, columns, since, until):
+                    out, skipped = scorer.score(chunk)
+                    write((encode_chunk(out, out_fmt), len(out), skipped))
+            else:
+                pending = deque()
+                with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                         initargs=(artifact_dir, model_path, manual, keep_columns)) as pool:
+                    for chunk in read_chunks(input_path, in_fmt, chunk_rows, columns, since, until):
+                        pending.append(pool.submit(_score_chunk, chunk, out_fmt))
+                        # Write finished chunks in input order; block once the window is full
+                        while pending and (len(pending) >= workers * IN_FLIGHT_PER_WORKER or pending[0].done()):
+                            write(pending.popleft().result())
+                    while pending:
+                        write(pending.popleft().result())
+        finally:
+            writer.close()
+    seconds = time.perf_counter() - start
+
+    return {
+        'input': os.path.abspath(input_path),
+        'output': os.path.abspath(output_path),
+        'model_version': scorer.version,
+        'rows': totals['rows'],
+        'rows_missing_features': totals['incomplete'],
+        'chunks': totals['chunks'],
+        'chunk_rows': chunk_rows,
+        'workers': workers,
+        'seconds': seconds,
+        'rows_per_second': totals['rows'] / seconds if seconds > 0 else float('inf'),
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # KiB on Linux
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score a CSV/Parquet file with the welfare Random Forest')
+    parser.add_argument('input', help='CSV or Parquet file with the model feature columns')
+    parser.add_argument('output', help='CSV or Parquet file to write (format from the extension)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help='rows per chunk')
+    parser.add_argument('--workers', type=int, default=None, help='scoring processes (default: all cores)')
+    parser.add_argument('--manual', action='store_true',
+                        help=f'also compute the manual score and category (needs {POPULATION_FIELD})')
+    parser.add_argument('--keep-columns', nargs='*', default=None,
+                        help='input columns copied to the output (default: all)')
+    parser.add_argument('--input-format', choices=FORMATS + (AUDIT_FORMAT,), default=None)
+    parser.add_argument('--output-format', choices=FORMATS, default=None)
+    parser.add_argument('--since', type=parse_time, default=None,
+                        help='audit log input: first timestamp (ISO date/time or epoch seconds)')
+    parser.add_argument('--until', type=parse_time, default=None,
+                        help='audit log input: end timestamp, exclusive')
+    parser.add_argument('--artifact', default='rf_model_kesejahteraan', help='artifact directory')
+    parser.add_argument('--model', default='rf_model_kesejahteraan.pkl', help='joblib fallback')
+    args = parser.parse_args()
+
+    report = score_file(
+        args.input, args.output, args.artifact, args.model, chunk_rows=args.chunk_rows,
+        n_workers=args.workers, manual=args.manual, keep_columns=args.keep_columns,
+        input_format=args.input_format, output_format=args.output_format, since=args.since, until=args.until,
+    )
+    print(f"✓ Scored {report['rows']:,} rows in {report['chunks']} chunks with {report['workers']} "
+          f"worker(s) in {report['seconds']:.2f}s ({report['rows_per_second']:,.0f} rows/sec, "
+          f"peak RSS {report['peak_rss_mb']:.0f} MB)")
+    if report['rows_missing_features']:
+        print(f"⚠️  {report['rows_missing_features']:,} rows had missing features and no RF prediction")
+    print(f"✓ Predictions saved to: {report['output']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Headless prediction HTTP service
+Description: Loads the model artifact once and serves JSON predictions
+             (manual welfare score + Random Forest class probabilities).
+             Concurrent requests are merged into micro-batches before the
+             model is called.
+
+Endpoints:
+    POST /predict          single object, list of objects, or {"instances": [...]}
+    GET  /metrics/latency  request and model latency histograms
+    GET  /health           liveness check
+
+Usage:
+    python serve.py --port 8000 --max-batch-size 64 --max-wait-ms 2
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit')
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+from src.artifacts import load_artifact
+from src.logic import hitung_skor_kesejahteraan_batch, tentukan_kategori_batch
+from src.serving import LatencyHistogram, MicroBatcher
+
+# Only needed for the manual score; the RF features come from the artifact
+POPULATION_FIELD = 'jumlah_penduduk'
+
+
+class PredictionService:
+    """
+    Model wrapper used by the micro-batcher: one vectorized call per batch
+    """
+
+    def __init__(self, artifact_dir, model_path):
+        artifact = load_artifact(artifact_dir, model_path)
+        if artifact is None:
+            raise FileNotFoundError(f"Model artifact not found at {artifact_dir} or {model_path}")
+        self.version = artifact.version
+        self.features = list(artifact.features)
+        # Flat arrays with the scaler folded in; identical to sklearn's predict_proba
+        self.forest = artifact.forest
+        self.labels = self.forest.class_labels
+
+    def validate(self, instance):
+        """Return an error message for an invalid instance, or None"""
+        if not isinstance(instance, dict):
+            return "each instance must be a JSON object"
+        missing = [f for f in self.features if f not in instance]
+        if missing:
+            return f"missing fields: {missing}"
+        for field in self.features + [POPULATION_FIELD]:
+            value = instance.get(field)
+            if field in instance and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                return f"field '{field}' must be a number"
+        return None
+
+    def predict_batch(self, instances):
+        X = np.array([[inst[f] for f in self.features] for inst in instances], dtype=np.float64)
+        proba = self.forest.predict_proba(X)
+        predicted = np.argmax(proba, axis=1)
+
+        # Manual formula: P = jumlah_penduduk, M/U/Y/S = the model features
+        P = np.array([inst.get(POPULATION_FIELD, np.nan) for inst in instances], dtype=np.float64)
+        col = {f: X[:, i] for i, f in enumerate(self.features)}
+        skor, pdrb_score, edu_score, poverty_impact, unemployment_impact = hitung_skor_kesejahteraan_batch(
+            P,
+            col['jumlah_penduduk_miskin'],
+            col['jumlah_pengangguran_terbuka'],
+            col['pdrb_total_adhk'],
+            col['harapan_lama_sekolah']
+        )
+        kategori = tentukan_kategori_batch(skor)
+        has_population = ~np.isnan(P)
+
+        results = []
+        for i in range(len(instances)):
+            manual = None
+            if has_population[i]:
+                manual = {
+                    'skor': float(skor[i]),
+                    'kategori': kategori[i],
+                    'komponen': {
+                        'pdrb_score': float(pdrb_score[i]),
+                        'edu_score': float(edu_score[i]),
+                        'poverty_impact': float(poverty_impact[i]),
+                        'unemployment_impact': float(unemployment_impact[i]),
+                    },
+                }
+            results.append({
+                'skor_manual': manual,
+                'prediksi_rf': self.labels[predicted[i]],
+                'probabilitas_rf': dict(zip(self.labels, proba[i].tolist())),
+            })
+        return results
+
+
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # default backlog of 5 resets connections under load
+
+
+def make_handler(service, batcher, request_latency, timeout):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive for high request rates
+        disable_nagle_algorithm = True  # headers and body are written separately
+
+        def log_message(self, format, *args):
+            pass  # per-request logging would dominate latency
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, {
+                    'status': 'ok', 'model_version': service.version, 'features': service.features
+                })
+            elif self.path == '/metrics/latency':
+                self._send_json(200, {
+                    'request_latency': request_latency.snapshot(),
+                    'batching': batcher.stats(),
+                })
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send_json(404, {'error': 'not found'})
+                return
+            start = time.perf_counter()
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'null')
+            except (ValueError, UnicodeDecodeError):
+                self._send_json(400, {'error': 'invalid JSON body'})
+                return
+
+            single = isinstance(payload, dict) and 'instances' not in payload
+            if single:
+                instances = [payload]
+            elif isinstance(payload, dict):
+                instances = payload['instances']
+            else:
+                instances = payload
+            if not isinstance(instances, list) or not instances:
+                self._send_json(400, {'error': 'expected an object, a list, or {"instances": [...]}'})
+                return
+            for i, instance in enumerate(instances):
+                error = service.validate(instance)
+                if error:
+                    self._send_json(400, {'error': f'instance {i}: {error}'})
+                    return
+
+            try:
+                results = batcher.submit(instances).result(timeout=timeout)
+            except Exception as exc:
+                self._send_json(500, {'error': str(exc)})
+                return
+            self._send_json(200, results[0] if single else {'predictions': results})
+            request_latency.record(time.perf_counter() - start)
+
+    return PredictionHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prediction HTTP service with micro-batching')
+    parser.add_argument('--artifact', default='rf_model_kesejahteraan', help='artifact directory')
+    parser.add_argument('--model', default='rf_model_kesejahteraan.pkl', help='joblib fallback')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=64, help='max instances per model call')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help='max wait for a batch to fill')
+    parser.add_argument('--timeout', type=float, default=10.0, help='per-request timeout (seconds)')
+    args = parser.parse_args()
+
+    service = PredictionService(args.artifact, args.model)
+    batcher = MicroBatcher(service.predict_batch, args.max_batch_size, args.max_wait_ms)
+    request_latency = LatencyHistogram()
+    server = PredictionServer(
+        (args.host, args.port), make_handler(service, batcher, request_latency, args.timeout)
+    )
+
+    print(f"🚀 Serving model {service.version or os.path.abspath(args.model)} on http://{args.host}:{args.port}")
+    print(f"   Micro-batch: max {args.max_batch_size} instances / {args.max_wait_ms} ms")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,29 +9,214 @@ Description: This script trains a Random Forest classifier for welfare predictio
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import joblib
 import os
+import sys
 import json
-from sklearn.model_selection import train_test_split
+import math
+import hashlib
+import time
+import argparse
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.model_selection import GroupKFold, GroupShuffleSplit, ParameterGrid, StratifiedKFold, train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-from sklearn.tree import plot_tree
+from sklearn.metrics import accuracy_score
 import warnings
 warnings.filterwarnings('ignore')
 
-# Set style for better visualizations
-plt.style.use('default')
-sns.set_palette("husl")
+# Runtime library shared with the Streamlit app (streamlit/src)
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit')
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+from src.flat_forest import FlatForest
+from src.artifacts import forest_hash, save_artifact, sha256_file
+from src.atomic import atomic_file
+from src.columnar import columnar_dir, iter_table, read_metadata, read_table, table_columns
+from src.drift import training_reference
+from src.metrics import EvaluationAccumulator, format_report
+from src.panel import PanelStore, REGION, YEAR, panel_dir
+from src.profiling import NULL_TRACER, Tracer
+
+# Parameters used when no search is run
+DEFAULT_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 10,
+    'min_samples_split': 5,
+    'min_samples_leaf': 2,
+    'random_state': 42,
+    'n_jobs': -1,
+    'class_weight': 'balanced'  # Handle imbalanced classes
+}
+
+# Search space for --search; n_estimators is the successive-halving resource
+DEFAULT_PARAM_SPACE = {
+    'max_depth': [6, 10, 14, None],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4],
+    'max_features': ['sqrt', None],
+}
+
+LEADERBOARD_NAME = 'leaderboard.json'
+
+# Hold-out strategies: stratified random rows, or whole kabupaten/kota held out
+# (needs the (region, year) panel built by preprocessing/preprocessing.py)
+SPLITS = ('stratified', 'region')
+
+# Cross-validation schemes: whole regions per fold, forward-in-time (train on
+# earlier years, test on the next block of years), or plain stratified rows
+CV_SCHEMES = ('region', 'time', 'stratified')
+CV_RESULTS_NAME = 'cv_results.json'
+CV_CACHE_DIR = 'cv_cache'
+
+# Permutation importance on the held-out split: repeats per feature, cached
+# by model and data hash
+PERMUTATION_REPEATS = 10
+PERMUTATION_CACHE_DIR = 'permutation_cache'
+PERMUTATION_CONFIDENCE = 0.95
+
+# Held-out rows scored per predict_proba call in evaluate_model
+EVAL_CHUNK_SIZE = 65536
+
+# Rows per block read by load_and_prepare_data_chunked
+CHUNK_ROWS = 262144
+TARGET = 'kesejahteraan'
+
+# Figures are drawn by this separate stage so training never imports matplotlib
+RENDER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'render_figures.py')
+
+# Scaled fold arrays, installed once per search worker by _init_search_worker
+_SEARCH_FOLDS = None
+
+
+def _init_search_worker(folds):
+    global _SEARCH_FOLDS
+    _SEARCH_FOLDS = folds
+
+
+def _evaluate_candidate(params, n_estimators, n_jobs):
+    """
+    Fit one candidate on every pre-scaled fold (runs in a search worker)
+    """
+    accuracies, fit_times, batch_times, row_times = [], [], [], []
+    for X_tr, y_tr, X_val, y_val in _SEARCH_FOLDS:
+        model = RandomForestClassifier(**{**DEFAULT_PARAMS, **params,
+                                          'n_estimators': n_estimators, 'n_jobs': n_jobs})
+        start = time.perf_counter()
+        model.fit(X_tr, y_tr)
+        fit_times.append(time.perf_counter() - start)
+
+        # Predict single-threaded: joblib overhead would dominate these batch sizes
+        model.set_params(n_jobs=1)
+        start = time.perf_counter()
+        y_pred = model.predict(X_val)
+        batch_times.append((time.perf_counter() - start) / len(X_val))
+        accuracies.append(accuracy_score(y_val, y_pred))
+
+        start = time.perf_counter()
+        model.predict(X_val[:1])
+        row_times.append(time.perf_counter() - start)
+
+    return {
+        'params': params,
+        'n_estimators': n_estimators,
+        'mean_accuracy': float(np.mean(accuracies)),
+        'std_accuracy': float(np.std(accuracies)),
+        'fit_seconds': float(np.mean(fit_times)),
+        'predict_row_ms': float(np.mean(row_times) * 1e3),
+        'predict_batch_ms_per_row': float(np.mean(batch_times) * 1e3),
+    }
+
+
+# Full feature matrix and labels, installed once per CV worker by _init_cv_worker
+_CV_DATA = None
+
+
+def _init_cv_worker(X, y):
+    global _CV_DATA
+    _CV_DATA = (X, y)
+
+
+def _run_fold(fold, train_idx, test_idx, params, n_jobs, labels):
+    """
+    Scale, fit and score one CV fold (runs in a CV worker)
+    """
+    X, y = _CV_DATA
+    start = time.perf_counter()
+    scaler = StandardScaler().fit(X[train_idx])
+    model = RandomForestClassifier(**{**DEFAULT_PARAMS, **(params or {}), 'n_jobs': n_jobs})
+    model.fit(scaler.transform(X[train_idx]), y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # Every class gets a probability column even if the fold's training rows miss one
+    proba = np.zeros((len(test_idx), len(labels)))
+    proba[:, model.classes_] = model.predict_proba(scaler.transform(X[test_idx]))
+    predict_seconds = time.perf_counter() - start
+
+    metrics = EvaluationAccumulator(labels).update(y[test_idx], proba).result()
+    return {
+        'fold': fold,
+        'n_train': int(len(train_idx)),
+        'n_test': int(len(test_idx)),
+        'accuracy': metrics['accuracy'],
+        'macro_f1': metrics['classification_report']['macro avg']['f1-score'],
+        'top_2_accuracy': metrics['top_k_accuracy'].get('2'),
+        'log_loss': metrics['log_loss'],
+        'macro_roc_auc': metrics['macro_roc_auc'],
+        'fit_seconds': fit_seconds,
+        'predict_seconds': predict_seconds,
+    }
+
+
+# Held-out data for permutation importance, installed once per worker by
+# _init_permutation_worker; the buffer is the worker's own copy of X that
+# columns are shuffled into and restored in place
+_PERMUTATION_DATA = None
+
+
+def _init_permutation_worker(forest, X, y):
+    global _PERMUTATION_DATA
+    _PERMUTATION_DATA = (forest, X, y, X.copy())
+
+
+def _permutation_job(feature, repeat, seed):
+    """
+    Accuracy with one column shuffled (runs in a permutation worker)
+    """
+    forest, X, y, buffer = _PERMUTATION_DATA
+    rng = np.random.default_rng([seed, feature, repeat])
+    buffer[:, feature] = X[rng.permutation(len(X)), feature]
+    try:
+        accuracy = float((forest.predict_proba(buffer).argmax(axis=1) == y).mean())
+    finally:
+        buffer[:, feature] = X[:, feature]
+    return feature, repeat, accuracy
+
+
+def time_folds(years, n_folds):
+    """
+    Forward-in-time folds: the sorted years are cut into n_folds + 1 contiguous
+    blocks and fold k trains on blocks 0..k and tests on block k + 1
+    """
+    unique = np.unique(years)
+    if len(unique) < n_folds + 1:
+        raise ValueError(f"{len(unique)} years cannot form {n_folds} forward-in-time folds")
+    blocks = np.array_split(unique, n_folds + 1)
+    return [
+        (np.flatnonzero(years <= blocks[k][-1]), np.flatnonzero(np.isin(years, blocks[k + 1])))
+        for k in range(n_folds)
+    ]
+
 
 class RandomForestAnalyzer:
     """
     Comprehensive Random Forest Analyzer with visualization capabilities
     """
     
-    def __init__(self, data_path, model_save_path, metrics_save_path, img_dir):
+    def __init__(self, data_path, model_save_path, metrics_save_path, img_dir,
+                 artifact_dir=None, tracer=None, trace_path=None, split='stratified', panel_path=None):
         """
         Initialize the analyzer
         
@@ -40,31 +225,50 @@ class RandomForestAnalyzer:
             model_save_path (str): Where to save the model
             metrics_save_path (str): Where to save evaluation metrics
             img_dir (str): Directory to save visualization images
+            artifact_dir (str): Directory for the memory-mappable artifact
+                (default: the model path without its extension)
+            tracer (src.profiling.Tracer): Records per-stage timings/memory
+                (default: disabled, no overhead)
+            trace_path (str): Where run_complete_analysis writes the JSON trace
+            split (str): Hold-out strategy, one of SPLITS
+            panel_path (str): (region, year) panel used by region-aware splits
+                (default: dataset_panel/ next to the dataset)
         """
+        if split not in SPLITS:
+            raise ValueError(f"Unknown split '{split}', expected one of {SPLITS}")
         self.data_path = data_path
         self.model_save_path = model_save_path
+        self.artifact_dir = artifact_dir or os.path.splitext(model_save_path)[0]
         self.metrics_save_path = metrics_save_path
         self.img_dir = img_dir
         self.label_encoder = None
         self.scaler = None
         self.model = None
         self.mapping = {}
+        self.tracer = tracer or NULL_TRACER
+        self.trace_path = trace_path
+        self.split = split
+        self.panel_path = panel_path or panel_dir(data_path)
+        self.panel = None
+        # Region codes of the training rows (None for the stratified split)
+        self.groups_train = None
         
         # Create images directory if it doesn't exist
         os.makedirs(self.img_dir, exist_ok=True)
     
-    def load_and_prepare_data(self):
+    def load_data(self):
         """
-        Load and prepare the dataset for training
+        Read the dataset and encode the target
+
+        Returns:
+            tuple: (X DataFrame, encoded y)
         """
-        print("="*60)
-        print("LOADING AND PREPARING DATA")
-        print("="*60)
-        
-        if not os.path.exists(self.data_path):
+        if not os.path.exists(self.data_path) and not os.path.isdir(columnar_dir(self.data_path)):
             raise FileNotFoundError(f"Dataset tidak ditemukan di: {self.data_path}")
         
-        df = pd.read_csv(self.data_path)
+        # Columnar copy (downcast, memory-mapped) when present, else the CSV
+        with self.tracer.span('read_table'):
+            df = read_table(self.data_path)
         print(f"Data dimensi: {df.shape}")
         print(f"Jumlah fitur: {df.shape[1] - 1}")
         print(f"Target distribution:\n{df['kesejahteraan'].value_counts()}")
@@ -81,63 +285,402 @@ class RandomForestAnalyzer:
         self.mapping = {int(i): label for i, label in enumerate(self.label_encoder.classes_)}
         print(f"\nLabel mapping: {self.mapping}")
         
+        return X, y
+    
+    def load_and_prepare_data(self):
+        """
+        Load and prepare the dataset for training
+        """
+        print("="*60)
+        print("LOADING AND PREPARING DATA")
+        print("="*60)
+        
+        X, y = self.load_data()
+        
         # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
+        with self.tracer.span('split', strategy=self.split):
+            train_idx, test_idx = self.split_indices(y)
+            X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
+            y_train, y_test = y[train_idx], y[test_idx]
         
         print(f"Train set size: {X_train.shape[0]} ({X_train.shape[0]/len(X)*100:.1f}%)")
         print(f"Test set size: {X_test.shape[0]} ({X_test.shape[0]/len(X)*100:.1f}%)")
         
         return X_train, X_test, y_train, y_test, X.columns.tolist()
     
-    def train_model(self, X_train, y_train):
+    def split_indices(self, y):
+        """
+        Train/test row indices for self.split, computed from the labels (and
+        region groups) only so no feature rows are copied
+        """
+        rows = np.arange(len(y))
+        if self.split == 'region':
+            groups = self.load_region_groups(len(y))
+            train_idx, test_idx = next(
+                GroupShuffleSplit(n_splits=1, test_size=0.2, random_state=42).split(rows, y, groups)
+            )
+            self.groups_train = groups[train_idx]
+            held_out = sorted(self.panel.regions[c] for c in np.unique(groups[test_idx]))
+            print(f"Held-out regions ({len(held_out)}): {', '.join(held_out)}")
+            return train_idx, test_idx
+        # Same permutation train_test_split(X, y, ...) would apply to the rows
+        return train_test_split(rows, test_size=0.2, random_state=42, stratify=y)
+    
+    def load_and_prepare_data_chunked(self, chunk_rows=CHUNK_ROWS):
+        """
+        Out-of-core variant of load_and_prepare_data for datasets that do not
+        fit in memory twice
+
+        Pass 1 streams only the target column to encode labels and build the
+        split by index. Pass 2 streams the features in `chunk_rows` blocks with
+        downcast dtypes and scatters every row straight to its final place in
+        one float32 matrix (training rows first), updating the scaler with
+        `partial_fit` on the training rows. The training block is then scaled
+        in place, so peak memory stays close to one float32 copy of the data.
+
+        Returns:
+            tuple: (X_train scaled float32 view, X_test raw float32 view,
+                    y_train, y_test, feature_names); self.scaler is fitted
+        """
+        print("="*60)
+        print(f"LOADING AND PREPARING DATA (CHUNKED, {chunk_rows} rows per block)")
+        print("="*60)
+        
+        if not os.path.exists(self.data_path) and not os.path.isdir(columnar_dir(self.data_path)):
+            raise FileNotFoundError(f"Dataset tidak ditemukan di: {self.data_path}")
+        feature_names = [c for c in table_columns(self.data_path) if c != TARGET]
+        
+        # Pass 1: labels only
+        with self.tracer.span('read_target'):
+            label_ids, chunk_codes = {}, []
+            for chunk in iter_table(self.data_path, [TARGET], chunk_rows):
+                codes, uniques = pd.factorize(chunk[TARGET])
+                if (codes < 0).any():
+                    raise ValueError(f"Kolom target '{TARGET}' berisi nilai kosong")
+                lookup = np.array([label_ids.setdefault(label, len(label_ids)) for label in uniques])
+                chunk_codes.append(lookup[codes])
+            labels = sorted(label_ids)
+            # Discovery order -> sorted order, as LabelEncoder numbers the classes
+            remap = np.empty(len(labels), dtype=np.int64)
+            remap[[label_ids[label] for label in labels]] = np.arange(len(labels))
+            y = remap[np.concatenate(chunk_codes)].astype(np.int8 if len(labels) < 128 else np.int32)
+            del chunk_codes
+        self.label_encoder = LabelEncoder().fit(labels)
+        self.mapping = {int(i): str(label) for i, label in enumerate(self.label_encoder.classes_)}
+        n_rows = len(y)
+        print(f"Data dimensi: ({n_rows}, {len(feature_names) + 1})")
+        print(f"Target distribution: {dict(zip(labels, np.bincount(y, minlength=len(labels)).tolist()))}")
+        print(f"\nLabel mapping: {self.mapping}")
+        
+        with self.tracer.span('split', strategy=self.split):
+            train_idx, test_idx = self.split_indices(y)
+        n_train = len(train_idx)
+        position = np.empty(n_rows, dtype=np.int64)
+        position[train_idx] = np.arange(n_train)
+        position[test_idx] = n_train + np.arange(len(test_idx))
+        
+        # Pass 2: features, scattered into place; scaler statistics from training rows
+        X = np.empty((n_rows, len(feature_names)), dtype=np.float32)
+        self.scaler = StandardScaler()
+        with self.tracer.span('read_features', rows=n_rows):
+            start = 0
+            for chunk in iter_table(self.data_path, feature_names, chunk_rows):
+                block = chunk.to_numpy(dtype=np.float64)
+                dest = position[start:start + len(block)]
+                X[dest] = block
+                is_train = dest < n_train
+                if is_train.any():
+                    self.scaler.partial_fit(block[is_train])
+                start += len(block)
+        
+        # Scale the training block in place, one chunk of float64 temporaries at a time
+        with self.tracer.span('scale', rows=n_train):
+            for a in range(0, n_train, chunk_rows):
+                b = min(a + chunk_rows, n_train)
+                X[a:b] = (X[a:b] - self.scaler.mean_) / self.scaler.scale_
+        
+        print(f"Feature matrix: {X.nbytes / 2**20:.1f} MiB float32")
+        print(f"Train set size: {n_train} ({n_train/n_rows*100:.1f}%)")
+        print(f"Test set size: {len(test_idx)} ({len(test_idx)/n_rows*100:.1f}%)")
+        
+        return X[:n_train], X[n_train:], y[train_idx], y[test_idx], feature_names
+    
+    def load_region_groups(self, n_rows):
+        """
+        Region code of every dataset row, taken from the (region, year) panel
+        and aligned to the dataset through its source_row column
+        """
+        return self.load_panel(n_rows).aligned(REGION)
+    
+    def load_panel(self, n_rows):
+        """
+        The (region, year) panel, checked against the dataset it must align with
+        """
+        if self.panel is None:
+            self.panel = PanelStore.load(self.panel_path)
+        source_hash = self.panel.metadata.get('source_hash')
+        if source_hash and os.path.isfile(self.data_path) and source_hash != sha256_file(self.data_path):
+            raise ValueError(f"Panel at {self.panel_path} was built from a different dataset; "
+                             "re-run preprocessing/preprocessing.py")
+        if len(self.panel) != n_rows:
+            raise ValueError(f"Panel has {len(self.panel)} rows but the dataset has {n_rows}")
+        return self.panel
+    
+    def train_model(self, X_train, y_train, params=None, prescaled=False):
         """
         Train the Random Forest model with scaling
+
+        Args:
+            params (dict): Overrides for DEFAULT_PARAMS (e.g. the search result)
+            prescaled (bool): X_train was already scaled by self.scaler
+                (load_and_prepare_data_chunked); it is fitted on as-is
         """
         print("\n" + "="*60)
         print("TRAINING RANDOM FOREST MODEL")
         print("="*60)
         
         # Scale features
-        self.scaler = StandardScaler()
-        X_train_scaled = self.scaler.fit_transform(X_train)
+        if prescaled:
+            X_train_scaled = X_train
+        else:
+            self.scaler = StandardScaler()
+            with self.tracer.span('scale', rows=len(X_train)):
+                X_train_scaled = self.scaler.fit_transform(X_train)
         
         # Train Random Forest with optimized parameters
-        self.model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
-            min_samples_split=5,
-            min_samples_leaf=2,
-            random_state=42,
-            n_jobs=-1,
-            class_weight='balanced'  # Handle imbalanced classes
-        )
+        self.model = RandomForestClassifier(**{**DEFAULT_PARAMS, **(params or {})})
         
         print("Training model...")
-        self.model.fit(X_train_scaled, y_train)
+        with self.tracer.span('fit', n_estimators=self.model.n_estimators):
+            self.model.fit(X_train_scaled, y_train)
         
         # Calculate training accuracy
-        train_pred = self.model.predict(X_train_scaled)
-        train_acc = accuracy_score(y_train, train_pred)
+        with self.tracer.span('train_accuracy'):
+            train_pred = self.model.predict(X_train_scaled)
+            train_acc = accuracy_score(y_train, train_pred)
         print(f"Training accuracy: {train_acc:.4f}")
         
         return X_train_scaled
     
+    def search_hyperparameters(self, X_train, y_train, param_space=None, n_folds=3,
+                               min_estimators=25, max_estimators=200, eta=3, n_workers=None):
+        """
+        Successive-halving search over `param_space` with tree count as the resource
+
+        Every candidate starts with `min_estimators` trees; after each rung only
+        the best 1/eta (by mean CV accuracy) continue with eta times more trees,
+        up to `max_estimators`. Candidates run in a process pool and each forest
+        gets `n_jobs = cores // workers` so the machine is never oversubscribed.
+        The scaler is fitted once per fold and the scaled folds are shipped to
+        each worker once.
+
+        Returns:
+            dict: Best parameters (including n_estimators) for train_model
+        """
+        print("\n" + "="*60)
+        print("HYPERPARAMETER SEARCH (SUCCESSIVE HALVING)")
+        print("="*60)
+
+        X = np.asarray(X_train, dtype=np.float64)
+        y = np.asarray(y_train)
+        folds = []
+        for train_idx, val_idx in StratifiedKFold(n_folds, shuffle=True, random_state=42).split(X, y):
+            scaler = StandardScaler().fit(X[train_idx])
+            folds.append((scaler.transform(X[train_idx]), y[train_idx],
+                          scaler.transform(X[val_idx]), y[val_idx]))
+
+        candidates = list(ParameterGrid(param_space or DEFAULT_PARAM_SPACE))
+        cores = n_workers or os.cpu_count() or 1
+        n_estimators = min_estimators
+        leaderboard = []
+        rung = 0
+        print(f"{len(candidates)} candidates, {n_folds} folds, {cores} cores")
+
+        while True:
+            workers = max(1, min(len(candidates), cores))
+            n_jobs = max(1, cores // workers)
+            start = time.perf_counter()
+            if workers > 1:
+                with ProcessPoolExecutor(workers, initializer=_init_search_worker,
+                                         initargs=(folds,)) as pool:
+                    results = list(pool.map(_evaluate_candidate, candidates,
+                                            [n_estimators] * len(candidates),
+                                            [n_jobs] * len(candidates)))
+            else:
+                _init_search_worker(folds)
+                results = [_evaluate_candidate(c, n_estimators, n_jobs) for c in candidates]
+
+            # Highest accuracy first; faster fit breaks ties
+            results.sort(key=lambda r: (-r['mean_accuracy'], r['fit_seconds']))
+            for r in results:
+                r['rung'] = rung
+            leaderboard.extend(results)
+            print(f"Rung {rung}: {len(candidates)} candidates x {n_estimators} trees "
+                  f"({workers} workers x {n_jobs} jobs) in {time.perf_counter() - start:.1f}s, "
+                  f"best accuracy {results[0]['mean_accuracy']:.4f}")
+
+            if len(results) == 1 or n_estimators >= max_estimators:
+                break
+            candidates = [r['params'] for r in results[:max(1, math.ceil(len(results) / eta))]]
+            n_estimators = min(n_estimators * eta, max_estimators)
+            rung += 1
+
+        # Later rungs (more trees, survivors) rank above earlier ones
+        leaderboard.sort(key=lambda r: (-r['rung'], -r['mean_accuracy'], r['fit_seconds']))
+        for rank, r in enumerate(leaderboard, start=1):
+            r['rank'] = rank
+        self.save_leaderboard(leaderboard, {'n_folds': n_folds, 'eta': eta,
+                                            'min_estimators': min_estimators,
+                                            'max_estimators': max_estimators})
+
+        best = dict(leaderboard[0]['params'], n_estimators=leaderboard[0]['n_estimators'])
+        print(f"Best parameters: {best}")
+        return best
+
+    def save_leaderboard(self, leaderboard, settings):
+        """
+        Write the search leaderboard next to metrics.json
+        """
+        path = os.path.join(os.path.dirname(os.path.abspath(self.metrics_save_path)), LEADERBOARD_NAME)
+        with open(path, 'w') as f:
+            json.dump({'search': settings, 'leaderboard': leaderboard}, f, indent=4, default=str)
+        print(f"✓ Leaderboard saved to: {path}")
+
+    def cv_folds(self, X, y, scheme='region', n_folds=5):
+        """
+        Fold indices for `scheme`, cached on disk by dataset hash so repeated
+        runs skip the panel alignment and splitting
+
+        Returns:
+            list: (train_idx, test_idx) pairs
+        """
+        key_parts = {'scheme': scheme, 'n_folds': n_folds, 'n_rows': len(X), 'random_state': 42,
+                     'data_hash': sha256_file(self.data_path) if os.path.isfile(self.data_path) else None}
+        if scheme != 'stratified' and os.path.isdir(self.panel_path):
+            key_parts['panel'] = (read_metadata(self.panel_path) or {'metadata': {}})['metadata'].get('source_hash')
+        key = hashlib.sha256(json.dumps(key_parts, sort_keys=True).encode()).hexdigest()[:16]
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(self.metrics_save_path)), CV_CACHE_DIR)
+        cache_path = os.path.join(cache_dir, f'{scheme}-{n_folds}-{key}.npz')
+        if key_parts['data_hash'] and os.path.exists(cache_path):
+            with np.load(cache_path) as cached:
+                print(f"✓ Fold indices loaded from cache: {cache_path}")
+                return [(cached[f'train_{k}'], cached[f'test_{k}']) for k in range(n_folds)]
+
+        if scheme == 'region':
+            folds = list(GroupKFold(n_folds).split(X, y, self.load_region_groups(len(X))))
+        elif scheme == 'time':
+            folds = time_folds(self.load_panel(len(X)).aligned(YEAR), n_folds)
+        else:
+            folds = list(StratifiedKFold(n_folds, shuffle=True, random_state=42).split(X, y))
+
+        if key_parts['data_hash']:
+            os.makedirs(cache_dir, exist_ok=True)
+            arrays = {}
+            for k, (train_idx, test_idx) in enumerate(folds):
+                arrays[f'train_{k}'] = train_idx.astype(np.int32)
+                arrays[f'test_{k}'] = test_idx.astype(np.int32)
+            np.savez(cache_path, **arrays)
+        return folds
+
+    def cross_validate(self, scheme='region', n_folds=5, params=None, n_workers=None):
+        """
+        K-fold cross-validation with folds fitted concurrently
+
+        Folds run in a process pool of min(n_folds, cores) workers and each
+        forest gets `n_jobs = cores // workers`, so the machine is never
+        oversubscribed (few folds on many cores -> more threads per forest).
+        The full matrix is shipped to each worker once; tasks only carry indices.
+
+        Returns:
+            dict: Per-fold metrics/timings and their mean and std (also written
+            to cv_results.json next to metrics.json)
+        """
+        if scheme not in CV_SCHEMES:
+            raise ValueError(f"Unknown CV scheme '{scheme}', expected one of {CV_SCHEMES}")
+        print("="*60)
+        print(f"CROSS-VALIDATION ({scheme}, {n_folds} folds)")
+        print("="*60)
+
+        X_frame, y = self.load_data()
+        X = X_frame.to_numpy(dtype=np.float64)
+        y = np.asarray(y)
+        with self.tracer.span('cv_folds', scheme=scheme):
+            folds = self.cv_folds(X_frame, y, scheme, n_folds)
+        labels = list(self.label_encoder.classes_)
+
+        cores = n_workers or os.cpu_count() or 1
+        workers = max(1, min(len(folds), cores))
+        n_jobs = max(1, cores // workers)
+        args = [(k, train_idx, test_idx, params, n_jobs, labels) for k, (train_idx, test_idx) in enumerate(folds)]
+        start = time.perf_counter()
+        with self.tracer.span('cv_fit', folds=len(folds), workers=workers, n_jobs=n_jobs):
+            if workers > 1:
+                with ProcessPoolExecutor(workers, initializer=_init_cv_worker, initargs=(X, y)) as pool:
+                    fold_results = list(pool.map(_run_fold, *zip(*args)))
+            else:
+                _init_cv_worker(X, y)
+                fold_results = [_run_fold(*a) for a in args]
+        wall_seconds = time.perf_counter() - start
+
+        # What each fold held out, in terms a reader can check
+        if scheme != 'stratified':
+            panel = self.load_panel(len(X))
+            regions, years = panel.aligned(REGION), panel.aligned(YEAR)
+            for result, (_, test_idx) in zip(fold_results, folds):
+                if scheme == 'region':
+                    result['test_regions'] = sorted(panel.regions[c] for c in np.unique(regions[test_idx]))
+                else:
+                    result['test_years'] = [int(v) for v in np.unique(years[test_idx])]
+
+        summary = {}
+        for name in ('accuracy', 'macro_f1', 'top_2_accuracy', 'log_loss', 'macro_roc_auc',
+                     'fit_seconds', 'predict_seconds'):
+            values = np.array([r[name] for r in fold_results if r[name] is not None], dtype=np.float64)
+            summary[name] = {'mean': float(values.mean()), 'std': float(values.std())} if len(values) else None
+
+        results = {
+            'scheme': scheme,
+            'n_folds': len(folds),
+            'params': {**DEFAULT_PARAMS, **(params or {})},
+            'workers': workers,
+            'n_jobs_per_forest': n_jobs,
+            'wall_seconds': wall_seconds,
+            'summary': summary,
+            'folds': fold_results,
+        }
+        for r in fold_results:
+            held_out = r.get('test_regions') or r.get('test_years') or ''
+            print(f"  fold {r['fold']}: accuracy {r['accuracy']:.4f}, macro F1 {r['macro_f1']:.4f}, "
+                  f"fit {r['fit_seconds']:.2f}s ({r['n_train']}/{r['n_test']} rows) {held_out}")
+        print(f"Accuracy: {summary['accuracy']['mean']:.4f} ± {summary['accuracy']['std']:.4f}, "
+              f"macro F1: {summary['macro_f1']['mean']:.4f} ± {summary['macro_f1']['std']:.4f} "
+              f"({workers} workers x {n_jobs} jobs, {wall_seconds:.1f}s)")
+
+        path = os.path.join(os.path.dirname(os.path.abspath(self.metrics_save_path)), CV_RESULTS_NAME)
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=4, default=str)
+        print(f"✓ CV results saved to: {path}")
+        return results
+
     def evaluate_model(self, X_test, y_test, feature_names):
         """
-        Evaluate the model and create visualizations
+        Evaluate the model; figure inputs are stored in the metrics
         """
         print("\n" + "="*60)
         print("EVALUATING MODEL")
         print("="*60)
         
-        # Transform test data
-        X_test_scaled = self.scaler.transform(X_test)
-        
-        # Make predictions
-        y_pred = self.model.predict(X_test_scaled)
-        accuracy = accuracy_score(y_test, y_pred)
+        # One predict_proba per chunk feeds every metric (confusion matrix,
+        # report, top-k, log loss, AUC); memory stays bounded by the chunk
+        labels = list(self.label_encoder.classes_)
+        evaluation = EvaluationAccumulator(labels)
+        y_test = np.asarray(y_test)
+        for start in range(0, len(y_test), EVAL_CHUNK_SIZE):
+            X_chunk = self.scaler.transform(X_test[start:start + EVAL_CHUNK_SIZE])
+            evaluation.update(y_test[start:start + EVAL_CHUNK_SIZE], self.model.predict_proba(X_chunk))
+        metrics = evaluation.result()
+        metrics['split'] = self.split
+        accuracy = metrics['accuracy']
         
         print(f"Test Accuracy: {accuracy:.4f}")
         
@@ -147,144 +690,125 @@ class RandomForestAnalyzer:
             print("⚠️  Akurasi model di bawah target (< 0.75)")
             print(f"   Pertimbangkan untuk menyesuaikan parameter model")
         
-        # Generate detailed classification report
-        report = classification_report(
-            y_test, 
-            y_pred, 
-            target_names=self.label_encoder.classes_,
-            output_dict=True
-        )
-        
         print(f"\nClassification Report:")
-        print(classification_report(y_test, y_pred, target_names=self.label_encoder.classes_))
-        
-        # Create visualizations
-        self.create_visualizations(
-            y_test, y_pred, feature_names, X_test_scaled
-        )
+        print(format_report(metrics['classification_report'], labels))
+        print(f"Top-k accuracy: {metrics['top_k_accuracy']}, log loss: {metrics['log_loss']:.4f}")
         
-        return {
-            'accuracy': accuracy,
-            'classification_report': report
-        }
+        metrics['feature_importance'] = dict(zip(feature_names, self.model.feature_importances_.tolist()))
+        return metrics
     
-    def create_visualizations(self, y_test, y_pred, feature_names, X_test_scaled):
+    def permutation_importance(self, X_test, y_test, feature_names, n_repeats=PERMUTATION_REPEATS,
+                               n_workers=None, random_state=42):
         """
-        Create comprehensive visualizations for model evaluation
+        Permutation importance on the held-out split: the drop in accuracy when
+        one feature's column is shuffled, over `n_repeats` shuffles
+
+        The model is packed once into a FlatForest (scaler folded in, so raw
+        rows are scored without a transform) and the baseline prediction is
+        made once. (feature, repeat) jobs are spread over a process pool; each
+        worker gets the data once and shuffles columns into its own
+        preallocated buffer, restoring them after scoring. Every job seeds its
+        own generator from (random_state, feature, repeat), so results do not
+        depend on scheduling. Results are cached on disk by model and data hash.
+
+        Returns:
+            dict: Baseline accuracy and per-feature mean/std drop with a
+            PERMUTATION_CONFIDENCE t-interval (stored in metrics.json)
         """
+        from scipy import stats
+
         print("\n" + "="*60)
-        print("CREATING VISUALIZATIONS")
+        print(f"PERMUTATION IMPORTANCE ({n_repeats} repeats, held-out set)")
         print("="*60)
-        
-        # 1. Confusion Matrix
-        print("Creating Confusion Matrix...")
-        cm = confusion_matrix(y_test, y_pred)
-        plt.figure(figsize=(10, 8))
-        sns.heatmap(
-            cm, 
-            annot=True, 
-            fmt='d', 
-            cmap='Blues',
-            xticklabels=self.label_encoder.classes_,
-            yticklabels=self.label_encoder.classes_
-        )
-        plt.title('Confusion Matrix - Random Forest Classifier', fontsize=16, pad=20)
-        plt.ylabel('Actual Label', fontsize=12)
-        plt.xlabel('Predicted Label', fontsize=12)
-        plt.tight_layout()
-        cm_path = os.path.join(self.img_dir, 'confusion_matrix.png')
-        plt.savefig(cm_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"  ✓ Saved to: {cm_path}")
-        
-        # 2. Feature Importance
-        print("Creating Feature Importance Plot...")
-        importances = self.model.feature_importances_
-        indices = np.argsort(importances)[::-1]
-        
-        plt.figure(figsize=(12, 8))
-        plt.title('Feature Importance - Random Forest Classifier', fontsize=16, pad=20)
-        bars = plt.barh(range(len(indices)), importances[indices], align="center", alpha=0.8)
-        
-        # Color bars differently for better aesthetics
-        colors = plt.cm.viridis(np.linspace(0, 1, len(indices)))
-        for bar, color in zip(bars, colors):
-            bar.set_color(color)
-            
-        plt.yticks(range(len(indices)), [feature_names[i] for i in indices])
-        plt.gca().invert_yaxis()
-        plt.xlabel('Importance Score', fontsize=12)
-        plt.tight_layout()
-        fi_path = os.path.join(self.img_dir, 'feature_importance.png')
-        plt.savefig(fi_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"  ✓ Saved to: {fi_path}")
-        
-        # 3. Individual Tree Visualization (first tree in the forest)
-        print("Creating Tree Visualization...")
-        fig, ax = plt.subplots(figsize=(20, 12))
-        
-        # Plot the first decision tree from the forest
-        plot_tree(
-            self.model.estimators_[0],
-            max_depth=3,  # Limit depth for readability
-            feature_names=feature_names,
-            class_names=self.label_encoder.classes_,
-            filled=True,
-            rounded=True,
-            fontsize=10
-        )
-        plt.title('Decision Tree Visualization (First Tree)', fontsize=16, pad=20)
-        plt.tight_layout()
-        tree_path = os.path.join(self.img_dir, 'decision_tree_viz.png')
-        plt.savefig(tree_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"  ✓ Saved to: {tree_path}")
-        
-        # 4. Model Performance Summary
-        print("Creating Performance Summary...")
-        report = classification_report(y_test, y_pred, output_dict=True)
-
-        # Exclude 'accuracy', 'macro avg', 'weighted avg' from class names
-        classes = [cls for cls in self.label_encoder.classes_ if cls in report]
-        precision_scores = [report[cls]['precision'] for cls in classes]
-        recall_scores = [report[cls]['recall'] for cls in classes]
-        f1_scores = [report[cls]['f1-score'] for cls in classes]
-
-        # Create grouped bar chart
-        x = np.arange(len(classes))
-        width = 0.25
-
-        fig, ax = plt.subplots(figsize=(12, 8))
-        ax.bar(x - width, precision_scores, width, label='Precision', alpha=0.8)
-        ax.bar(x, recall_scores, width, label='Recall', alpha=0.8)
-        ax.bar(x + width, f1_scores, width, label='F1-Score', alpha=0.8)
-
-        ax.set_xlabel('Classes')
-        ax.set_ylabel('Score')
-        ax.set_title('Model Performance Metrics by Class', fontsize=16, pad=20)
-        ax.set_xticks(x)
-        ax.set_xticklabels(classes, rotation=45, ha='right')
-        ax.legend()
-        ax.grid(axis='y', alpha=0.3)
-
-        # Set y-axis limits to ensure readability
-        ax.set_ylim([0, 1.1])
-
-        plt.tight_layout()
-        perf_path = os.path.join(self.img_dir, 'performance_metrics.png')
-        plt.savefig(perf_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"  ✓ Saved to: {perf_path}")
-    
-    def save_model_and_metrics(self, metrics, feature_names):
+
+        forest = FlatForest.from_sklearn(self.model, self.scaler, feature_names=feature_names)
+        X = np.ascontiguousarray(X_test, dtype=np.float64)
+        y = np.searchsorted(forest.classes, np.asarray(y_test))
+
+        digest = hashlib.sha256()
+        for part in (forest_hash(forest).encode(), X.tobytes(), y.astype(np.int64).tobytes(),
+                     json.dumps([feature_names, n_repeats, random_state, PERMUTATION_CONFIDENCE]).encode()):
+            digest.update(part)
+        key = digest.hexdigest()[:16]
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(self.metrics_save_path)), PERMUTATION_CACHE_DIR)
+        cache_path = os.path.join(cache_dir, f'{key}.json')
+        if os.path.exists(cache_path):
+            with open(cache_path) as f:
+                result = json.load(f)
+            print(f"✓ Permutation importance loaded from cache: {cache_path}")
+            return result
+
+        start = time.perf_counter()
+        baseline = float((forest.predict_proba(X).argmax(axis=1) == y).mean())
+        jobs = [(j, r, random_state) for j in range(X.shape[1]) for r in range(n_repeats)]
+        workers = max(1, min(len(jobs), n_workers or os.cpu_count() or 1))
+        with self.tracer.span('permutation_jobs', jobs=len(jobs), workers=workers):
+            if workers > 1:
+                with ProcessPoolExecutor(workers, initializer=_init_permutation_worker,
+                                         initargs=(forest, X, y)) as pool:
+                    outcomes = list(pool.map(_permutation_job, *zip(*jobs),
+                                             chunksize=max(1, len(jobs) // (4 * workers))))
+            else:
+                _init_permutation_worker(forest, X, y)
+                outcomes = [_permutation_job(*job) for job in jobs]
+
+        drops = np.empty((X.shape[1], n_repeats))
+        for feature, repeat, accuracy in outcomes:
+            drops[feature, repeat] = baseline - accuracy
+        mean = drops.mean(axis=1)
+        std = drops.std(axis=1, ddof=1) if n_repeats > 1 else np.zeros(len(mean))
+        half_width = (stats.t.ppf(0.5 + PERMUTATION_CONFIDENCE / 2, n_repeats - 1) * std / np.sqrt(n_repeats)
+                      if n_repeats > 1 else np.zeros(len(mean)))
+        result = {
+            'metric': 'accuracy',
+            'n_repeats': n_repeats,
+            'n_rows': int(len(y)),
+            'baseline': baseline,
+            'confidence': PERMUTATION_CONFIDENCE,
+            'workers': workers,
+            'seconds': time.perf_counter() - start,
+            'model_hash': forest_hash(forest),
+            'features': {
+                name: {'mean': float(mean[j]), 'std': float(std[j]),
+                       'ci_low': float(mean[j] - half_width[j]), 'ci_high': float(mean[j] + half_width[j])}
+                for j, name in enumerate(feature_names)
+            },
+        }
+        os.makedirs(cache_dir, exist_ok=True)
+        with atomic_file(cache_path) as tmp_path:
+            with open(tmp_path, 'w') as f:
+                json.dump(result, f, indent=4)
+
+        for name, r in sorted(result['features'].items(), key=lambda item: -item[1]['mean']):
+            print(f"  {name:<32} {r['mean']:+.4f}  [{r['ci_low']:+.4f}, {r['ci_high']:+.4f}]")
+        print(f"Baseline accuracy {baseline:.4f}; {len(jobs)} jobs on {workers} workers "
+              f"in {result['seconds']:.2f}s")
+        return result
+
+    def save_model_and_metrics(self, metrics, feature_names, X_train=None, y_train=None, prescaled=False):
         """
         Save the trained model and evaluation metrics
+
+        Args:
+            X_train, y_train: Training split; when given, a snapshot of its
+                feature and class distributions is stored in the metrics
+                (`drift_reference`) for the dashboard's drift monitor
+            prescaled (bool): X_train is already scaled by self.scaler
         """
         print("\n" + "="*60)
         print("SAVING MODEL AND METRICS")
         print("="*60)
 
+        if X_train is not None:
+            with self.tracer.span('drift_reference'):
+                metrics['drift_reference'] = training_reference(
+                    X_train,
+                    np.asarray([self.mapping[i] for i in range(len(self.mapping))])[np.asarray(y_train)],
+                    feature_names,
+                    scaler=self.scaler if prescaled else None,
+                    source=os.path.basename(self.data_path)
+                )
+
         # Create artifacts dictionary
         artifacts = {
             'model': self.model,
@@ -293,33 +817,122 @@ class RandomForestAnalyzer:
             'features': feature_names
         }
 
-        # Save model artifacts
-        joblib.dump(artifacts, self.model_save_path)
+        # Save model artifacts (atomically: the dashboard hot-reloads these files)
+        with self.tracer.span('joblib_dump'), atomic_file(self.model_save_path) as tmp_path:
+            joblib.dump(artifacts, tmp_path)
         print(f"✓ Model saved to: {os.path.abspath(self.model_save_path)}")
 
+        # Export memory-mappable artifact (manifest + .npy node arrays)
+        with self.tracer.span('export_artifact'):
+            self.export_artifact(feature_names)
+
         # Save metrics
-        with open(self.metrics_save_path, 'w') as f:
-            json.dump(metrics, f, indent=4)
+        with self.tracer.span('write_metrics'), atomic_file(self.metrics_save_path) as tmp_path:
+            with open(tmp_path, 'w') as f:
+                json.dump(metrics, f, indent=4)
         print(f"✓ Metrics saved to: {os.path.abspath(self.metrics_save_path)}")
     
-    def run_complete_analysis(self):
+    def export_artifact(self, feature_names):
+        """
+        Pack all trees into contiguous NumPy node arrays (FlatForest) and write
+        them with a JSON manifest as a versioned, memory-mappable artifact
+        """
+        flat = FlatForest.from_sklearn(
+            self.model,
+            self.scaler,
+            feature_names=feature_names,
+            class_labels=[self.mapping[int(c)] for c in self.model.classes_]
+        )
+        manifest = save_artifact(
+            self.artifact_dir,
+            flat,
+            self.scaler,
+            self.mapping,
+            feature_names,
+            hyperparameters=self.model.get_params(),
+            data_hash=sha256_file(self.data_path) if os.path.isfile(self.data_path) else None
+        )
+        print(f"✓ Artifact saved to: {os.path.abspath(self.artifact_dir)} "
+              f"(version {manifest['model_version']}, {len(flat.feature)} nodes, {flat.n_trees} trees)")
+        return manifest
+    
+    def render_figures(self, wait=False):
+        """
+        Render evaluation figures from the saved metrics and artifact in a
+        separate process (render_figures.py), off the training critical path
+        """
+        cmd = [
+            sys.executable, RENDER_SCRIPT,
+            '--metrics', os.path.abspath(self.metrics_save_path),
+            '--artifact', os.path.abspath(self.artifact_dir),
+            '--model', os.path.abspath(self.model_save_path),
+            '--img-dir', os.path.abspath(self.img_dir)
+        ]
+        process = subprocess.Popen(cmd)
+        if wait:
+            process.wait()
+        else:
+            print(f"✓ Rendering figures in the background (pid {process.pid})")
+        return process
+
+    def run_complete_analysis(self, search=False, param_space=None, n_workers=None, render=True,
+                              chunk_rows=None, permutation_repeats=PERMUTATION_REPEATS):
         """
         Run the complete analysis pipeline
+
+        Args:
+            search (bool): Tune hyperparameters with search_hyperparameters first
+            param_space (dict): Search space (default: DEFAULT_PARAM_SPACE)
+            n_workers (int): Cores for the search (default: all)
+            render (bool): Start the figure rendering stage after saving
+            chunk_rows (int): Load out-of-core in blocks of this many rows
+                (load_and_prepare_data_chunked) instead of in memory
+            permutation_repeats (int): Shuffles per feature for the held-out
+                permutation importance (0 skips it)
         """
         print("🚀 STARTING RANDOM FOREST ANALYSIS PIPELINE")
         print("="*60)
         
-        # Step 1: Load and prepare data
-        X_train, X_test, y_train, y_test, feature_names = self.load_and_prepare_data()
+        tracer = self.tracer
         
-        # Step 2: Train model
-        X_train_scaled = self.train_model(X_train, y_train)
+        # Step 1: Load and prepare data
+        with tracer.span('load_and_prepare_data'):
+            if chunk_rows:
+                X_train, X_test, y_train, y_test, feature_names = self.load_and_prepare_data_chunked(chunk_rows)
+            else:
+                X_train, X_test, y_train, y_test, feature_names = self.load_and_prepare_data()
+        
+        # Step 2: Train model (optionally with searched parameters)
+        params = None
+        if search:
+            with tracer.span('search_hyperparameters'):
+                params = self.search_hyperparameters(X_train, y_train, param_space, n_workers=n_workers)
+        with tracer.span('train_model', rows=len(X_train)):
+            X_train_scaled = self.train_model(X_train, y_train, params, prescaled=bool(chunk_rows))
         
         # Step 3: Evaluate model
-        metrics = self.evaluate_model(X_test, y_test, feature_names)
+        with tracer.span('evaluate_model', rows=len(X_test)):
+            metrics = self.evaluate_model(X_test, y_test, feature_names)
+        if permutation_repeats:
+            with tracer.span('permutation_importance', repeats=permutation_repeats):
+                metrics['permutation_importance'] = self.permutation_importance(
+                    X_test, y_test, feature_names, permutation_repeats, n_workers=n_workers
+                )
         
         # Step 4: Save model and metrics
-        self.save_model_and_metrics(metrics, feature_names)
+        with tracer.span('save_model_and_metrics'):
+            self.save_model_and_metrics(metrics, feature_names, X_train, y_train, prescaled=bool(chunk_rows))
+        
+        # Step 5: Figures, rendered by a separate process
+        if render:
+            with tracer.span('render_figures'):
+                self.render_figures()
+        
+        if tracer.enabled:
+            print("\nStage timings:")
+            print(tracer.summary())
+            if self.trace_path:
+                print(f"✓ Trace saved to: {os.path.abspath(tracer.save(self.trace_path))}")
         
         print("\n" + "="*60)
         print("🎉 ANALYSIS COMPLETED SUCCESSFULLY!")
@@ -338,6 +951,34 @@ def main():
     """
     Main execution function
     """
+    parser = argparse.ArgumentParser(description='Train the welfare Random Forest')
+    parser.add_argument('--search', action='store_true',
+                        help='tune hyperparameters with successive halving before training')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='cores for the search / CV / permutation importance (default: all)')
+    parser.add_argument('--split', choices=SPLITS, default='stratified',
+                        help="hold-out rows at random (stratified) or whole regions (region)")
+    parser.add_argument('--cv', choices=CV_SCHEMES, default=None,
+                        help='only cross-validate (by region, forward in time, or stratified); no model is saved')
+    parser.add_argument('--folds', type=int, default=5, help='number of CV folds')
+    parser.add_argument('--chunk-rows', type=int, default=None,
+                        help='stream the dataset in blocks of this many rows into one float32 matrix '
+                             '(for datasets too large to hold twice in memory)')
+    parser.add_argument('--permutation-repeats', type=int, default=PERMUTATION_REPEATS,
+                        help='shuffles per feature for held-out permutation importance (0: skip)')
+    parser.add_argument('--no-figures', action='store_true',
+                        help='skip the figure stage (run render_figures.py later)')
+    parser.add_argument('--trace', default=None, metavar='PATH',
+                        help='record per-stage wall/CPU time and peak RSS to a JSON trace')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='also record the tracemalloc peak per stage (slower)')
+    parser.add_argument('--profile-dir', default=None,
+                        help='dump a cProfile .prof file per top-level stage (implies tracing)')
+    args = parser.parse_args()
+    tracer = None
+    if args.trace or args.trace_memory or args.profile_dir:
+        tracer = Tracer(trace_memory=args.trace_memory, profile_dir=args.profile_dir)
+
     # Configuration
     DATA_PATH = '../preprocessing/dataset_preprocessed.csv'
     MODEL_PATH = 'rf_model_kesejahteraan.pkl'
@@ -349,11 +990,24 @@ def main():
         data_path=DATA_PATH,
         model_save_path=MODEL_PATH,
         metrics_save_path=METRICS_PATH,
-        img_dir=IMG_DIR
+        img_dir=IMG_DIR,
+        tracer=tracer,
+        split=args.split,
+        trace_path=args.trace or (os.path.join(args.profile_dir, 'trace.json') if args.profile_dir else None)
     )
     
+    if args.cv:
+        analyzer.cross_validate(args.cv, n_folds=args.folds, n_workers=args.workers)
+        if tracer is not None:
+            print(tracer.summary())
+            if analyzer.trace_path:
+                tracer.save(analyzer.trace_path)
+        return
+    
     # Run complete analysis
-    results = analyzer.run_complete_analysis()
+    results = analyzer.run_complete_analysis(search=args.search, n_workers=args.workers,
+                                           render=not args.no_figures, chunk_rows=args.chunk_rows,
+                                           permutation_repeats=args.permutation_repeats)
     
     print(f"\n📊 FINAL RESULTS:")
     print(f"   Model Accuracy: {results['accuracy']:.4f}")
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Ingestion Data Mentah BPS Jawa Barat
+Description: Rebuilds the joined indicator table behind dataset_final.csv from
+             the six raw BPS open-data sources in dataset/dataset_awal.
+
+Setiap sumber dibaca langsung dari CSV di dalam zip opendata.jabarprov.go.id
+(tanpa ekstraksi); file xlsx hanya dipakai jika CSV tidak tersedia karena
+parsing openpyxl jauh lebih lambat. Sumber yang berubah di-parse paralel di
+worker process, sedangkan sumber yang hash isinya sama dengan run sebelumnya
+dibaca dari cache columnar. Hasil join per (nama_kabupaten_kota, tahun)
+ditulis sebagai tabel columnar (dan opsional CSV).
+
+Kolom yang juga ada di dataset_final.csv dibentuk persis seperti di
+spreadsheet asalnya, termasuk `skor` dan label `kesejahteraan`, sehingga
+hasilnya bisa langsung dipakai preprocessing.py (`--from-raw`).
+
+Usage:
+    python ingest.py [--raw-dir DIR] [--output DIR] [--csv PATH] [--workers N] [--force]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit')
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+from src.artifacts import sha256_file
+from src.columnar import downcast_frame, read_columnar, read_metadata, write_columnar
+from src.logic import LABEL_KATEGORI
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_DIR = os.path.join(BASE_DIR, '../dataset/dataset_awal')
+OUTPUT_DIR = os.path.join(BASE_DIR, '../dataset/dataset_akhir/dataset_ingested')
+CACHE_DIR = os.path.join(BASE_DIR, '../dataset/dataset_akhir/ingest_cache')
+
+KEYS = ['nama_kabupaten_kota', 'tahun']
+# Urutan baris dataset_final.csv: per tahun, lalu kode BPS kab/kota
+ORDER = ['tahun', 'kode_kabupaten_kota']
+# Naikkan jika kolom hasil parse_source berubah agar cache lama tidak dipakai
+PARSER_VERSION = 2
+
+# kolom output: (id dataset BPS, kolom nilai di sumber, faktor pengali satuan)
+SOURCES = {
+    'jumlah_penduduk': ('20495', 'jumlah_penduduk', 1000),                    # RIBU ORANG -> jiwa
+    'jumlah_penduduk_miskin': ('16425', 'jumlah_penduduk_miskin', 1000),      # RIBU JIWA -> jiwa
+    'persentase_penduduk_miskin': ('17058', 'persentase_penduduk_miskin', 1), # PERSEN
+    'tingkat_pengangguran_terbuka': ('17044', 'tingkat_pengangguran_terbuka', 1),  # PERSEN
+    'pdrb_total_adhk': ('17069', 'pdrb_adhk', 1_000_000),                     # skala sama dengan dataset_final.csv
+    'harapan_lama_sekolah': ('17052', 'harapan_lama_sekolah', 1),             # TAHUN
+}
+
+# Sumber yang tidak lengkap untuk semua (kab/kota, tahun) di-left-join (NaN
+# diisi median saat preprocessing); sisanya menentukan baris output.
+# TPT Pangandaran baru tersedia beberapa tahun setelah pemekaran.
+OPTIONAL_SOURCES = {'tingkat_pengangguran_terbuka'}
+
+# Skor pendidikan 1-4 dari harapan lama sekolah (tahun), batas kanan inklusif:
+# <=7 -> 1, <=9 -> 2, <=12 -> 3, >12 -> 4 (sesuai skor di dataset_final.csv).
+# HLS yang tidak tersedia (Pangandaran 2010-2012) mendapat skor 1.
+HLS_BINS = np.array([7.0, 9.0, 12.0])
+
+# PDRB >= 1e11 tercatat di dataset_final.csv dengan 3 angka penting (format
+# ekspor spreadsheet); skor tetap dihitung dari nilai utuhnya
+PDRB_EXPORT_LIMIT = 1e11
+PDRB_EXPORT_DIGITS = 3
+
+# Rumus skor spreadsheet dataset_final.csv (bukan rumus manual app di
+# src/logic.py): 2 per miliar PDRB, 2 per skor pendidikan, dikurangi
+# penduduk miskin / 60.000 dan pengangguran / 20.000
+SKOR_PDRB = 2 / 1e9
+SKOR_PENDIDIKAN = 2
+SKOR_MISKIN = 1 / 60_000
+SKOR_PENGANGGURAN = 1 / 20_000
+# Batas bawah label kesejahteraan (urutan src.logic.LABEL_KATEGORI)
+BATAS_KESEJAHTERAAN = np.array([40.0, 56.0, 72.0, 88.0])
+
+# Kolom dataset_final.csv, dalam urutannya
+FINAL_COLUMNS = [
+    'kode_provinsi', 'nama_provinsi', 'nama_kabupaten_kota', 'jumlah_penduduk', 'jumlah_penduduk_miskin',
+    'jumlah_pengangguran_terbuka', 'pdrb_total_adhk', 'harapan_lama_sekolah', 'tahun', 'skor', 'kesejahteraan',
+]
+
+
+def find_source(raw_dir, dataset_id):
+    """Path sumber untuk satu dataset: zip CSV jika ada, jika tidak xlsx"""
+    zips = sorted(glob.glob(os.path.join(raw_dir, f'*_od_{dataset_id}_*csv.zip')))
+    if zips:
+        return zips[0]
+    xlsx = sorted(glob.glob(os.path.join(raw_dir, f'bps-od_{dataset_id}_*.xlsx')))
+    if xlsx:
+        return xlsx[0]
+    raise FileNotFoundError(f"Sumber BPS {dataset_id} tidak ditemukan di: {raw_dir}")
+
+
+def normalize_region(names):
+    """'KABUPATEN BOGOR' -> 'BOGOR', 'KOTA BOGOR' tetap (konvensi dataset_final.csv)"""
+    return names.str.strip().str.upper().str.replace(r'^KABUPATEN\s+', '', regex=True)
+
+
+def parse_source(output_col, path):
+    """
+    Parse satu sumber menjadi DataFrame (kode_provinsi, nama_provinsi,
+    kode_kabupaten_kota, nama_kabupaten_kota, tahun, <output_col>), urutan
+    baris seperti di file. Dijalankan di worker process.
+    """
+    _, value_col, factor = SOURCES[output_col]
+    usecols = ['kode_provinsi', 'nama_provinsi', 'kode_kabupaten_kota', 'nama_kabupaten_kota', value_col, 'tahun']
+
+    if path.endswith('.zip'):
+        with zipfile.ZipFile(path) as zf:
+            member = next(n for n in zf.namelist() if n.endswith('_data.csv'))
+            with zf.open(member) as handle:
+                df = pd.read_csv(handle, usecols=usecols)
+    else:
+        df = pd.read_excel(path, engine='openpyxl', usecols=usecols)
+
+    df['nama_kabupaten_kota'] = normalize_region(df['nama_kabupaten_kota'])
+    df = df.rename(columns={value_col: output_col})
+    if factor != 1:
+        # Satuan ribuan/miliar -> nilai utuh (jiwa, rupiah)
+        df[output_col] = (df[output_col] * factor).round()
+    return downcast_frame(df)
+
+
+def _parse_timed(output_col, path):
+    start = time.perf_counter()
+    df = parse_source(output_col, path)
+    return df, time.perf_counter() - start
+
+
+def load_sources(raw_dir=RAW_DIR, cache_dir=CACHE_DIR, workers=None, force=False):
+    """
+    Memuat semua sumber, memakai cache columnar per sumber jika hash isinya
+    tidak berubah dan mem-parse sisanya secara paralel.
+
+    Returns:
+        (dict nama_kolom -> DataFrame, dict statistik per sumber)
+    """
+    frames, stats, dirty = {}, {}, {}
+    for output_col, (dataset_id, _, _) in SOURCES.items():
+        path = find_source(raw_dir, dataset_id)
+        source_hash = sha256_file(path)
+        cache_path = os.path.join(cache_dir, output_col)
+        meta = read_metadata(cache_path)
+        if (not force and meta and meta['metadata'].get('source_hash') == source_hash
+                and meta['metadata'].get('parser_version') == PARSER_VERSION):
+            frames[output_col] = read_columnar(cache_path, mmap_mode=None)
+            stats[output_col] = {'source': os.path.basename(path), 'cached': True}
+        else:
+            dirty[output_col] = (path, source_hash)
+
+    if dirty:
+        max_workers = min(len(dirty), workers or os.cpu_count() or 1)
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = {col: pool.submit(_parse_timed, col, path) for col, (path, _) in dirty.items()}
+                parsed = {col: fut.result() for col, fut in futures.items()}
+        else:
+            parsed = {col: _parse_timed(col, path) for col, (path, _) in dirty.items()}
+
+        for col, (df, elapsed) in parsed.items():
+            path, source_hash = dirty[col]
+            write_columnar(df, os.path.join(cache_dir, col),
+                           metadata={'source': os.path.basename(path), 'source_hash': source_hash,
+                                     'parser_version': PARSER_VERSION})
+            frames[col] = df
+            stats[col] = {'source': os.path.basename(path), 'cached': False, 'parse_seconds': elapsed}
+
+    return frames, stats
+
+
+def join_sources(frames):
+    """
+    Join semua indikator pada (nama_kabupaten_kota, tahun): inner join antar
+    sumber wajib, left join untuk OPTIONAL_SOURCES. Baris diurutkan seperti
+    dataset_final.csv. Nilai mentah PDRB dan HLS tetap ada sebagai
+    `pdrb_adhk` dan `harapan_lama_sekolah_tahun`.
+    """
+    first, *rest = SOURCES
+    df = frames[first]
+    for col in sorted(rest, key=lambda c: c in OPTIONAL_SOURCES):
+        how = 'left' if col in OPTIONAL_SOURCES else 'inner'
+        df = df.merge(frames[col][KEYS + [col]], on=KEYS, how=how)
+    df = df.sort_values(ORDER, kind='stable').reset_index(drop=True)
+    df = df.rename(columns={'pdrb_total_adhk': 'pdrb_adhk', 'harapan_lama_sekolah': 'harapan_lama_sekolah_tahun'})
+    return derive_final_columns(df, frames['tingkat_pengangguran_terbuka'])
+
+
+def derive_final_columns(df, tpt_source):
+    """
+    Kolom dataset_final.csv dari indikator mentah (baris sudah urut ORDER).
+
+    * `jumlah_pengangguran_terbuka`: jumlah penduduk x TPT / 100. Di
+      dataset_final.csv TPT diambil per posisi baris (baris ke-i tabel memakai
+      baris ke-i file TPT, yang dimulai tahun 2007), bukan per
+      (kab/kota, tahun); ini dipertahankan agar target dan model tetap sama.
+      TPT yang sesuai kuncinya tersedia di kolom `tingkat_pengangguran_terbuka`.
+      Sumber BPS di dataset_awal tidak memuat jumlah angkatan kerja.
+    * `pdrb_total_adhk`: dibulatkan seperti ekspor spreadsheet (PDRB_EXPORT_*).
+    * `harapan_lama_sekolah`: skor pendidikan 1-4 (HLS_BINS).
+    * `skor` dan `kesejahteraan`: rumus dan batas spreadsheet (SKOR_*, BATAS_KESEJAHTERAAN).
+    """
+    n = len(df)
+    tpt = tpt_source['tingkat_pengangguran_terbuka'].to_numpy(dtype=np.float64)
+    if len(tpt) < n:
+        raise ValueError(f"Sumber TPT hanya punya {len(tpt)} baris, dibutuhkan {n}")
+    population = df['jumlah_penduduk'].to_numpy(dtype=np.float64)
+    df['jumlah_pengangguran_terbuka'] = np.round(population * tpt[:n] / 100).astype(np.int64)
+
+    pdrb = df['pdrb_adhk'].to_numpy(dtype=np.float64)
+    exported = pdrb.copy()
+    large = pdrb >= PDRB_EXPORT_LIMIT
+    if large.any():
+        step = 10.0 ** (np.floor(np.log10(pdrb[large])) - (PDRB_EXPORT_DIGITS - 1))
+        exported[large] = np.round(pdrb[large] / step) * step
+    df['pdrb_total_adhk'] = exported.astype(np.int64)
+
+    hls = df['harapan_lama_sekolah_tahun'].to_numpy(dtype=np.float64)
+    skor_pendidikan = np.searchsorted(HLS_BINS, hls, side='left') + 1
+    skor_pendidikan[np.isnan(hls)] = 1
+    df['harapan_lama_sekolah'] = skor_pendidikan.astype(np.int8)
+
+    skor = (
+        pdrb * SKOR_PDRB
+        + skor_pendidikan * SKOR_PENDIDIKAN
+        - df['jumlah_penduduk_miskin'].to_numpy(dtype=np.float64) * SKOR_MISKIN
+        - df['jumlah_pengangguran_terbuka'].to_numpy(dtype=np.float64) * SKOR_PENGANGGURAN
+    )
+    df['skor'] = skor
+    df['kesejahteraan'] = LABEL_KATEGORI[np.searchsorted(BATAS_KESEJAHTERAAN, skor, side='right')]
+
+    extra = ['kode_kabupaten_kota', 'pdrb_adhk', 'harapan_lama_sekolah_tahun',
+             'persentase_penduduk_miskin', 'tingkat_pengangguran_terbuka']
+    return df[FINAL_COLUMNS + extra]
+
+
+def run_ingestion(raw_dir=RAW_DIR, output_dir=OUTPUT_DIR, cache_dir=CACHE_DIR,
+                  csv_path=None, workers=None, force=False):
+    start = time.perf_counter()
+    frames, stats = load_sources(raw_dir, cache_dir, workers, force)
+    df = join_sources(frames)
+    write_columnar(df, output_dir, metadata={'sources': stats},
+                   categorical=['nama_kabupaten_kota', 'kesejahteraan'])
+    if csv_path:
+        df.to_csv(csv_path, index=False)
+
+    for col, info in stats.items():
+        status = 'cache' if info['cached'] else 'parsed'
+        print(f"  - {col:<30} {status:<7} {info['source']}")
+    print(f"✓ {len(df)} baris ({df['nama_kabupaten_kota'].nunique()} kab/kota, "
+          f"{df['tahun'].min()}-{df['tahun'].max()}) dalam {time.perf_counter() - start:.2f}s")
+    print(f"✓ Columnar tersimpan di: {os.path.abspath(output_dir)}")
+    if csv_path:
+        print(f"✓ CSV tersimpan di: {os.path.abspath(csv_path)}")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest raw BPS open-data files into one joined table')
+    parser.add_argument('--raw-dir', default=RAW_DIR)
+    parser.add_argument('--output', default=OUTPUT_DIR, help='columnar output directory')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='per-source parse cache')
+    parser.add_argument('--csv', default=None, help='also write the joined table as CSV')
+    parser.add_argument('--workers', type=int, default=None, help='parser processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='ignore the cache and re-parse every source')
+    args = parser.parse_args()
+
+    run_ingestion(args.raw_dir, args.output, args.cache_dir, args.csv, args.workers, args.force)
+
+
+if __name__ == "__main__":
+    main()
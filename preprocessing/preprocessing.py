@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Preprocessing Data Kesejahteraan
+Description: Turns dataset_final.csv into the training table
+             dataset_preprocessed.csv plus its columnar copy and the
+             (kabupaten/kota, tahun) panel. This is the pipeline that used to
+             live in preprocessing.ipynb; the notebook now calls this module.
+
+Satu pass tanpa salinan antar tahap: hanya kolom yang dipakai dibaca
+(`usecols` + dtype eksplisit, fitur langsung float64), baris dengan target
+kosong dibuang, median semua fitur yang punya nilai kosong dihitung sekaligus
+lalu diisi in-place. Jumlah baris dan waktu setiap tahap dicatat.
+
+Dengan `--from-raw` tabel masukan dibangun ulang dari file mentah BPS lewat
+ingest.py (hasilnya sama dengan dataset_final.csv) alih-alih dibaca dari CSV.
+
+Usage:
+    python preprocessing.py [--data PATH | --from-raw] [--output PATH]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit')
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+from src.artifacts import sha256_file
+from src.columnar import columnar_dir, write_columnar
+from src.panel import REGION, YEAR, PanelStore, panel_dir
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(BASE_DIR, '../dataset/dataset_akhir/dataset_final.csv')
+OUTPUT_PATH = os.path.join(BASE_DIR, 'dataset_preprocessed.csv')
+
+FEATURES = [
+    'jumlah_penduduk_miskin',
+    'jumlah_pengangguran_terbuka',
+    'pdrb_total_adhk',
+    'harapan_lama_sekolah',
+]
+TARGET = 'kesejahteraan'
+# Tidak masuk dataset_preprocessed.csv, hanya dipakai panel
+PANEL_COLUMNS = [REGION, YEAR, 'jumlah_penduduk']
+# Kolom hitungan yang di sumbernya int64; tetap int64 jika tidak ada yang diisi
+# median, sehingga CSV keluaran sama persis dengan versi notebook
+INTEGER_FEATURES = {'jumlah_penduduk_miskin', 'jumlah_pengangguran_terbuka', 'harapan_lama_sekolah'}
+DTYPES = {
+    **{col: np.float64 for col in FEATURES},
+    TARGET: str,
+    REGION: str,
+    YEAR: np.float64,  # float agar tahun kosong tidak gagal saat dibaca; divalidasi panel
+    'jumlah_penduduk': np.float64,
+}
+
+
+class StageLog:
+    """Jumlah baris dan durasi per tahap pipeline"""
+
+    def __init__(self):
+        self.stages = []
+        self._start = time.perf_counter()
+
+    def record(self, stage, rows, **info):
+        now = time.perf_counter()
+        self.stages.append({'stage': stage, 'rows': int(rows), 'seconds': now - self._start, **info})
+        self._start = now
+
+    def report(self):
+        for s in self.stages:
+            extra = ''.join(f", {k}={v}" for k, v in s.items() if k not in ('stage', 'rows', 'seconds'))
+            print(f"  - {s['stage']:<14} {s['rows']:>8} baris  {s['seconds'] * 1000:8.1f} ms{extra}")
+        print(f"✓ Total {sum(s['seconds'] for s in self.stages) * 1000:.1f} ms")
+
+
+def load_data(path, log):
+    """Baca hanya kolom yang dipakai dengan dtype eksplisit."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File dataset tidak ditemukan di: {path}")
+    # Header dataset_final.csv diawali BOM; validasi kolom sebelum membaca isi
+    header = pd.read_csv(path, nrows=0, encoding='utf-8-sig').columns
+    missing_cols = [col for col in FEATURES + [TARGET] if col not in header]
+    if missing_cols:
+        raise ValueError(f"Kolom berikut tidak ditemukan di dataset: {missing_cols}")
+    usecols = FEATURES + [TARGET] + [col for col in PANEL_COLUMNS if col in header]
+    df = pd.read_csv(path, usecols=usecols, dtype={c: DTYPES[c] for c in usecols}, encoding='utf-8-sig')
+    log.record('load', len(df), columns=len(usecols))
+    return df
+
+
+def load_ingested(log, **ingest_options):
+    """Tabel dari ingest.run_ingestion, dengan kolom dan dtype seperti `load_data`."""
+    from ingest import run_ingestion
+
+    df = run_ingestion(**ingest_options)
+    usecols = FEATURES + [TARGET] + PANEL_COLUMNS
+    df = df[usecols].astype({c: DTYPES[c] for c in usecols})
+    log.record('ingest', len(df), columns=len(usecols))
+    return df
+
+
+def drop_missing_target(df, log):
+    """Buang baris tanpa label (dibutuhkan untuk training)."""
+    missing = df[TARGET].isna().to_numpy()
+    if missing.any():
+        df = df.loc[~missing].reset_index(drop=True)
+    log.record('drop_target', len(df), dropped=int(missing.sum()))
+    return df
+
+
+def fill_medians(df, log):
+    """
+    Isi nilai kosong fitur dengan median kolomnya, in-place.
+
+    Returns:
+        dict: kolom -> median yang dipakai mengisi
+    """
+    X = df[FEATURES].to_numpy(dtype=np.float64)
+    missing = np.isnan(X)
+    counts = missing.sum(axis=0)
+    filled = {}
+    if counts.any():
+        # Median semua kolom sekaligus (nanmedian = Series.median yang melewati NaN)
+        medians = np.nanmedian(X[:, counts > 0], axis=0)
+        for col, median in zip(np.asarray(FEATURES)[counts > 0], medians):
+            filled[str(col)] = float(median)
+        df.fillna(filled, inplace=True)
+    for col in INTEGER_FEATURES.difference(filled):
+        df[col] = df[col].astype(np.int64)
+    log.record('fill_median', len(df), filled=int(counts.sum()))
+    return filled
+
+
+def save_outputs(df, output_path, log):
+    """CSV siap latih, salinan columnar, dan panel (wilayah, tahun)."""
+    df_final = df[FEATURES + [TARGET]]
+    df_final.to_csv(output_path, index=False)
+    write_columnar(df_final, columnar_dir(output_path), categorical=[TARGET])
+    log.record('save', len(df_final))
+
+    if all(col in df.columns for col in PANEL_COLUMNS):
+        # Tahun & penduduk dibaca float; kembali int64 seperti sumbernya jika lengkap
+        panel_frame = df[FEATURES + [TARGET] + PANEL_COLUMNS].astype(
+            {col: np.int64 for col in (YEAR, 'jumlah_penduduk') if df[col].notna().all()}
+        )
+        panel = PanelStore.from_frame(
+            panel_frame,
+            metadata={'source': os.path.basename(output_path), 'source_hash': sha256_file(output_path)},
+        )
+        panel.save(panel_dir(output_path), categorical=[TARGET])
+        log.record('panel', len(panel), regions=len(panel.regions))
+    return df_final
+
+
+def run_preprocessing(data_path=DATA_PATH, output_path=OUTPUT_PATH, from_raw=False, ingest_options=None):
+    """
+    Jalankan seluruh pipeline.
+
+    Args:
+        data_path (str): dataset_final.csv (diabaikan jika `from_raw`).
+        output_path (str): CSV siap latih yang ditulis.
+        from_raw (bool): Bangun tabel masukan dari sumber BPS (ingest.py).
+        ingest_options (dict): Argumen tambahan untuk ingest.run_ingestion.
+
+    Returns:
+        (DataFrame fitur + target, list statistik per tahap)
+    """
+    log = StageLog()
+    if from_raw:
+        df = load_ingested(log, **(ingest_options or {}))
+    else:
+        df = load_data(data_path, log)
+    df = drop_missing_target(df, log)
+    filled = fill_medians(df, log)
+    df_final = save_outputs(df, output_path, log)
+
+    for col, median in filled.items():
+        print(f"  - Mengisi missing values di '{col}' dengan median: {median}")
+    log.report()
+    print(f"✓ Data tersimpan di: {os.path.abspath(output_path)}")
+    print(f"  Shape Akhir: {df_final.shape}")
+    return df_final, log.stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Clean dataset_final.csv into the training table')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--data', default=DATA_PATH, help='raw joined dataset (CSV)')
+    source.add_argument('--from-raw', action='store_true',
+                        help='rebuild the joined dataset from the BPS files with ingest.py')
+    parser.add_argument('--output', default=OUTPUT_PATH, help='preprocessed CSV to write')
+    args = parser.parse_args()
+
+    run_preprocessing(args.data, args.output, from_raw=args.from_raw)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from src.config import PAGE_CONFIG
 st.set_page_config(**PAGE_CONFIG)
 
 from src.styles import apply_custom_css
+from src.registry import require, requirements
 
 # 2. Apply Custom CSS
 apply_custom_css()
@@ -16,6 +17,7 @@ views = {
     "🔮 Prediksi": "views.prediction",
     "📊 Dataset": "views.dataset",
     "📈 Evaluasi Model": "views.evaluation",
+    "📡 Monitoring Drift": "views.drift",
     "ℹ️ About": "views.about"
 }
 
@@ -25,18 +27,19 @@ with st.sidebar:
     selected_view = st.radio("Navigasi", list(views.keys()))
     
     st.divider()
-    from src.loader import load_metrics
-    metrics = load_metrics()
+    # metrics.json hanya dibaca dengan json (tanpa pandas/sklearn)
+    metrics = require(("metrics",))["metrics"]
     if metrics:
         st.metric("Akurasi Model", f"{metrics.get('accuracy', 0)*100:.2f}%")
     st.caption("v1.0.0 Refactored")
 
 # 5. Dynamic Module Loading
-# This allows us to load only the code for the page we are viewing
+# This allows us to load only the code (and the artifacts declared in the
+# view's REQUIRES) for the page we are viewing
 try:
     module_path = views[selected_view]
     module = importlib.import_module(module_path)
-    module.show()
+    module.show(require(requirements(module)))
 except Exception as e:
     st.error(f"Error loading view '{selected_view}': {e}")
     st.code(str(e))
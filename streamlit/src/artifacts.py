@@ -0,0 +1,228 @@
+"""
+Versioned, memory-mappable model artifact.
+
+Layout direktori artifact:
+
+    rf_model_kesejahteraan/
+        manifest.json        mapping, fitur, versi, hash data, hyperparameter
+        feature.npy          \\
+        threshold.npy         |  array node FlatForest (scaler sudah dilipat)
+        children.npy          |
+        value.npy             |
+        roots.npy             |
+        classes.npy          /
+        cover.npy            (opsional) jumlah sampel training per node
+        scaler_mean.npy      parameter StandardScaler asli
+        scaler_scale.npy
+
+Semua array disimpan sebagai .npy tanpa kompresi sehingga bisa dibuka dengan
+`mmap_mode="r"`: beberapa proses app berbagi page cache yang sama dan cold
+start hanya membaca manifest. File joblib lama tetap didukung sebagai fallback.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from src.atomic import atomic_directory, wait_for_swap
+from src.flat_forest import FlatForest, scaler_params
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+SCALER_ARRAYS = ("scaler_mean", "scaler_scale")
+
+def sha256_file(path, chunk_size=1 << 20):
+    """Hash SHA-256 isi file, dibaca per chunk."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _hash_arrays(arrays):
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        arr = np.ascontiguousarray(arrays[name])
+        digest.update(name.encode())
+        digest.update(str(arr.dtype).encode())
+        digest.update(str(arr.shape).encode())
+        digest.update(arr.tobytes())
+    return digest.hexdigest()
+
+def forest_hash(forest):
+    """Hash SHA-256 array node forest (scaler sudah dilipat), untuk key cache hasil turunan model."""
+    return _hash_arrays(forest.arrays())
+
+def save_artifact(path, forest, scaler, mapping, features, hyperparameters=None, data_hash=None,
+                  compression=None):
+    """
+    Menulis artifact ke direktori `path`.
+
+    `compression` (dict, opsional) adalah ringkasan stage kompresi yang
+    menghasilkan forest ini; ikut ditulis ke manifest.
+
+    Ditulis dulu ke direktori sementara lalu di-rename, sehingga pembaca tidak
+    pernah melihat artifact yang setengah jadi.
+
+    Returns:
+        dict: Manifest yang ditulis.
+    """
+    mean, scale = scaler_params(scaler, len(features))
+    arrays = dict(forest.arrays(), scaler_mean=mean, scaler_scale=scale)
+    model_hash = _hash_arrays(arrays)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model_version": model_hash[:12],
+        "model_hash": model_hash,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "features": list(features),
+        "mapping": {str(k): v for k, v in mapping.items()},
+        "data_hash": data_hash,
+        "hyperparameters": hyperparameters or {},
+        "n_trees": forest.n_trees,
+        "max_depth": forest.max_depth,
+        "value_scale": forest.value_scale,
+        "compression": compression,
+        "arrays": {
+            name: {"file": f"{name}.npy", "dtype": str(arr.dtype), "shape": list(arr.shape)}
+            for name, arr in arrays.items()
+        },
+    }
+
+    with atomic_directory(path) as tmp_path:
+        for name, arr in arrays.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(arr), allow_pickle=False)
+        with open(os.path.join(tmp_path, MANIFEST_NAME), "w") as f:
+            json.dump(manifest, f, indent=4, default=str)
+    return manifest
+
+
+class ModelArtifact:
+    """
+    Artifact model yang dimuat secara lazy.
+
+    Manifest dibaca saat konstruksi; semua array (node dan scaler) baru
+    dibuka (memory-mapped) sekaligus saat `forest` atau `scaler_params`
+    pertama kali diakses. Direktori bisa diganti di antara keduanya, jadi
+    setiap array dicocokkan dengan dtype/shape di manifest dan manifest dibaca
+    ulang: jika `model_hash`-nya berubah, ValueError dan pemanggil (mis.
+    reload di src.hot_reload) mencoba lagi dengan manifest baru.
+    """
+
+    def __init__(self, manifest, path=None, mmap_mode="r", forest=None, joblib_artifacts=None):
+        self.manifest = manifest
+        self.path = path
+        self.mmap_mode = mmap_mode
+        self._forest = forest
+        self._arrays = None
+        self._joblib_artifacts = joblib_artifacts
+
+    @property
+    def features(self):
+        return self.manifest["features"]
+
+    @property
+    def mapping(self):
+        return {int(k): v for k, v in self.manifest["mapping"].items()}
+
+    @property
+    def version(self):
+        return self.manifest.get("model_version")
+
+    def _open_arrays(self):
+        """Semua array di manifest, dibuka bersama dan dipastikan dari versi manifest ini."""
+        if self._arrays is None:
+            arrays = {}
+            for name, info in self.manifest["arrays"].items():
+                wait_for_swap(self.path)
+                arr = np.load(os.path.join(self.path, info["file"]), mmap_mode=self.mmap_mode, allow_pickle=False)
+                if str(arr.dtype) != info["dtype"] or list(arr.shape) != list(info["shape"]):
+                    raise ValueError(
+                        f"Artifact array {name!r} is {arr.dtype}{list(arr.shape)}, manifest says "
+                        f"{info['dtype']}{list(info['shape'])}: the directory changed while loading"
+                    )
+                arrays[name] = arr
+            wait_for_swap(self.path)
+            with open(os.path.join(self.path, MANIFEST_NAME)) as f:
+                model_hash = json.load(f).get("model_hash")
+            if model_hash != self.manifest.get("model_hash"):
+                raise ValueError("Artifact directory was replaced while loading its arrays")
+            self._arrays = arrays
+        return self._arrays
+
+    @property
+    def forest(self):
+        """FlatForest dengan array yang di-memory-map dari direktori artifact."""
+        if self._forest is None:
+            opened = self._open_arrays()
+            arrays = {name: opened[name] for name in FlatForest.ARRAY_NAMES}
+            arrays.update({name: opened[name] for name in FlatForest.OPTIONAL_ARRAY_NAMES if name in opened})
+            mapping = self.mapping
+            self._forest = FlatForest(
+                max_depth=self.manifest["max_depth"],
+                value_scale=self.manifest.get("value_scale", 1.0),
+                feature_names=self.features,
+                class_labels=[mapping[int(c)] for c in arrays["classes"]],
+                **arrays,
+            )
+        return self._forest
+
+    @property
+    def scaler_params(self):
+        """(mean, scale) StandardScaler yang dipakai saat training."""
+        if self._joblib_artifacts is not None:
+            return scaler_params(self._joblib_artifacts["scaler"], len(self.features))
+        opened = self._open_arrays()
+        return tuple(opened[name] for name in SCALER_ARRAYS)
+
+    @classmethod
+    def from_directory(cls, path, mmap_mode="r"):
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        if manifest.get("format_version", 0) > FORMAT_VERSION:
+            raise ValueError(
+                f"Artifact format {manifest['format_version']} is newer than supported ({FORMAT_VERSION})"
+            )
+        return cls(manifest, path=path, mmap_mode=mmap_mode)
+
+    @classmethod
+    def from_joblib(cls, path):
+        """Fallback: memuat pickle joblib lama dan mengemas forest di memori."""
+        import joblib
+
+        artifacts = joblib.load(path)
+        model = artifacts["model"]
+        mapping = artifacts["mapping"]
+        forest = FlatForest.from_sklearn(
+            model,
+            artifacts["scaler"],
+            feature_names=artifacts["features"],
+            class_labels=[mapping[int(c)] for c in model.classes_],
+        )
+        manifest = {
+            "format_version": 0,
+            "model_version": None,
+            "features": list(artifacts["features"]),
+            "mapping": {str(k): v for k, v in mapping.items()},
+            "max_depth": forest.max_depth,
+            "n_trees": forest.n_trees,
+        }
+        return cls(manifest, path=path, forest=forest, joblib_artifacts=artifacts)
+
+
+def load_artifact(artifact_dir, joblib_path=None, mmap_mode="r"):
+    """
+    Memuat artifact dari direktori manifest; jika tidak ada, fallback ke joblib.
+
+    Returns:
+        ModelArtifact, atau None jika keduanya tidak ditemukan.
+    """
+    if artifact_dir and wait_for_swap(artifact_dir) and os.path.exists(os.path.join(artifact_dir, MANIFEST_NAME)):
+        return ModelArtifact.from_directory(artifact_dir, mmap_mode=mmap_mode)
+    if joblib_path and os.path.exists(joblib_path):
+        return ModelArtifact.from_joblib(joblib_path)
+    return None
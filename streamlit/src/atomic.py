@@ -0,0 +1,70 @@
+"""Atomic replacement of files and directories written by the pipelines."""
+
+import contextlib
+import glob
+import os
+import shutil
+import time
+
+# Batas waktu pembaca menunggu direktori yang sedang diganti atomic_directory
+SWAP_TIMEOUT = 5.0
+
+@contextlib.contextmanager
+def atomic_directory(path):
+    """
+    Context manager yang menghasilkan direktori sementara; jika blok selesai
+    tanpa error, direktori itu menggantikan `path` dengan rename sehingga
+    pembaca tidak pernah melihat isi yang setengah ditulis.
+
+    Direktori tidak bisa di-rename menimpa direktori yang berisi, jadi yang
+    lama dipindah dulu ke `<path>.old-<pid>`. Di antara kedua rename `path`
+    tidak ada; pembaca memakai `wait_for_swap` untuk melewati celah itu.
+    """
+    path = os.path.abspath(path)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    try:
+        yield tmp_path
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    old_path = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+@contextlib.contextmanager
+def atomic_file(path):
+    """
+    Seperti `atomic_directory` untuk satu file: blok menulis ke path
+    sementara di direktori yang sama, lalu `os.replace` menggantikan `path`.
+    """
+    path = os.path.abspath(path)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        yield tmp_path
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+def wait_for_swap(path, timeout=SWAP_TIMEOUT, poll=0.005):
+    """
+    True jika `path` ada. Jika tidak ada karena sedang diganti
+    `atomic_directory` (direktori `.old-*` masih ada), tunggu sampai versi
+    baru masuk, paling lama `timeout` detik.
+    """
+    path = os.path.abspath(path)
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if not glob.glob(f"{glob.escape(path)}.old-*"):
+            # Penggantian bisa selesai di antara dua pemeriksaan
+            return os.path.exists(path)
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(poll)
+    return True
@@ -0,0 +1,306 @@
+"""
+Audit log prediksi: append-only, ditulis asinkron dan per batch.
+
+`AuditLog.log` hanya menambahkan record ke antrean in-process (beberapa
+mikrodetik); thread latar mengumpulkan record sampai `batch_size` atau
+`flush_interval` detik sejak record pertama, lalu menulis satu batch sekaligus.
+Thread script Streamlit tidak pernah menunggu disk.
+
+Format di direktori log:
+
+* `audit-<ms mulai>-<pid>-<nomor>.jsonl`: segmen JSON Lines, satu record
+  datar per baris. Setiap writer memulai segmen baru (tidak ada dua proses
+  yang menulis file yang sama) dan berpindah segmen saat ukurannya melewati
+  `segment_bytes`. Nama diawali waktu mulai, jadi urutan nama = urutan waktu.
+* `<segmen>.idx`: satu baris JSON per batch yang di-flush — offset byte,
+  panjang, jumlah record, `t_min`/`t_max`. Query rentang waktu hanya membaca
+  index lalu `seek` ke batch yang beririsan. Index ditulis setelah datanya;
+  jika proses mati di antara keduanya, ekor segmen yang belum ter-index
+  dipindai oleh reader (baris terakhir yang terpotong dilewati).
+
+`AuditReader` membaca kembali record (semua atau rentang waktu) sebagai dict
+atau DataFrame per chunk, mis. untuk diputar ulang lewat
+modelling/score_batch.py.
+"""
+
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+
+SEGMENT_PREFIX = "audit-"
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+TIME_FIELD = "ts"
+FLUSH_TIMEOUT = 5.0
+
+_STOP = object()
+
+
+class _Flush:
+    __slots__ = ("done",)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class AuditLog:
+    """
+    Writer audit log dengan antrean dan thread latar.
+
+    Args:
+        directory (str): Direktori segmen (dibuat jika belum ada).
+        batch_size (int): Record maksimum per tulis.
+        flush_interval (float): Detik maksimum record menunggu di antrean.
+        segment_bytes (int): Ukuran segmen sebelum pindah ke segmen baru.
+        max_queue (int): Batas antrean; record di atasnya (dan record setelah
+            `close`) dibuang dan dihitung di `dropped`, agar pemanggil tidak
+            pernah terblokir.
+        fsync (bool): fsync setiap batch (lebih tahan crash, lebih lambat).
+    """
+
+    def __init__(self, directory, batch_size=256, flush_interval=1.0, segment_bytes=16 * 2**20,
+                 max_queue=100_000, fsync=False):
+        self.directory = directory
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.segment_bytes = max(1, int(segment_bytes))
+        self.fsync = fsync
+        self.records = 0
+        self.batches = 0
+        self.segments = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+        self._closed = False
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._started = int(time.time() * 1000)
+        self._segment = None
+        self._index = None
+        self._size = 0
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        # Saat interpreter berhenti jangan menunggu writer yang macet tanpa batas
+        atexit.register(self.close, FLUSH_TIMEOUT)
+
+    def log(self, record):
+        """Antrekan satu record (dict datar, nilai JSON); `ts` diisi jika belum ada."""
+        if TIME_FIELD not in record:
+            record = {TIME_FIELD: time.time(), **record}
+        # Lock yang sama dengan close(): tidak ada record yang masuk antrean
+        # setelah _STOP, dan `dropped` tidak kehilangan hitungan antar thread
+        with self._lock:
+            if not self._closed:
+                try:
+                    self._queue.put_nowait(record)
+                    return
+                except queue.Full:
+                    pass
+            self.dropped += 1
+
+    def flush(self, timeout=FLUSH_TIMEOUT):
+        """
+        Tunggu sampai semua record yang diantrekan sebelum panggilan ini
+        tertulis; False jika belum selesai dalam `timeout` detik (termasuk saat
+        antrean penuh) atau writer sudah berhenti.
+        """
+        if not self._thread.is_alive():
+            return False
+        deadline = None if timeout is None else time.monotonic() + timeout
+        marker = _Flush()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def close(self, timeout=None):
+        """
+        Tulis record yang masih diantrekan lalu hentikan writer; `log`
+        setelahnya dihitung `dropped`. Jika antrean tetap penuh selama
+        `timeout` detik (writer macet), record yang tersisa dihitung `dropped`
+        dan close kembali tanpa menunggu writer.
+        """
+        with self._lock:
+            self._closed = True
+        if not self._thread.is_alive():
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            self._drop_queued()
+            return
+        self._thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def _drop_queued(self):
+        dropped = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if not isinstance(item, _Flush):  # flush() yang menunggu marker ini tetap habis waktunya
+                dropped += 1
+        with self._lock:
+            self.dropped += dropped
+        # Antrean sudah kosong: jika writer pulih, ia berhenti setelah batch yang sedang ditulis
+        try:
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            pass
+
+    def stats(self):
+        return {
+            "records": self.records,
+            "batches": self.batches,
+            "segments": self.segments,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "queued": self._queue.qsize(),
+            "segment": os.path.basename(self._segment.name) if self._segment else None,
+        }
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            batch, markers = [], []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, _Flush):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                # flush() dan close() tidak menunggu batch penuh
+                if stop or markers or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as exc:  # log audit tidak boleh mematikan app
+                    self.errors += 1
+                    self.last_error = repr(exc)
+            for marker in markers:
+                marker.done.set()
+        self._close_segment()
+
+    def _open_segment(self):
+        self._close_segment()
+        name = f"{SEGMENT_PREFIX}{self._started:013d}-{os.getpid()}-{self.segments:04d}{SEGMENT_SUFFIX}"
+        path = os.path.join(self.directory, name)
+        self._segment = open(path, "ab")
+        self._index = open(path + INDEX_SUFFIX, "a")
+        self._size = self._segment.tell()
+        self.segments += 1
+
+    def _close_segment(self):
+        for handle in (self._segment, self._index):
+            if handle is not None:
+                handle.close()
+        self._segment = self._index = None
+
+    def _write(self, batch):
+        data = b"".join(json.dumps(r, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+                        for r in batch)
+        if self._segment is None or (self._size and self._size + len(data) > self.segment_bytes):
+            self._open_segment()
+        offset = self._size
+        self._segment.write(data)
+        self._segment.flush()
+        if self.fsync:
+            os.fsync(self._segment.fileno())
+        times = [r[TIME_FIELD] for r in batch]
+        self._index.write(json.dumps({"offset": offset, "length": len(data), "count": len(batch),
+                                      "t_min": min(times), "t_max": max(times)}) + "\n")
+        self._index.flush()
+        self._size += len(data)
+        self.records += len(batch)
+        self.batches += 1
+
+
+class AuditReader:
+    """
+    Pembaca segmen audit log.
+
+    Args:
+        directory (str): Direktori yang ditulis `AuditLog`.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def segments(self):
+        """Path segmen, urut waktu mulai writer."""
+        return sorted(glob.glob(os.path.join(self.directory, f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")))
+
+    @staticmethod
+    def _index(segment):
+        """Batch ter-index segmen plus ekor yang belum ter-index (t_min/t_max None)."""
+        entries = []
+        end = 0
+        if os.path.exists(segment + INDEX_SUFFIX):
+            with open(segment + INDEX_SUFFIX) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # baris index terakhir terpotong
+                    entries.append(entry)
+                    end = entry["offset"] + entry["length"]
+        size = os.path.getsize(segment)
+        if size > end:
+            entries.append({"offset": end, "length": size - end, "count": None, "t_min": None, "t_max": None})
+        return entries
+
+    def read(self, start=None, end=None):
+        """
+        Record dengan `start <= ts < end` (epoch detik; None = tanpa batas),
+        urut seperti ditulis.
+        """
+        for segment in self.segments():
+            entries = [
+                e for e in self._index(segment)
+                if e["t_min"] is None or ((start is None or e["t_max"] >= start) and (end is None or e["t_min"] < end))
+            ]
+            if not entries:
+                continue
+            with open(segment, "rb") as f:
+                for entry in entries:
+                    f.seek(entry["offset"])
+                    for line in f.read(entry["length"]).splitlines():
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # baris terakhir yang terpotong saat crash
+                        ts = record.get(TIME_FIELD)
+                        if (start is None or ts >= start) and (end is None or ts < end):
+                            yield record
+
+    def columns(self):
+        """Nama field record pertama (urutan kolom DataFrame)."""
+        return list(next(self.read(), {}))
+
+    def iter_frames(self, start=None, end=None, chunk_rows=65536, columns=None):
+        """Record sebagai DataFrame per `chunk_rows` baris (pandas diimpor di sini)."""
+        import pandas as pd
+
+        batch = []
+        for record in self.read(start, end):
+            batch.append(record)
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
@@ -0,0 +1,182 @@
+"""
+Columnar on-disk tables: satu file .npy per kolom plus `columns.json`.
+
+Kolom numerik disimpan apa adanya (setelah downcast) sehingga bisa dibuka
+dengan `mmap_mode="r"`; kolom teks disimpan sebagai kode kategori + daftar
+kategori di metadata. Format ini hanya butuh NumPy (tanpa pyarrow) dan
+dipakai bersama oleh pipeline data, training, dan dashboard.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.atomic import atomic_directory, wait_for_swap
+
+META_NAME = "columns.json"
+
+def downcast(series):
+    """Downcast kolom numerik ke dtype terkecil yang tidak mengubah nilainya."""
+    if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast="integer")
+    values = series.to_numpy(dtype=np.float64)
+    if (not np.isnan(values).any() and np.array_equal(values, np.round(values))
+            and np.abs(values).max(initial=0) < 2**31):
+        return pd.to_numeric(series.astype(np.int64), downcast="integer")
+    if np.array_equal(values.astype(np.float32), values, equal_nan=True):
+        return series.astype(np.float32)
+    return series
+
+def downcast_frame(df):
+    """downcast() untuk setiap kolom DataFrame."""
+    return pd.DataFrame({name: downcast(df[name]) for name in df.columns}, index=df.index)
+
+def write_columnar(df, path, metadata=None, categorical=None, downcast_numeric=True):
+    """
+    Menulis DataFrame ke direktori columnar secara atomik.
+
+    Args:
+        df (pd.DataFrame): Data yang ditulis.
+        path (str): Direktori tujuan.
+        metadata (dict): Metadata tambahan (mis. hash sumber) di `columns.json`.
+        categorical (list): Kolom yang dipaksa menjadi kategori. Kolom teks
+            selalu disimpan sebagai kategori.
+        downcast_numeric (bool): Downcast kolom numerik sebelum ditulis.
+    """
+    categorical = set(categorical or [])
+    columns = []
+    arrays = {}
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        file_name = f"{i:03d}.npy"
+        if name in categorical or isinstance(series.dtype, pd.CategoricalDtype) or not (
+            pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)
+        ):
+            cat = series.astype("category").cat
+            codes = cat.codes.to_numpy()
+            arrays[file_name] = codes.astype(np.int8 if len(cat.categories) < 127 else np.int32)
+            columns.append({
+                "name": name,
+                "file": file_name,
+                "kind": "category",
+                "categories": [c.item() if hasattr(c, "item") else c for c in cat.categories],
+            })
+        else:
+            if downcast_numeric:
+                series = downcast(series)
+            values = np.ascontiguousarray(series.to_numpy())
+            arrays[file_name] = values
+            columns.append({"name": name, "file": file_name, "kind": "numeric", "dtype": str(values.dtype)})
+
+    meta = {"n_rows": len(df), "columns": columns, "metadata": metadata or {}}
+
+    with atomic_directory(path) as tmp_path:
+        for file_name, values in arrays.items():
+            np.save(os.path.join(tmp_path, file_name), values, allow_pickle=False)
+        with open(os.path.join(tmp_path, META_NAME), "w") as f:
+            json.dump(meta, f, indent=4, default=str)
+    return meta
+
+def read_metadata(path):
+    """Isi `columns.json`, atau None jika direktori belum ada."""
+    meta_path = os.path.join(path, META_NAME)
+    if not wait_for_swap(path) or not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+def read_columnar(path, columns=None, mmap_mode="r"):
+    """
+    Membaca direktori columnar menjadi DataFrame.
+
+    Kolom numerik dibuka dengan `mmap_mode` (default read-only memory map)
+    sehingga hanya halaman yang disentuh yang dibaca dari disk.
+    """
+    meta = read_metadata(path)
+    if meta is None:
+        raise FileNotFoundError(f"Columnar dataset tidak ditemukan di: {path}")
+    wanted = None if columns is None else set(columns)
+    data = {}
+    for col in meta["columns"]:
+        if wanted is not None and col["name"] not in wanted:
+            continue
+        values = np.load(os.path.join(path, col["file"]), mmap_mode=mmap_mode, allow_pickle=False)
+        if col["kind"] == "category":
+            data[col["name"]] = pd.Categorical.from_codes(np.asarray(values), categories=col["categories"])
+        else:
+            data[col["name"]] = values
+    df = pd.DataFrame(data, copy=False)
+    if columns is not None:
+        df = df[list(columns)]
+    return df
+
+def columnar_dir(csv_path):
+    """Direktori columnar pendamping sebuah CSV (`data.csv` -> `data/`)."""
+    return os.path.splitext(csv_path)[0]
+
+def _fresh_columnar(csv_path):
+    """Direktori columnar pendamping jika ada dan tidak lebih tua dari CSV-nya, selain itu None."""
+    table_dir = columnar_dir(csv_path)
+    meta_path = os.path.join(table_dir, META_NAME)
+    if wait_for_swap(table_dir) and os.path.exists(meta_path) and (
+        not os.path.exists(csv_path) or os.path.getmtime(meta_path) >= os.path.getmtime(csv_path)
+    ):
+        return table_dir
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"Dataset tidak ditemukan di: {csv_path}")
+    return None
+
+def read_table(csv_path, columns=None, mmap_mode="r"):
+    """
+    Membaca tabel dari direktori columnar pendamping `csv_path` jika ada dan
+    tidak lebih tua dari CSV-nya; jika tidak, fallback ke `pd.read_csv`.
+    """
+    table_dir = _fresh_columnar(csv_path)
+    if table_dir is not None:
+        return read_columnar(table_dir, columns=columns, mmap_mode=mmap_mode)
+    return pd.read_csv(csv_path, usecols=columns)
+
+def table_columns(csv_path):
+    """Nama kolom tabel tanpa membaca datanya."""
+    table_dir = _fresh_columnar(csv_path)
+    if table_dir is not None:
+        return [col["name"] for col in read_metadata(table_dir)["columns"]]
+    return list(pd.read_csv(csv_path, nrows=0).columns)
+
+def iter_table(csv_path, columns=None, chunk_rows=65536):
+    """
+    Membaca tabel per blok `chunk_rows` baris (sumber sama dengan read_table).
+
+    Dari direktori columnar, setiap blok adalah slice memory map (kolom
+    kategori tetap memakai daftar kategori yang sama di semua blok); dari CSV,
+    `pd.read_csv(chunksize=...)` dengan kolom numerik di-downcast per blok.
+    Memori yang dipakai sebanding dengan satu blok, bukan seluruh tabel.
+    """
+    table_dir = _fresh_columnar(csv_path)
+    if table_dir is None:
+        for chunk in pd.read_csv(csv_path, usecols=columns, chunksize=chunk_rows):
+            yield downcast_frame(chunk)
+        return
+
+    meta = read_metadata(table_dir)
+    wanted = list(columns) if columns is not None else [col["name"] for col in meta["columns"]]
+    info = {col["name"]: col for col in meta["columns"]}
+    missing = [name for name in wanted if name not in info]
+    if missing:
+        raise KeyError(f"Kolom tidak ditemukan di {table_dir}: {missing}")
+    arrays = {
+        name: np.load(os.path.join(table_dir, info[name]["file"]), mmap_mode="r", allow_pickle=False)
+        for name in wanted
+    }
+    for start in range(0, meta["n_rows"], chunk_rows):
+        data = {}
+        for name in wanted:
+            block = np.asarray(arrays[name][start:start + chunk_rows])
+            if info[name]["kind"] == "category":
+                block = pd.Categorical.from_codes(block, categories=info[name]["categories"])
+            data[name] = block
+        yield pd.DataFrame(data, copy=False)
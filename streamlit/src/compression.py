@@ -0,0 +1,210 @@
+"""
+Kompresi FlatForest: seleksi pohon, collapse subtree, dan kuantisasi.
+
+* `greedy_selection` mengurutkan pohon secara greedy (seleksi ensemble ala
+  Caruana, tanpa pengembalian): setiap langkah menambah pohon yang paling
+  menaikkan akurasi ensemble di data seleksi, sehingga prefix urutan itu
+  adalah ensemble terbaik untuk setiap jumlah pohon.
+* `collapse_subtrees` mengganti split yang kedua anaknya leaf dengan kelas
+  mayoritas sama (dan selisih probabilitas <= toleransi) menjadi leaf
+  bernilai distribusi node induk, berulang dari bawah ke atas.
+* `quantize` menyimpan threshold sebagai float32, indeks fitur uint8 dan
+  distribusi kelas sebagai uint8 (skala 255); cover (jika ada) float32.
+
+Semua operasi hanya memakai array node, tanpa sklearn.
+"""
+
+import numpy as np
+
+from src.flat_forest import FlatForest
+
+VALUE_SCALE_UINT8 = 255
+
+def forest_nbytes(forest):
+    """Ukuran array node forest di memori (sama dengan ukuran .npy tanpa header)."""
+    return int(sum(np.asarray(arr).nbytes for arr in forest.arrays().values()))
+
+def _tree_ranges(forest):
+    """(start, stop) node setiap pohon; node satu pohon bersebelahan seperti dari from_sklearn."""
+    roots = np.asarray(forest.roots, dtype=np.int64)
+    order = np.argsort(roots)
+    ends = np.empty_like(roots)
+    ends[order] = np.append(roots[order][1:], len(forest.feature))
+    return roots, ends
+
+def _rebuild(forest, feature, threshold, children, value, roots, max_depth, value_scale=None, cover=None):
+    return FlatForest(
+        feature=feature, threshold=threshold, children=children, value=value, roots=roots,
+        max_depth=max_depth, classes=np.asarray(forest.classes),
+        feature_names=forest.feature_names, class_labels=forest.class_labels,
+        value_scale=forest.value_scale if value_scale is None else value_scale,
+        cover=cover,
+    )
+
+def _take_cover(forest, index):
+    return None if forest.cover is None else np.asarray(forest.cover)[index]
+
+def per_tree_proba(forest, X):
+    """Distribusi kelas leaf setiap pohon, shape (n_trees, n_rows, n_classes), float64."""
+    leaves = forest.apply(X)
+    proba = np.take(forest.value, leaves.T, axis=0).astype(np.float64)
+    if forest.value_scale != 1.0:
+        proba /= proba.sum(axis=2, keepdims=True)
+    return proba
+
+def greedy_selection(tree_proba, y):
+    """
+    Urutan pohon hasil seleksi ensemble greedy.
+
+    Args:
+        tree_proba (np.ndarray): (n_trees, n_rows, n_classes) dari `per_tree_proba`.
+        y (np.ndarray): Indeks kelas (posisi kolom) data seleksi.
+
+    Returns:
+        tuple: (urutan indeks pohon, akurasi seleksi setiap prefix)
+    """
+    tree_proba = np.asarray(tree_proba, dtype=np.float64)
+    n_trees, n_rows, _ = tree_proba.shape
+    y = np.asarray(y, dtype=np.intp)
+    rows = np.arange(n_rows)
+    remaining = np.arange(n_trees)
+    total = np.zeros(tree_proba.shape[1:])
+    order, curve = [], []
+    for _ in range(n_trees):
+        candidates = total + tree_proba[remaining]
+        accuracy = (candidates.argmax(axis=2) == y).mean(axis=1)
+        # Seri akurasi dipecah dengan rata-rata probabilitas kelas asli
+        true_proba = candidates[:, rows, y].mean(axis=1) / (len(order) + 1)
+        best = np.lexsort((-true_proba, -accuracy))[0]
+        tree = int(remaining[best])
+        order.append(tree)
+        curve.append(float(accuracy[best]))
+        total += tree_proba[tree]
+        remaining = np.delete(remaining, best)
+    return np.asarray(order), np.asarray(curve)
+
+def select_trees(forest, trees):
+    """Forest baru yang hanya berisi `trees` (urutan dipertahankan), node diberi nomor ulang."""
+    starts, ends = _tree_ranges(forest)
+    trees = np.asarray(trees, dtype=np.int64)
+    lengths = ends[trees] - starts[trees]
+    new_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    index = np.concatenate([np.arange(starts[t], ends[t]) for t in trees])
+    shift = np.repeat(new_starts - starts[trees], lengths)
+    children = np.asarray(forest.children)[index].astype(np.int64) + shift[:, np.newaxis]
+    return _rebuild(
+        forest,
+        feature=np.asarray(forest.feature)[index],
+        threshold=np.asarray(forest.threshold)[index],
+        children=children.astype(np.int32),
+        value=np.asarray(forest.value)[index],
+        roots=new_starts.astype(np.int32),
+        max_depth=forest.max_depth,
+        cover=_take_cover(forest, index),
+    )
+
+def _compact(forest, children, feature, threshold):
+    """Buang node yang tidak lagi terjangkau dari akar; hitung ulang max_depth."""
+    n = len(children)
+    ids = np.arange(n)
+    reachable = np.zeros(n, dtype=bool)
+    frontier = np.asarray(forest.roots, dtype=np.int64)
+    depth = -1
+    while len(frontier):
+        reachable[frontier] = True
+        depth += 1
+        internal = frontier[children[frontier, 0] != frontier]
+        frontier = children[internal].ravel()
+    new_id = np.cumsum(reachable) - 1
+    kept = ids[reachable]
+    return _rebuild(
+        forest,
+        feature=feature[kept],
+        threshold=threshold[kept],
+        children=new_id[children[kept]].astype(np.int32),
+        value=np.asarray(forest.value)[kept],
+        roots=new_id[np.asarray(forest.roots)].astype(np.int32),
+        max_depth=max(depth, 0),
+        cover=_take_cover(forest, kept),
+    )
+
+def collapse_subtrees(forest, tolerance=1.0):
+    """
+    Collapse split redundan menjadi leaf.
+
+    Split dianggap redundan jika kedua anaknya leaf, kelas mayoritasnya sama,
+    dan selisih probabilitas per kelas paling besar `tolerance` (0 = hanya
+    leaf yang identik). Node induk memakai distribusinya sendiri, yaitu rata-
+    rata berbobot kedua anak. Diulang sampai tidak ada lagi yang bisa digabung.
+
+    Returns:
+        tuple: (forest baru, jumlah split yang di-collapse)
+    """
+    children = np.asarray(forest.children, dtype=np.int64).copy()
+    feature = np.asarray(forest.feature).copy()
+    threshold = np.asarray(forest.threshold).copy()
+    value = np.asarray(forest.value, dtype=np.float64)
+    if forest.value_scale != 1.0:
+        value = value / value.sum(axis=1, keepdims=True)
+    majority = value.argmax(axis=1)
+    ids = np.arange(len(children))
+    collapsed = 0
+    while True:
+        is_leaf = children[:, 0] == ids
+        left, right = children[:, 0], children[:, 1]
+        mergeable = (~is_leaf & is_leaf[left] & is_leaf[right]
+                     & (majority[left] == majority[right])
+                     & (np.abs(value[left] - value[right]).max(axis=1) <= tolerance))
+        if not mergeable.any():
+            break
+        nodes = ids[mergeable]
+        children[nodes] = nodes[:, np.newaxis]
+        feature[nodes] = 0
+        threshold[nodes] = np.inf
+        collapsed += len(nodes)
+    if not collapsed:
+        return forest, 0
+    return _compact(forest, children, feature, threshold), collapsed
+
+def quantize(forest):
+    """
+    Threshold float32, fitur uint8 (jika < 256 fitur), distribusi kelas uint8.
+
+    Threshold dibulatkan ke float32 terdekat; keputusan hanya berubah untuk
+    nilai input yang jatuh di antara threshold asli dan hasil pembulatannya.
+    Indeks node disimpan int16 jika forest cukup kecil (2 * n_nodes masih
+    muat di int16 untuk perhitungan indeks anak di `FlatForest.apply`).
+    """
+    value = np.asarray(forest.value, dtype=np.float64)
+    if forest.value_scale != 1.0:
+        value = value / value.sum(axis=1, keepdims=True)
+    n_nodes = len(forest.feature)
+    index_dtype = np.int16 if 2 * n_nodes <= np.iinfo(np.int16).max else np.int32
+    n_features = int(np.max(forest.feature)) + 1 if n_nodes else 0
+    return _rebuild(
+        forest,
+        feature=np.asarray(forest.feature).astype(np.uint8 if n_features <= 256 else np.int32),
+        threshold=np.asarray(forest.threshold).astype(np.float32),
+        children=np.asarray(forest.children).astype(index_dtype),
+        value=np.round(value * VALUE_SCALE_UINT8).astype(np.uint8),
+        roots=np.asarray(forest.roots).astype(index_dtype),
+        max_depth=forest.max_depth,
+        value_scale=VALUE_SCALE_UINT8,
+        cover=None if forest.cover is None else np.asarray(forest.cover).astype(np.float32),
+    )
+
+def compress(forest, trees, collapse_tolerance=None, quantized=True):
+    """
+    Pipeline kompresi: pilih `trees`, collapse subtree (jika toleransi diisi),
+    lalu kuantisasi.
+
+    Returns:
+        tuple: (FlatForest terkompresi, jumlah split yang di-collapse)
+    """
+    compressed = select_trees(forest, trees)
+    collapsed = 0
+    if collapse_tolerance is not None:
+        compressed, collapsed = collapse_subtrees(compressed, collapse_tolerance)
+    if quantized:
+        compressed = quantize(compressed)
+    return compressed, collapsed
@@ -5,8 +5,11 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # Paths
 MODEL_PATH = os.path.join(BASE_DIR, "../modelling/rf_model_kesejahteraan.pkl")
+ARTIFACT_DIR = os.path.join(BASE_DIR, "../modelling/rf_model_kesejahteraan")
 DATASET_PATH = os.path.join(BASE_DIR, "../preprocessing/dataset_preprocessed.csv")
+PANEL_DIR = os.path.join(BASE_DIR, "../preprocessing/dataset_panel")
 METRICS_PATH = os.path.join(BASE_DIR, "../modelling/metrics.json")
+AUDIT_DIR = os.path.join(BASE_DIR, "../audit_log")
 IMG_DIR = os.path.join(BASE_DIR, "../modelling")
 
 # Page Config
@@ -16,3 +19,21 @@ PAGE_CONFIG = {
     "layout": "wide",
     "initial_sidebar_state": "expanded"
 }
+
+# Jumlah input unik yang hasil prediksi RF-nya disimpan (LRU, dibagi antar sesi)
+PREDICTION_CACHE_SIZE = 4096
+
+# Analisis sensitivitas: titik per sumbu grid dan jumlah grid yang di-cache
+SENSITIVITY_RESOLUTION = 200
+SENSITIVITY_CACHE_SIZE = 32
+
+# Jumlah input unik yang atribusi fiturnya (TreeSHAP) disimpan
+EXPLANATION_CACHE_SIZE = 1024
+
+# Jeda minimum (detik) antar pemeriksaan perubahan file model/metrics untuk hot-reload
+RELOAD_INTERVAL_SECONDS = 2.0
+
+# Audit log prediksi: record per tulis, detik maksimum di antrean, ukuran segmen
+AUDIT_BATCH_SIZE = 256
+AUDIT_FLUSH_SECONDS = 1.0
+AUDIT_SEGMENT_BYTES = 16 * 2**20
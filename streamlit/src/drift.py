@@ -0,0 +1,267 @@
+"""
+Monitor drift input prediksi dengan memori konstan.
+
+Setiap prediksi meringkas inputnya secara streaming tanpa menyimpan baris:
+
+* mean/varian per fitur (Welford per baris, digabung per batch dengan rumus
+  Chan), min dan max,
+* histogram pada bin tetap. Batas bin adalah kuantil data training
+  (snapshot), jadi setiap bin berisi ~1/n_bins data training; dari histogram
+  ini dihitung PSI, statistik KS (selisih CDF terbesar di batas bin) dan
+  perkiraan median,
+* frekuensi kelas prediksi, dibandingkan dengan distribusi label training.
+
+Memori hanya bergantung pada jumlah fitur x bin, bukan jumlah prediksi.
+`DriftMonitor.observe` (satu prediksi) berjalan dalam Python murni, beberapa
+mikrodetik; `update` memproses satu batch dengan NumPy.
+
+Snapshot training dibuat `training_reference` dan disimpan
+`save_model_and_metrics` di metrics.json (`drift_reference`).
+"""
+
+import math
+import threading
+from bisect import bisect_right
+
+import numpy as np
+
+# Bin kuantil per fitur pada snapshot training
+DRIFT_BINS = 20
+# Ambang PSI yang lazim: < 0.1 stabil, 0.1-0.25 perlu dipantau, >= 0.25 drift
+PSI_WARNING = 0.1
+PSI_DRIFT = 0.25
+# Proporsi minimum per bin agar PSI tetap terhingga untuk bin kosong
+PSI_EPSILON = 1e-4
+# Koefisien nilai kritis KS dua sampel untuk alpha = 0.05
+KS_COEFFICIENT = 1.358
+# Label frekuensi untuk kelas prediksi yang tidak ada di training
+OTHER_CLASS = "(lainnya)"
+
+def training_reference(X, y, feature_names, n_bins=DRIFT_BINS, scaler=None, source=None):
+    """
+    Snapshot distribusi training (JSON-serializable) untuk `DriftMonitor`.
+
+    Args:
+        X: Matriks fitur training (n_rows, n_features).
+        y: Label kelas per baris (string).
+        feature_names (list): Nama kolom X.
+        n_bins (int): Bin kuantil per fitur (nilai diskret bisa menghasilkan lebih sedikit).
+        scaler: StandardScaler jika X sudah diskalakan; dikembalikan ke satuan asli.
+        source (str): Keterangan asal data.
+    """
+    X = X.to_numpy() if hasattr(X, "to_numpy") else np.asarray(X)
+    features = []
+    for j, name in enumerate(feature_names):
+        column = X[:, j].astype(np.float64)
+        if scaler is not None:
+            column = column * scaler.scale_[j] + scaler.mean_[j]
+        column = column[~np.isnan(column)]
+        edges = np.unique(np.quantile(column, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, column, side="right"), minlength=len(edges) + 1)
+        features.append({
+            "name": str(name),
+            "count": int(len(column)),
+            "mean": float(column.mean()),
+            "std": float(column.std(ddof=1)) if len(column) > 1 else 0.0,
+            "min": float(column.min()),
+            "max": float(column.max()),
+            "edges": edges.tolist(),
+            "proportions": (counts / len(column)).tolist(),
+        })
+    labels, counts = np.unique(np.asarray(y).astype(str), return_counts=True)
+    return {
+        "source": source,
+        "count": int(len(y)),
+        "n_bins": int(n_bins),
+        "features": features,
+        "classes": {str(label): float(c / counts.sum()) for label, c in zip(labels, counts)},
+    }
+
+def population_stability_index(expected, actual, epsilon=PSI_EPSILON):
+    """PSI = sum((a - e) * ln(a / e)) atas proporsi bin."""
+    expected = np.clip(np.asarray(expected, dtype=np.float64), epsilon, None)
+    actual = np.clip(np.asarray(actual, dtype=np.float64), epsilon, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+def binned_quantile(edges, counts, low, high, q):
+    """Perkiraan kuantil `q` dari histogram, interpolasi linear di dalam bin."""
+    total = counts.sum()
+    if total == 0:
+        return math.nan
+    bounds = np.clip(np.concatenate([[low], edges, [high]]), low, high)
+    cdf = np.cumsum(counts) / total
+    k = int(np.searchsorted(cdf, q))
+    previous = cdf[k - 1] if k else 0.0
+    fraction = (q - previous) / (cdf[k] - previous) if cdf[k] > previous else 0.0
+    return float(bounds[k] + fraction * (bounds[k + 1] - bounds[k]))
+
+def drift_status(psi):
+    if psi >= PSI_DRIFT:
+        return "Drift signifikan"
+    if psi >= PSI_WARNING:
+        return "Perlu dipantau"
+    return "Stabil"
+
+
+class DriftMonitor:
+    """
+    Sketsa streaming input prediksi terhadap satu snapshot training.
+
+    Aman dipakai bersama antar sesi (satu lock); hasil `report` adalah
+    salinan.
+
+    Args:
+        reference (dict): Hasil `training_reference`.
+    """
+
+    def __init__(self, reference):
+        self.reference = reference
+        self.features = [f["name"] for f in reference["features"]]
+        self.labels = list(reference["classes"])
+        self._edges = [list(f["edges"]) for f in reference["features"]]
+        self._edge_arrays = [np.asarray(edges, dtype=np.float64) for edges in self._edges]
+        self._label_index = {label: i for i, label in enumerate(self.labels)}
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Kosongkan semua sketsa (snapshot training tetap)."""
+        n_features = len(self.features)
+        with self._lock:
+            self.count = 0
+            self.skipped = 0
+            self._mean = [0.0] * n_features
+            self._m2 = [0.0] * n_features
+            self._min = [math.inf] * n_features
+            self._max = [-math.inf] * n_features
+            self._bins = [[0] * (len(edges) + 1) for edges in self._edges]
+            # Indeks terakhir: kelas di luar snapshot training
+            self._classes = [0] * (len(self.labels) + 1)
+
+    def observe(self, values, predicted=None):
+        """
+        Catat satu prediksi: `values` berurutan seperti `features`, `predicted`
+        label kelas RF (opsional). Baris dengan NaN hanya dihitung di `skipped`.
+        """
+        values = [float(v) for v in values]
+        if any(v != v for v in values):
+            with self._lock:
+                self.skipped += 1
+            return
+        with self._lock:
+            self.count += 1
+            n = self.count
+            mean, m2, low, high = self._mean, self._m2, self._min, self._max
+            for j, x in enumerate(values):
+                delta = x - mean[j]
+                mean[j] += delta / n
+                m2[j] += delta * (x - mean[j])
+                if x < low[j]:
+                    low[j] = x
+                if x > high[j]:
+                    high[j] = x
+                self._bins[j][bisect_right(self._edges[j], x)] += 1
+            if predicted is not None:
+                self._classes[self._label_index.get(predicted, len(self.labels))] += 1
+
+    def update(self, X, predicted=None):
+        """Catat satu batch: X (n_rows, n_features), `predicted` label per baris."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.features))
+        complete = ~np.isnan(X).any(axis=1)
+        if predicted is not None:
+            predicted = np.asarray(predicted, dtype=object)[complete]
+        X = X[complete]
+        n_batch = len(X)
+        if n_batch == 0:
+            with self._lock:
+                self.skipped += int((~complete).sum())
+            return
+
+        batch_mean = X.mean(axis=0)
+        batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+        batch_min, batch_max = X.min(axis=0), X.max(axis=0)
+        bins = [np.bincount(np.searchsorted(edges, X[:, j], side="right"), minlength=len(edges) + 1)
+                for j, edges in enumerate(self._edge_arrays)]
+        classes = None
+        if predicted is not None:
+            index = np.array([self._label_index.get(label, len(self.labels)) for label in predicted], dtype=np.intp)
+            classes = np.bincount(index, minlength=len(self.labels) + 1)
+
+        with self._lock:
+            n_old = self.count
+            total = n_old + n_batch
+            delta = batch_mean - np.asarray(self._mean)
+            self._mean = (np.asarray(self._mean) + delta * n_batch / total).tolist()
+            self._m2 = (np.asarray(self._m2) + batch_m2 + delta ** 2 * n_old * n_batch / total).tolist()
+            self._min = np.minimum(self._min, batch_min).tolist()
+            self._max = np.maximum(self._max, batch_max).tolist()
+            for j, counts in enumerate(bins):
+                self._bins[j] = (np.asarray(self._bins[j]) + counts).tolist()
+            if classes is not None:
+                self._classes = (np.asarray(self._classes) + classes).tolist()
+            self.count = total
+            self.skipped += int((~complete).sum())
+
+    def report(self):
+        """
+        Skor drift terhadap snapshot training.
+
+        Returns:
+            dict: `count`, `skipped`, `features` (list dict per fitur: mean/std
+            sekarang & training, median perkiraan, proporsi per bin, `psi`,
+            `ks`, `ks_critical`, `status`), `classes` (proporsi prediksi vs training), `class_psi`,
+            `status` (terburuk).
+        """
+        with self._lock:
+            count, skipped = self.count, self.skipped
+            mean, m2 = list(self._mean), list(self._m2)
+            low, high = list(self._min), list(self._max)
+            bins = [np.asarray(b, dtype=np.float64) for b in self._bins]
+            classes = np.asarray(self._classes, dtype=np.float64)
+
+        features = []
+        for j, ref in enumerate(self.reference["features"]):
+            row = {
+                "name": ref["name"],
+                "mean": mean[j] if count else math.nan,
+                "std": math.sqrt(m2[j] / (count - 1)) if count > 1 else math.nan,
+                "min": low[j] if count else math.nan,
+                "max": high[j] if count else math.nan,
+                "median": binned_quantile(self._edge_arrays[j], bins[j], low[j], high[j], 0.5),
+                "ref_mean": ref["mean"],
+                "ref_std": ref["std"],
+                "psi": math.nan,
+                "ks": math.nan,
+                "ks_critical": math.nan,
+                "status": "Belum ada data",
+                "proportions": (bins[j] / count).tolist() if count else [0.0] * len(bins[j]),
+            }
+            if count:
+                expected = np.asarray(ref["proportions"])
+                actual = np.asarray(row["proportions"])
+                ks = float(np.abs(np.cumsum(actual) - np.cumsum(expected)).max())
+                row["psi"] = population_stability_index(expected, actual)
+                row["ks"] = ks
+                row["ks_critical"] = KS_COEFFICIENT * math.sqrt((ref["count"] + count) / (ref["count"] * count))
+                row["status"] = drift_status(row["psi"])
+            features.append(row)
+
+        expected = np.asarray([self.reference["classes"][label] for label in self.labels] + [0.0])
+        n_predicted = classes.sum()
+        actual = classes / n_predicted if n_predicted else np.zeros_like(classes)
+        class_psi = population_stability_index(expected, actual) if n_predicted else math.nan
+        scores = [row["psi"] for row in features if not math.isnan(row["psi"])]
+        if not math.isnan(class_psi):
+            scores.append(class_psi)
+        return {
+            "count": count,
+            "skipped": skipped,
+            "features": features,
+            "classes": {
+                label: {"training": float(e), "prediksi": float(a), "jumlah": int(c)}
+                for label, e, a, c in zip(self.labels + [OTHER_CLASS], expected, actual, classes)
+                if label != OTHER_CLASS or c
+            },
+            "class_psi": class_psi,
+            "status": drift_status(max(scores)) if scores else "Belum ada data",
+        }
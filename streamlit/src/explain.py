@@ -0,0 +1,220 @@
+"""
+Atribusi fitur per prediksi untuk FlatForest.
+
+`ForestExplainer.shap_values` menghitung nilai SHAP path-dependent (gaya
+TreeSHAP) langsung dari array node. Untuk himpunan fitur S, nilai harapan
+E[f(x) | x_S] dihitung seperti algoritma 1 TreeSHAP: di node yang memecah
+fitur anggota S jalurnya mengikuti x, selain itu kedua anak ditimbang dengan
+proporsi `cover` (jumlah sampel training) masing-masing. Bobot jalur setiap
+node dihitung level demi level untuk semua pohon, semua baris input, dan
+semua 2^M himpunan fitur sekaligus, lalu nilai Shapley diambil dari selisih
+E[S ∪ {i}] - E[S]. Untuk M fitur yang sedikit (model ini: 4, jadi 16
+himpunan) ini eksak dan sama dengan keluaran TreeSHAP. Array bobotnya
+berukuran 2^M x n_node per baris, jadi metode ini dibatasi M <=
+MAX_EXACT_FEATURES dan jumlah baris per blok diturunkan dari
+`memory_budget`; forest yang satu barisnya pun melebihi budget memakai Saabas.
+
+Forest tanpa `cover` (artifact lama) memakai atribusi jalur Saabas: selisih
+distribusi kelas node anak dan induk di sepanjang jalur keputusan, dijumlah
+per fitur pemecah.
+
+Kedua metode aditif: `base + sum(atribusi) == predict_proba(x)` per kelas.
+`ExplanationCache` menyimpan hasil per input dalam LRU, sama seperti
+`CachedPredictor` (src.serving).
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Batas fitur untuk enumerasi 2^M himpunan (TreeSHAP); di atasnya memakai Saabas
+MAX_EXACT_FEATURES = 6
+# Memori maksimum array bobot (2^M, baris, node) float64 per blok TreeSHAP
+EXACT_MEMORY_BUDGET = 64 * 2**20
+SAABAS_CHUNK_SIZE = 1024
+
+class ForestExplainer:
+    """
+    Penjelas prediksi untuk satu FlatForest; struktur pohon diolah sekali.
+
+    Args:
+        forest (FlatForest): Forest dari artifact model.
+        chunk_size (int): Baris input per blok perhitungan (None = bawaan;
+            untuk TreeSHAP sebanyak yang muat di `memory_budget`, dan tidak
+            pernah melebihinya).
+        memory_budget (int): Byte maksimum array bobot TreeSHAP per blok.
+    """
+
+    def __init__(self, forest, chunk_size=None, memory_budget=EXACT_MEMORY_BUDGET):
+        self.forest = forest
+        self.features = list(forest.feature_names)
+        self.labels = list(forest.class_labels) if forest.class_labels is not None else None
+        n_features = len(self.features)
+        children = np.asarray(forest.children, dtype=np.int64)
+        feature = np.asarray(forest.feature, dtype=np.int64)
+        n_nodes = len(feature)
+
+        # Array bobot satu baris: (2^M himpunan, n_node) float64
+        exact = forest.cover is not None and n_features <= MAX_EXACT_FEATURES
+        row_bytes = 8 * 2 ** n_features * n_nodes if exact else 0
+        if exact and row_bytes <= memory_budget:
+            self.method = "treeshap"
+            max_rows = memory_budget // row_bytes
+            self.chunk_size = max(1, min(chunk_size or max_rows, max_rows))
+        else:
+            self.method = "saabas"
+            self.chunk_size = chunk_size or SAABAS_CHUNK_SIZE
+        ids = np.arange(n_nodes)
+        is_leaf = children[:, 0] == ids
+        internal = ids[~is_leaf]
+
+        # Induk setiap node dan apakah node itu anak kanan
+        parent = np.full(n_nodes, -1, dtype=np.int64)
+        parent[children[internal, 0]] = internal
+        parent[children[internal, 1]] = internal
+        self._is_right = np.zeros(n_nodes, dtype=bool)
+        self._is_right[children[internal, 1]] = True
+
+        # Node non-akar dikelompokkan per kedalaman (induk selalu di level sebelumnya)
+        levels = []
+        frontier = children[internal[np.isin(internal, forest.roots)]].ravel()
+        while len(frontier):
+            levels.append(frontier)
+            frontier = children[frontier[~is_leaf[frontier]]].ravel()
+        self._levels = levels
+        self._parent = parent
+        self._split_feature = np.where(parent >= 0, feature[np.maximum(parent, 0)], 0)
+        self._threshold = np.asarray(forest.threshold, dtype=np.float64)
+        self._leaves = ids[is_leaf]
+
+        value = np.asarray(forest.value, dtype=np.float64)
+        # Distribusi per pohon, dinormalisasi seperti predict_proba lalu dibagi jumlah pohon
+        value = value / value.sum(axis=1, keepdims=True) / forest.n_trees
+        self._value = value
+        self._roots = np.asarray(forest.roots, dtype=np.int64)
+        self.expected_value = value[self._roots].sum(axis=0) if self.method == "saabas" else None
+
+        if self.method == "treeshap":
+            cover = np.asarray(forest.cover, dtype=np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self._cover_ratio = np.where(parent >= 0, cover / cover[np.maximum(parent, 0)], 1.0)
+            subsets = np.arange(2 ** n_features)
+            sizes = np.array([bin(s).count("1") for s in subsets])
+            # Bobot Shapley |S|! (M - |S| - 1)! / M! untuk S yang tidak memuat fitur i
+            self._subsets = subsets
+            self._shapley = np.array([
+                math.factorial(k) * math.factorial(n_features - k - 1) / math.factorial(n_features)
+                if k < n_features else 0.0 for k in sizes
+            ])
+            # E[f] tanpa fitur yang diketahui = nilai dasar
+            self.expected_value = self._expectations(np.zeros((1, n_features)), subsets[:1])[0, 0]
+
+    def _expectations(self, X, subsets):
+        """E[f(x) | x_S] untuk setiap himpunan (bitmask), shape (n_subsets, n_rows, n_classes)."""
+        n_rows = X.shape[0]
+        weight = np.zeros((len(subsets), n_rows, len(self._parent)))
+        weight[:, :, self._roots] = 1.0
+        for level in self._levels:
+            parent = self._parent[level]
+            split = self._split_feature[level]
+            # Arah yang diambil x di node induk == arah node ini?
+            follows = (X[:, split] > self._threshold[parent]) == self._is_right[level]
+            known = (subsets[:, np.newaxis] >> split) & 1 == 1
+            factor = np.where(known[:, np.newaxis, :], follows[np.newaxis, :, :], self._cover_ratio[level])
+            weight[:, :, level] = weight[:, :, parent] * factor
+        return weight[:, :, self._leaves] @ self._value[self._leaves]
+
+    def _treeshap(self, X):
+        n_features = X.shape[1]
+        expectations = self._expectations(X, self._subsets)
+        phi = np.zeros((X.shape[0], n_features, expectations.shape[2]))
+        for i in range(n_features):
+            bit = 1 << i
+            without = self._subsets[(self._subsets & bit) == 0]
+            gain = expectations[without | bit] - expectations[without]
+            phi[:, i, :] = np.tensordot(self._shapley[without], gain, axes=1)
+        return phi
+
+    def _saabas(self, X):
+        n_rows = X.shape[0]
+        leaves = self.forest.apply(X)  # (n_rows, n_trees)
+        phi = np.zeros((n_rows, X.shape[1], self._value.shape[1]))
+        nodes = leaves
+        rows = np.broadcast_to(np.arange(n_rows)[:, np.newaxis], nodes.shape)
+        # Naik dari leaf ke akar: setiap langkah menambah (anak - induk) ke fitur pemecah induk
+        while True:
+            parent = self._parent[nodes]
+            moving = parent >= 0
+            if not moving.any():
+                break
+            child, up = nodes[moving], parent[moving]
+            np.add.at(phi, (rows[moving], self._split_feature[child]),
+                      self._value[child] - self._value[up])
+            nodes = np.where(moving, parent, nodes)
+        return phi
+
+    def shap_values(self, X):
+        """
+        Atribusi per baris, fitur, dan kelas.
+
+        Returns:
+            np.ndarray: (n_rows, n_features, n_classes); ditambah
+            `expected_value` sama dengan `forest.predict_proba(X)`.
+        """
+        X = self.forest._as_matrix(X)
+        explain = self._treeshap if self.method == "treeshap" else self._saabas
+        parts = [explain(X[start:start + self.chunk_size]) for start in range(0, X.shape[0], self.chunk_size)]
+        return np.concatenate(parts) if parts else np.zeros((0, len(self.features), self._value.shape[1]))
+
+
+class ExplanationCache:
+    """
+    Atribusi satu baris lewat LRU terbatas (key: tuple fitur float, seperti
+    `CachedPredictor`). Hasil read-only dibagi antar sesi.
+    """
+
+    def __init__(self, explainer, maxsize=1024):
+        self.explainer = explainer
+        self.maxsize = max(1, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def features(self):
+        return self.explainer.features
+
+    def explain(self, values):
+        """
+        Returns:
+            dict: `method`, `base` (n_classes,), `shap` (n_features, n_classes),
+            `features`, `labels`.
+        """
+        key = tuple(float(v) for v in values)
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            self.misses += 1
+        phi = self.explainer.shap_values(np.asarray([key]))[0]
+        phi.flags.writeable = False
+        result = {
+            "method": self.explainer.method,
+            "base": self.explainer.expected_value,
+            "shap": phi,
+            "features": self.explainer.features,
+            "labels": self.explainer.labels,
+        }
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._cache), "maxsize": self.maxsize}
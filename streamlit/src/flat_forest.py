@@ -0,0 +1,222 @@
+"""
+Flat-array inference engine for the Random Forest artifact.
+
+Semua pohon RandomForestClassifier dikemas ke dalam array NumPy yang
+bersebelahan (feature, threshold, children, distribusi kelas di leaf) dan
+StandardScaler dilipat ke dalam threshold, sehingga prediksi cukup berupa
+beberapa operasi indexing tanpa overhead sklearn per panggilan.
+"""
+
+import numpy as np
+
+_INT64_MIN = np.int64(-2**63)
+
+def _ordered_keys(x):
+    """Map float64 ke int64 yang urutannya sama dengan urutan nilai float."""
+    bits = np.ascontiguousarray(x, dtype=np.float64).view(np.int64)
+    return np.where(bits < 0, _INT64_MIN - bits, bits)
+
+def _from_ordered_keys(keys):
+    """Kebalikan dari _ordered_keys."""
+    bits = np.where(keys < 0, _INT64_MIN - keys, keys)
+    return bits.view(np.float64)
+
+def _scaled_as_sklearn(x, mean, scale):
+    """Nilai fitur seperti yang dibandingkan sklearn: float32((x - mean) / scale)."""
+    with np.errstate(invalid="ignore", over="ignore"):
+        return ((x - mean) / scale).astype(np.float32).astype(np.float64)
+
+def scaler_params(scaler, n_features):
+    """(mean, scale) dari StandardScaler, tuple (mean, scale), atau identitas jika None."""
+    if isinstance(scaler, tuple):
+        mean, scale = scaler
+        return np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64)
+    mean = np.zeros(n_features)
+    scale = np.ones(n_features)
+    if scaler is not None:
+        if getattr(scaler, "mean_", None) is not None and scaler.with_mean:
+            mean = np.asarray(scaler.mean_, dtype=np.float64)
+        if getattr(scaler, "scale_", None) is not None and scaler.with_std:
+            scale = np.asarray(scaler.scale_, dtype=np.float64)
+    return mean, scale
+
+def fold_thresholds(threshold, mean, scale):
+    """
+    Melipat StandardScaler ke dalam threshold pohon secara eksak.
+
+    sklearn mengevaluasi `float32((x - mean) / scale) <= t`. Karena fungsi itu
+    monoton terhadap x, kondisinya setara dengan `x <= T` untuk T = nilai
+    float64 terbesar yang masih memenuhi. T dicari dengan bisection atas
+    representasi bit float64 (vektor untuk semua node sekaligus), sehingga
+    hasil prediksi identik dengan pipeline scaler + sklearn.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    mean = np.broadcast_to(np.asarray(mean, dtype=np.float64), threshold.shape)
+    scale = np.broadcast_to(np.asarray(scale, dtype=np.float64), threshold.shape)
+
+    # lo selalu memenuhi kondisi (-inf), hi tidak pernah memenuhi (+inf)
+    lo = np.full(threshold.shape, _ordered_keys(np.array(-np.inf))[()], dtype=np.int64)
+    hi = np.full(threshold.shape, _ordered_keys(np.array(np.inf))[()], dtype=np.int64)
+    for _ in range(66):
+        active = (hi - 1) > lo
+        if not active.any():
+            break
+        mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)
+        ok = _scaled_as_sklearn(_from_ordered_keys(mid), mean, scale) <= threshold
+        lo = np.where(active & ok, mid, lo)
+        hi = np.where(active & ~ok, mid, hi)
+    return _from_ordered_keys(lo)
+
+
+class FlatForest:
+    """
+    Random Forest yang disimpan sebagai array node datar.
+
+    Attributes:
+        feature (int32[n_nodes]): Indeks fitur per node (0 untuk leaf).
+        threshold (float64[n_nodes]): Threshold di ruang fitur mentah (scaler sudah dilipat).
+        children (int32[n_nodes, 2]): Anak kiri/kanan; leaf menunjuk ke dirinya sendiri.
+        value (float64[n_nodes, n_classes]): Distribusi kelas per node.
+        roots (int32[n_trees]): Indeks node akar setiap pohon.
+        max_depth (int): Kedalaman pohon terdalam.
+        classes (ndarray): Label kelas, sama dengan `model.classes_`.
+        value_scale (float): Skala `value` yang dikuantisasi (mis. 255 untuk
+            uint8, lihat src.compression); 1.0 untuk distribusi float apa adanya.
+        cover (float[n_nodes] | None): Jumlah sampel (berbobot) training yang
+            melewati node; opsional, dipakai untuk atribusi TreeSHAP (src.explain).
+    """
+
+    ARRAY_NAMES = ("feature", "threshold", "children", "value", "roots", "classes")
+    OPTIONAL_ARRAY_NAMES = ("cover",)
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, classes,
+                 feature_names=None, class_labels=None, value_scale=1.0, cover=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes = classes
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.class_labels = list(class_labels) if class_labels is not None else None
+        self.value_scale = float(value_scale)
+        self.cover = cover
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_classes(self):
+        return self.value.shape[1]
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None, feature_names=None, class_labels=None):
+        """
+        Mengemas RandomForestClassifier (dan StandardScaler opsional) ke array datar.
+
+        Args:
+            model: RandomForestClassifier yang sudah di-fit (single output).
+            scaler: StandardScaler yang dipakai saat training, tuple (mean, scale), atau None.
+            feature_names (list): Nama fitur sesuai urutan kolom.
+            class_labels (list): Nama kelas sesuai urutan `model.classes_`.
+        """
+        n_classes = int(model.n_classes_)
+        mean, scale = scaler_params(scaler, model.n_features_in_)
+
+        features, thresholds, children, values, covers, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(offset, offset + n)
+
+            feature = np.where(is_leaf, 0, tree.feature)
+            threshold = np.full(n, np.inf)
+            internal = ~is_leaf
+            threshold[internal] = fold_thresholds(
+                tree.threshold[internal], mean[feature[internal]], scale[feature[internal]]
+            )
+            child = np.empty((n, 2), dtype=np.int64)
+            child[:, 0] = np.where(is_leaf, node_ids, tree.children_left + offset)
+            child[:, 1] = np.where(is_leaf, node_ids, tree.children_right + offset)
+
+            features.append(feature)
+            thresholds.append(threshold)
+            children.append(child)
+            values.append(tree.value[:, 0, :n_classes])
+            covers.append(tree.weighted_n_node_samples)
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds),
+            children=np.concatenate(children).astype(np.int32),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            classes=np.asarray(model.classes_),
+            feature_names=feature_names,
+            class_labels=class_labels,
+            cover=np.concatenate(covers).astype(np.float64),
+        )
+
+    def arrays(self):
+        """Array node yang disimpan ke artifact (lihat src.artifacts), per nama."""
+        arrays = {name: getattr(self, name) for name in self.ARRAY_NAMES}
+        arrays.update({name: getattr(self, name) for name in self.OPTIONAL_ARRAY_NAMES
+                       if getattr(self, name) is not None})
+        return arrays
+
+    def _as_matrix(self, X):
+        if hasattr(X, "columns"):
+            if self.feature_names is not None and list(X.columns) != self.feature_names:
+                X = X[self.feature_names]
+            X = X.to_numpy(dtype=np.float64)
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        return X
+
+    def apply(self, X):
+        """Indeks leaf (global) untuk setiap baris dan pohon, shape (n_rows, n_trees)."""
+        X = self._as_matrix(X)
+        n_rows, n_features = X.shape
+        flat_x = X.ravel()
+        row_offset = (np.arange(n_rows, dtype=np.int32) * n_features)[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+        flat_children = self.children.ravel()
+        # Leaf menunjuk ke dirinya sendiri, jadi cukup melangkah max_depth kali
+        for _ in range(self.max_depth):
+            x_node = np.take(flat_x, row_offset + np.take(self.feature, nodes))
+            go_right = x_node > np.take(self.threshold, nodes)
+            nodes = np.take(flat_children, 2 * nodes + go_right)
+        return nodes
+
+    def predict_proba(self, X, chunk_size=4096):
+        """
+        Probabilitas kelas, identik dengan `model.predict_proba(scaler.transform(X))`.
+
+        Baris diproses per `chunk_size` agar memori indeks node tetap kecil.
+        """
+        X = self._as_matrix(X)
+        proba = np.empty((X.shape[0], self.n_classes))
+        for start in range(0, X.shape[0], chunk_size):
+            leaves = self.apply(X[start:start + chunk_size])
+            # Jumlahkan per pohon secara berurutan seperti akumulasi di sklearn
+            per_tree = np.take(self.value, leaves.T, axis=0)
+            proba[start:start + chunk_size] = np.add.reduce(per_tree, axis=0, dtype=np.float64)
+        if self.value_scale == 1.0:
+            proba /= self.n_trees
+        else:
+            # Leaf terkuantisasi tidak tepat berjumlah value_scale; normalisasi per baris
+            proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, X):
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1))
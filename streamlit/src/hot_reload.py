@@ -0,0 +1,201 @@
+"""
+Hot-reload artifact di dashboard yang sedang berjalan.
+
+`ArtifactWatcher` memegang satu versi artifact yang aktif dan memantau file
+sumbernya (mtime + ukuran, lalu hash isi):
+
+* `get()` tidak pernah menunggu reload: paling sering sekali per
+  `interval` detik ia melakukan `stat`, dan jika ada perubahan memulai thread
+  latar yang memuat versi baru. Sesi tetap memakai versi lama sampai versi
+  baru selesai dimuat, lalu referensinya ditukar sekaligus (atomik).
+* Perubahan yang hanya menyentuh mtime (hash isi sama) tidak memicu reload.
+* File yang masih ditulis (gagal dimuat, atau berubah lagi selama dimuat)
+  diabaikan; versi lama tetap dipakai dan dicoba lagi di pemeriksaan
+  berikutnya.
+* Watcher hanya menyimpan referensi ke versi aktif (beserta nilai turunannya,
+  lihat `derived`), sehingga versi lama dibebaskan begitu tidak ada sesi yang
+  masih memegangnya.
+
+Modul ini tidak memanggil streamlit; loader tidak boleh memanggil `st.*`
+karena dijalankan di thread latar.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import weakref
+
+def file_signature(paths):
+    """(mtime_ns, ukuran) setiap path, None untuk yang tidak ada."""
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            signature.append(None)
+        else:
+            signature.append((st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+def content_hash(paths, chunk_size=1 << 20):
+    """SHA-256 gabungan isi semua path yang ada (urutan path ikut di-hash)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.encode())
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(chunk_size), b""):
+                    digest.update(chunk)
+        except FileNotFoundError:
+            digest.update(b"\0missing")
+    return digest.hexdigest()
+
+
+class _Version:
+    """Satu versi yang dimuat: nilai, sidik file, dan nilai turunannya."""
+
+    def __init__(self, number, value, signature, digest):
+        self.number = number
+        self.value = value
+        self.signature = signature
+        self.digest = digest
+        self.derived = {}
+
+
+class ArtifactWatcher:
+    """
+    Artifact yang dimuat ulang otomatis saat file sumbernya berubah.
+
+    Args:
+        loader (callable): Tanpa argumen, mengembalikan artifact (boleh None).
+        paths (list): File yang dipantau; untuk direktori artifact cukup
+            manifest-nya (ditulis terakhir lewat rename atomik).
+        interval (float): Jeda minimum antar pemeriksaan `stat`, dalam detik.
+        name (str): Nama untuk pesan/statistik.
+    """
+
+    def __init__(self, loader, paths, interval=2.0, name=None):
+        self.loader = loader
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.interval = interval
+        self.name = name or getattr(loader, "__name__", "artifact")
+        self._lock = threading.Lock()
+        self._current = None
+        self._checked_at = 0.0
+        self._thread = None
+        self._retired = []
+        self._loads = 0
+        self._failures = 0
+        self.last_error = None
+
+    def _swap(self, value, signature, digest):
+        with self._lock:
+            old = self._current
+            number = old.number + 1 if old is not None else 1
+            self._current = _Version(number, value, signature, digest)
+            self._loads += 1
+            if old is not None:
+                try:
+                    self._retired.append(weakref.ref(old.value))
+                except TypeError:  # dict/None tidak bisa di-weakref; tetap dilepas
+                    pass
+            self._retired = [ref for ref in self._retired if ref() is not None]
+
+    def _reload(self, signature):
+        try:
+            current = self._current
+            digest = content_hash(self.paths)
+            if digest == current.digest:
+                # Hanya mtime yang berubah: versi sama, catat sidik barunya
+                with self._lock:
+                    current.signature = signature
+                return
+            value = self.loader()
+            # Berubah lagi selama dimuat (masih ditulis): tunggu pemeriksaan berikutnya
+            if file_signature(self.paths) == signature:
+                self._swap(value, signature, digest)
+                self.last_error = None
+        except Exception as e:  # file setengah ditulis, format rusak, dll.
+            self._failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+        finally:
+            self._thread = None
+
+    def _first_load(self):
+        with self._lock:
+            if self._current is not None:
+                return
+            signature = file_signature(self.paths)
+            digest = content_hash(self.paths)
+            value = self.loader()
+            self._current = _Version(1, value, signature, digest)
+            self._loads += 1
+            self._checked_at = time.monotonic()
+
+    def check(self, now=None):
+        """
+        Mulai reload latar jika file berubah (dibatasi `interval`).
+
+        Returns:
+            bool: True jika reload baru dimulai.
+        """
+        now = time.monotonic() if now is None else now
+        if self._current is None or self._thread is not None or now - self._checked_at < self.interval:
+            return False
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._checked_at = now
+            signature = file_signature(self.paths)
+            if signature == self._current.signature:
+                return False
+            self._thread = threading.Thread(
+                target=self._reload, args=(signature,), name=f"reload-{self.name}", daemon=True
+            )
+            self._thread.start()
+        return True
+
+    def get(self):
+        """Versi aktif. Hanya pemanggilan pertama yang menunggu loader."""
+        if self._current is None:
+            self._first_load()
+        else:
+            self.check()
+        return self._current.value
+
+    def derived(self, key, factory):
+        """
+        Nilai turunan versi aktif (mis. predictor ber-cache untuk model ini),
+        dibuat sekali per versi dan dibebaskan bersama versinya.
+        """
+        version = self._current
+        if version is None:
+            self.get()
+            version = self._current
+        with self._lock:
+            if key not in version.derived:
+                version.derived[key] = factory(version.value)
+            return version.derived[key]
+
+    def wait(self, timeout=None):
+        """Tunggu reload latar yang sedang berjalan (untuk skrip dan test)."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    @property
+    def version(self):
+        """Nomor versi aktif (naik setiap swap), 0 sebelum dimuat."""
+        return self._current.number if self._current is not None else 0
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "version": self.version,
+            "loads": self._loads,
+            "failures": self._failures,
+            "reloading": self._thread is not None,
+            "retired_alive": sum(ref() is not None for ref in self._retired),
+            "last_error": self.last_error,
+        }
@@ -1,39 +1,160 @@
+"""
+Loader artifact untuk app Streamlit.
+
+Modul ini sengaja ringan (hanya streamlit, json, os): pandas, numpy dan
+joblib/sklearn baru diimpor di dalam loader yang membutuhkannya, sehingga
+halaman yang tidak memakai artifact tersebut tidak membayar biaya impornya.
+
+Model dan metrics dibungkus `ArtifactWatcher` (src.hot_reload): hasil
+training ulang dipakai tanpa restart server. cache_resource hanya menyimpan
+watcher-nya; versi artifact yang aktif dipegang watcher, bukan cache
+Streamlit, sehingga versi lama bisa dibebaskan.
+"""
+
 import streamlit as st
-import pandas as pd
-import joblib
 import json
 import os
-from src.config import MODEL_PATH, DATASET_PATH, METRICS_PATH
+from src.config import (MODEL_PATH, ARTIFACT_DIR, DATASET_PATH, PANEL_DIR, METRICS_PATH, PREDICTION_CACHE_SIZE,
+                        RELOAD_INTERVAL_SECONDS, SENSITIVITY_CACHE_SIZE, EXPLANATION_CACHE_SIZE, AUDIT_DIR,
+                        AUDIT_BATCH_SIZE, AUDIT_FLUSH_SECONDS, AUDIT_SEGMENT_BYTES)
+
+def _read_model():
+    """Artifact model: direktori manifest (memory-mapped), fallback ke joblib."""
+    from src.artifacts import load_artifact
+
+    artifact = load_artifact(ARTIFACT_DIR, MODEL_PATH)
+    if artifact is not None:
+        artifact.forest  # buka array node sekarang (di thread reload), bukan di sesi
+    return artifact
+
+def _read_metrics():
+    if not os.path.exists(METRICS_PATH):
+        return {}
+    with open(METRICS_PATH) as f:
+        return json.load(f)
 
 @st.cache_resource
+def model_watcher():
+    """Watcher artifact model (manifest direktori artifact + file joblib)."""
+    from src.artifacts import MANIFEST_NAME
+    from src.hot_reload import ArtifactWatcher
+
+    return ArtifactWatcher(_read_model, [os.path.join(ARTIFACT_DIR, MANIFEST_NAME), MODEL_PATH],
+                           interval=RELOAD_INTERVAL_SECONDS, name="model")
+
+@st.cache_resource
+def metrics_watcher():
+    from src.hot_reload import ArtifactWatcher
+
+    return ArtifactWatcher(_read_metrics, [METRICS_PATH], interval=RELOAD_INTERVAL_SECONDS, name="metrics")
+
 def load_model():
-    if not os.path.exists(MODEL_PATH):
-        st.error(f"Model file not found at {MODEL_PATH}")
+    """Versi artifact model yang aktif (dimuat ulang otomatis saat berubah)."""
+    artifact = model_watcher().get()
+    if artifact is None:
+        st.error(f"Model artifact not found at {ARTIFACT_DIR} or {MODEL_PATH}")
+    return artifact
+
+def _make_predictor(artifact):
+    from src.serving import CachedPredictor
+
+    if artifact is None:
+        return None
+    return CachedPredictor(artifact.forest, maxsize=PREDICTION_CACHE_SIZE, version=artifact.version)
+
+def load_predictor():
+    """
+    CachedPredictor untuk versi model aktif: satu LRU dibagi semua sesi,
+    sehingga input what-if yang sama cukup dihitung sekali. Cache ikut
+    diganti (dan yang lama dibebaskan) saat model dimuat ulang.
+    """
+    watcher = model_watcher()
+    if watcher.get() is None:
+        return None
+    return watcher.derived("predictor", _make_predictor)
+
+def _make_explainer(artifact):
+    from src.explain import ExplanationCache, ForestExplainer
+
+    if artifact is None:
+        return None
+    return ExplanationCache(ForestExplainer(artifact.forest), maxsize=EXPLANATION_CACHE_SIZE)
+
+def load_explainer():
+    """Atribusi fitur per prediksi (TreeSHAP) untuk versi model aktif, LRU per input."""
+    watcher = model_watcher()
+    if watcher.get() is None:
         return None
-    return joblib.load(MODEL_PATH)
+    return watcher.derived("explainer", _make_explainer)
+
+def _make_sensitivity(artifact):
+    from src.sensitivity import SensitivitySweeper
+
+    return SensitivitySweeper(artifact.forest if artifact is not None else None, maxsize=SENSITIVITY_CACHE_SIZE)
+
+def load_sensitivity():
+    """
+    SensitivitySweeper untuk versi model aktif (grid what-if di-cache per
+    input dasar, dibagi antar sesi). Tanpa model hanya skor manual yang disapu.
+    """
+    return model_watcher().derived("sensitivity", _make_sensitivity)
 
-@st.cache_data
+@st.cache_resource
 def load_dataset():
-    if not os.path.exists(DATASET_PATH):
+    """
+    Dataset preprocessing: salinan columnar (memory-mapped) jika ada, fallback
+    ke CSV. cache_resource agar frame yang di-mmap dibagi, bukan di-pickle
+    ulang per sesi; view hanya membacanya.
+    """
+    import pandas as pd
+    from src.columnar import columnar_dir, read_table
+
+    if not os.path.exists(DATASET_PATH) and not os.path.isdir(columnar_dir(DATASET_PATH)):
         st.error(f"Dataset file not found at {DATASET_PATH}")
         return pd.DataFrame()
-    return pd.read_csv(DATASET_PATH)
+    return read_table(DATASET_PATH)
+
+def _make_drift_monitor(metrics):
+    from src.drift import DriftMonitor, training_reference
+
+    reference = metrics.get("drift_reference") if metrics else None
+    if reference is None:
+        # metrics.json dari training lama belum punya snapshot: pakai seluruh dataset
+        dataset = load_dataset()
+        if dataset.empty:
+            return None
+        artifact = model_watcher().get()
+        target = "kesejahteraan"
+        features = list(artifact.features) if artifact is not None else [c for c in dataset.columns if c != target]
+        reference = training_reference(dataset[features].to_numpy(), dataset[target].to_numpy(), features,
+                                       source=os.path.basename(DATASET_PATH))
+    return DriftMonitor(reference)
+
+def load_drift():
+    """
+    DriftMonitor proses ini (dibagi semua sesi) terhadap snapshot training di
+    metrics.json; diganti baru bersama metrics saat model dilatih ulang.
+    """
+    return metrics_watcher().derived("drift", _make_drift_monitor)
+
+@st.cache_resource
+def load_panel():
+    """Panel (wilayah, tahun) memory-mapped, atau None jika belum dibangun."""
+    from src.atomic import wait_for_swap
+    from src.panel import PanelStore
+
+    if not wait_for_swap(PANEL_DIR):
+        return None
+    return PanelStore.load(PANEL_DIR)
 
-@st.cache_data
 def load_metrics():
-    if not os.path.exists(METRICS_PATH):
-        return {}
-    with open(METRICS_PATH) as f:
-        return json.load(f)
+    """Isi metrics.json versi terakhir (dibagi antar sesi; jangan diubah)."""
+    return metrics_watcher().get()
+
+@st.cache_resource
+def load_audit():
+    """Audit log prediksi (satu writer latar per proses server)."""
+    from src.audit import AuditLog
 
-def load_all_artifacts():
-    """Load all necessary artifacts at once."""
-    artifacts = load_model()
-    dataset = load_dataset()
-    metrics = load_metrics()
-    
-    return {
-        "model_artifacts": artifacts,
-        "dataset": dataset,
-        "metrics": metrics
-    }
+    return AuditLog(AUDIT_DIR, batch_size=AUDIT_BATCH_SIZE, flush_interval=AUDIT_FLUSH_SECONDS,
+                    segment_bytes=AUDIT_SEGMENT_BYTES)
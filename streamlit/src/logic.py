@@ -1,3 +1,15 @@
+import numpy as np
+
+# Batas bawah skor untuk setiap kategori (dipakai versi skalar & batch)
+BATAS_KATEGORI = np.array([20.0, 40.0, 60.0, 120.0])
+LABEL_KATEGORI = np.array([
+    "Sangat Tidak Sejahtera",
+    "Tidak Sejahtera",
+    "Cukup",
+    "Sejahtera",
+    "Sangat Sejahtera",
+], dtype=object)
+
 def hitung_skor_kesejahteraan(P, M, U, Y, S):
     """
     Menghitung skor kesejahteraan berdasarkan rumus manual.
@@ -11,7 +23,7 @@ def hitung_skor_kesejahteraan(P, M, U, Y, S):
     """
     # Menghindari pembagian dengan nol
     if P == 0:
-        return 0
+        return 0, 0, 0, 0, 0
         
     pdrb_score = (Y / 1e10) * 4
     edu_score = S * 10
@@ -21,6 +33,46 @@ def hitung_skor_kesejahteraan(P, M, U, Y, S):
     skor = pdrb_score + edu_score - poverty_impact - unemployment_impact
     return skor, pdrb_score, edu_score, poverty_impact, unemployment_impact
 
+def hitung_skor_kesejahteraan_batch(P, M, U, Y, S):
+    """
+    Versi vektor dari hitung_skor_kesejahteraan untuk satu kolom penuh.
+
+    Args:
+        P, M, U, Y, S: Array/Series dengan panjang sama (skalar di-broadcast).
+
+    Returns:
+        Tuple (skor, pdrb_score, edu_score, poverty_impact, unemployment_impact)
+        berupa np.ndarray float64. Baris dengan P == 0 bernilai 0 pada semua
+        komponen, sama seperti versi skalar.
+    """
+    kolom = [np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in (P, M, U, Y, S)]
+    if len({k.shape for k in kolom}) > 1:
+        kolom = np.broadcast_arrays(*kolom)
+    P, M, U, Y, S = kolom
+
+    nol = P == 0
+    ada_nol = nol.any()
+    if ada_nol:
+        # Pembagi 1 untuk baris P == 0 agar tidak ada peringatan divide-by-zero
+        P = np.where(nol, 1.0, P)
+
+    pdrb_score = Y / 1e10
+    pdrb_score *= 4
+    edu_score = S * 10
+    poverty_impact = M / P
+    poverty_impact *= 50
+    unemployment_impact = U / P
+    unemployment_impact *= 50
+
+    skor = pdrb_score + edu_score
+    skor -= poverty_impact
+    skor -= unemployment_impact
+
+    if ada_nol:
+        for komponen in (skor, pdrb_score, edu_score, poverty_impact, unemployment_impact):
+            komponen[nol] = 0.0
+    return skor, pdrb_score, edu_score, poverty_impact, unemployment_impact
+
 def tentukan_kategori(skor):
     """Menentukan kategori teks berdasarkan skor."""
     if skor < 20:
@@ -34,6 +86,15 @@ def tentukan_kategori(skor):
     else:
         return "Sangat Sejahtera"
 
+def kode_kategori_batch(skor):
+    """Indeks kategori (0-4, urutan LABEL_KATEGORI) untuk setiap skor."""
+    # side='right' => skor tepat di batas masuk kategori atas, sama dengan tentukan_kategori
+    return np.searchsorted(BATAS_KATEGORI, skor, side="right").astype(np.int8)
+
+def tentukan_kategori_batch(skor):
+    """Versi vektor dari tentukan_kategori, mengembalikan array label kategori."""
+    return LABEL_KATEGORI[kode_kategori_batch(skor)]
+
 def get_css_class(kategori):
     """Mengembalikan class CSS berdasarkan kategori."""
     if kategori in ["Sejahtera", "Sangat Sejahtera"]:
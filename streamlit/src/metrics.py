@@ -0,0 +1,165 @@
+"""
+Single-pass evaluation core.
+
+Semua metrik klasifikasi diturunkan dari satu confusion matrix, dan metrik
+probabilitas (top-k, log loss, Brier, AUC per kelas) dari satu hasil
+`predict_proba`. `EvaluationAccumulator` bisa di-update per chunk sehingga
+held-out set besar tidak perlu dimuat sekaligus; AUC dihitung dari histogram
+skor dengan bin tetap agar memori tetap konstan.
+"""
+
+import numpy as np
+
+DEFAULT_TOP_K = (1, 2, 3)
+AUC_BINS = 1000
+_EPS = np.finfo(np.float64).eps  # clip log loss seperti sklearn
+
+def _safe_divide(num, den):
+    """num / den dengan 0 jika den == 0 (sama dengan zero_division=0 di sklearn)."""
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    out = np.zeros(np.broadcast(num, den).shape)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+def report_from_confusion(cm, labels):
+    """
+    Classification report (format `output_dict=True` sklearn) dari confusion
+    matrix: baris = label asli, kolom = prediksi.
+    """
+    cm = np.asarray(cm, dtype=np.int64)
+    tp = np.diag(cm).astype(np.float64)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    precision = _safe_divide(tp, predicted)
+    recall = _safe_divide(tp, support)
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+    total = support.sum()
+
+    report = {}
+    for i, label in enumerate(labels):
+        report[label] = {
+            "precision": float(precision[i]),
+            "recall": float(recall[i]),
+            "f1-score": float(f1[i]),
+            "support": float(support[i]),
+        }
+    report["accuracy"] = float(tp.sum() / total) if total else 0.0
+    weights = _safe_divide(support, total)
+    for name, avg in (("macro avg", lambda v: v.mean()), ("weighted avg", lambda v: (v * weights).sum())):
+        report[name] = {
+            "precision": float(avg(precision)),
+            "recall": float(avg(recall)),
+            "f1-score": float(avg(f1)),
+            "support": float(total),
+        }
+    return report
+
+def format_report(report, labels, digits=2):
+    """Teks report bergaya `sklearn.metrics.classification_report`."""
+    headers = ["precision", "recall", "f1-score", "support"]
+    width = max(len("weighted avg"), *(len(str(label)) for label in labels), digits)
+    lines = [f"{'':>{width}} " + "".join(f" {h:>9}" for h in headers), ""]
+
+    def row(name, values):
+        return (f"{name:>{width}} "
+                + "".join(f" {values[h]:>9.{digits}f}" for h in headers[:3])
+                + f" {int(values['support']):>9}")
+
+    lines += [row(label, report[label]) for label in labels]
+    lines.append("")
+    total = int(report["macro avg"]["support"])
+    lines.append(f"{'accuracy':>{width}}  {'':>9} {'':>9} {report['accuracy']:>9.{digits}f} {total:>9}")
+    lines += [row(name, report[name]) for name in ("macro avg", "weighted avg")]
+    return "\n".join(lines) + "\n"
+
+
+class EvaluationAccumulator:
+    """
+    Akumulator metrik yang bisa di-update per chunk.
+
+    Args:
+        labels (list): Nama kelas, urut sesuai kolom `proba` / kode label.
+        top_k (tuple): Nilai k untuk top-k accuracy.
+        auc_bins (int): Jumlah bin histogram skor untuk AUC per kelas.
+    """
+
+    def __init__(self, labels, top_k=DEFAULT_TOP_K, auc_bins=AUC_BINS):
+        self.labels = list(labels)
+        self.n_classes = len(self.labels)
+        self.top_k = tuple(k for k in top_k if k <= self.n_classes)
+        self.auc_bins = auc_bins
+        self.confusion = np.zeros((self.n_classes, self.n_classes), dtype=np.int64)
+        self.n_samples = 0
+        self._topk_hits = np.zeros(len(self.top_k), dtype=np.int64)
+        self._log_loss = 0.0
+        self._brier = 0.0
+        self._true_proba = np.zeros(self.n_classes)
+        # Histogram skor one-vs-rest: [kelas, positif/negatif, bin]
+        self._score_hist = np.zeros((self.n_classes, 2, auc_bins), dtype=np.int64)
+
+    def update(self, y_true, proba):
+        """Tambahkan satu chunk: kode label asli dan matriks `predict_proba`."""
+        y_true = np.asarray(y_true, dtype=np.intp)
+        proba = np.asarray(proba, dtype=np.float64)
+        n, k = len(y_true), self.n_classes
+        if n == 0:
+            return self
+        rows = np.arange(n)
+        y_pred = np.argmax(proba, axis=1)
+        self.confusion += np.bincount(y_true * k + y_pred, minlength=k * k).reshape(k, k)
+        self.n_samples += n
+
+        p_true = proba[rows, y_true]
+        # Peringkat kelas asli; seri dipecah seperti top_k_accuracy_score sklearn
+        # (indeks kelas lebih besar lebih dulu)
+        later = np.arange(k) > y_true[:, None]
+        rank = ((proba > p_true[:, None]) | ((proba == p_true[:, None]) & later)).sum(axis=1)
+        self._topk_hits += (rank[:, None] < np.array(self.top_k)).sum(axis=0)
+
+        self._log_loss -= np.log(np.clip(p_true, _EPS, 1.0)).sum()
+        sq = np.square(proba).sum(axis=1) - 2 * p_true + 1  # ||proba - onehot||^2
+        self._brier += sq.sum()
+        self._true_proba += np.bincount(y_true, weights=p_true, minlength=k)
+
+        bins = np.minimum((proba * self.auc_bins).astype(np.intp), self.auc_bins - 1)
+        positive = y_true[:, None] == np.arange(k)
+        flat = (np.arange(k) * 2 + (~positive)) * self.auc_bins + bins
+        self._score_hist += np.bincount(flat.ravel(), minlength=k * 2 * self.auc_bins).reshape(k, 2, self.auc_bins)
+        return self
+
+    def _auc(self):
+        """AUC one-vs-rest per kelas dari histogram (seri dalam satu bin dihitung 1/2)."""
+        pos = self._score_hist[:, 0, :].astype(np.float64)
+        neg = self._score_hist[:, 1, :].astype(np.float64)
+        neg_below = np.cumsum(neg, axis=1) - neg
+        wins = (pos * (neg_below + 0.5 * neg)).sum(axis=1)
+        return _safe_divide(wins, pos.sum(axis=1) * neg.sum(axis=1)), pos.sum(axis=1) * neg.sum(axis=1) > 0
+
+    def result(self):
+        """Dict metrik siap ditulis ke metrics.json."""
+        report = report_from_confusion(self.confusion, self.labels)
+        support = self.confusion.sum(axis=1)
+        mean_true = _safe_divide(self._true_proba, support)
+        auc, defined = self._auc()
+        n = max(self.n_samples, 1)
+        return {
+            "accuracy": report["accuracy"],
+            "n_samples": int(self.n_samples),
+            "labels": self.labels,
+            "confusion_matrix": self.confusion.tolist(),
+            "classification_report": report,
+            "top_k_accuracy": {str(k): float(h / n) for k, h in zip(self.top_k, self._topk_hits)},
+            "log_loss": float(self._log_loss / n),
+            "brier_score": float(self._brier / n),
+            "macro_roc_auc": float(auc[defined].mean()) if defined.any() else None,
+            "per_class": {
+                label: {
+                    "roc_auc": float(auc[i]) if defined[i] else None,
+                    "mean_true_proba": float(mean_true[i]),
+                    "predicted": int(self.confusion[:, i].sum()),
+                }
+                for i, label in enumerate(self.labels)
+            },
+        }
+
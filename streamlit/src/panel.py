@@ -0,0 +1,196 @@
+"""
+Panel store: data indikator per (kabupaten/kota, tahun).
+
+Baris diurutkan menurut (kode wilayah, tahun) di atas array kolom ringkas,
+sehingga:
+
+* lookup satu titik cukup satu `searchsorted` atas key gabungan (O(log n)),
+* riwayat satu wilayah adalah slice yang bersebelahan (offset ala CSR),
+* selisih tahun-ke-tahun dihitung vektor untuk seluruh panel sekaligus.
+
+Panel dibangun sekali saat preprocessing dan disimpan dengan format columnar
+(src.columnar) agar bisa di-memory-map oleh dashboard dan skrip training.
+Kolom `source_row` menyimpan posisi baris di dataset_preprocessed.csv untuk
+menyelaraskan panel dengan data model (mis. split per wilayah).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.columnar import read_columnar, read_metadata, write_columnar
+
+REGION = "nama_kabupaten_kota"
+YEAR = "tahun"
+SOURCE_ROW = "source_row"
+PANEL_NAME = "dataset_panel"
+_YEAR_BITS = 16
+
+def panel_dir(csv_path):
+    """Direktori panel pendamping dataset model (`dataset_panel/` di folder yang sama)."""
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), PANEL_NAME)
+
+
+class PanelStore:
+    """
+    Panel terurut (wilayah, tahun).
+
+    Args:
+        regions (list): Nama wilayah; indeksnya adalah kode wilayah.
+        region_codes (np.ndarray): Kode wilayah per baris, terurut naik.
+        years (np.ndarray): Tahun per baris, terurut naik di dalam wilayah.
+        columns (dict): Nama kolom -> array (atau pd.Categorical) sejajar baris.
+        metadata (dict): Metadata bebas (mis. hash sumber).
+    """
+
+    def __init__(self, regions, region_codes, years, columns, metadata=None):
+        self.regions = list(regions)
+        self.region_codes = np.asarray(region_codes)
+        self.years = np.asarray(years)
+        self.columns = dict(columns)
+        self.metadata = metadata or {}
+        self._keys = (self.region_codes.astype(np.int64) << _YEAR_BITS) | self.years.astype(np.int64)
+        if len(self._keys) > 1 and not (np.diff(self._keys) > 0).all():
+            raise ValueError("Panel harus terurut menurut (wilayah, tahun) tanpa duplikat")
+        self._region_index = {name: code for code, name in enumerate(self.regions)}
+        # Baris wilayah c ada di [offsets[c], offsets[c + 1])
+        self._offsets = np.searchsorted(self.region_codes, np.arange(len(self.regions) + 1))
+        self._source_order = None
+
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def year_range(self):
+        return (int(self.years.min()), int(self.years.max())) if len(self) else (None, None)
+
+    def _code(self, region):
+        try:
+            return self._region_index[region]
+        except KeyError:
+            raise KeyError(f"Wilayah tidak dikenal: {region!r}") from None
+
+    def locate(self, region, year):
+        """Indeks baris untuk (wilayah, tahun); KeyError jika tidak ada."""
+        key = (self._code(region) << _YEAR_BITS) | int(year)
+        idx = int(np.searchsorted(self._keys, key))
+        if idx == len(self._keys) or self._keys[idx] != key:
+            raise KeyError(f"Tidak ada data {region!r} tahun {year}")
+        return idx
+
+    def row(self, region, year, columns=None):
+        """Nilai kolom untuk satu (wilayah, tahun) sebagai dict."""
+        idx = self.locate(region, year)
+        names = columns or list(self.columns)
+        return {name: self.columns[name][idx] for name in names}
+
+    def region_slice(self, region):
+        """Slice baris milik satu wilayah (terurut menurut tahun)."""
+        code = self._code(region)
+        return slice(int(self._offsets[code]), int(self._offsets[code + 1]))
+
+    def history(self, region, columns=None):
+        """Riwayat satu wilayah sebagai DataFrame berindeks tahun."""
+        rows = self.region_slice(region)
+        names = columns or list(self.columns)
+        return pd.DataFrame(
+            {name: self.columns[name][rows] for name in names},
+            index=pd.Index(self.years[rows], name=YEAR),
+        )
+
+    def yoy_delta(self, column, pct=False):
+        """
+        Selisih terhadap tahun sebelumnya di wilayah yang sama, sejajar baris.
+
+        NaN untuk tahun pertama setiap wilayah dan bila tahun sebelumnya tidak
+        ada (celah di panel). `pct=True` memberi perubahan relatif.
+        """
+        values = np.asarray(self.columns[column], dtype=np.float64)
+        delta = np.full(len(values), np.nan)
+        if len(values) < 2:
+            return delta
+        # Key berurutan + 1 berarti wilayah sama dan tahun berurutan
+        consecutive = np.diff(self._keys) == 1
+        prev = values[:-1]
+        change = values[1:] - prev
+        if pct:
+            change = np.divide(change, prev, out=np.full(len(change), np.nan), where=prev != 0)
+        delta[1:][consecutive] = change[consecutive]
+        return delta
+
+    def to_frame(self, columns=None):
+        """Panel lengkap (wilayah, tahun, kolom) sebagai DataFrame."""
+        names = columns or list(self.columns)
+        data = {
+            REGION: pd.Categorical.from_codes(self.region_codes, categories=self.regions),
+            YEAR: self.years,
+        }
+        data.update({name: self.columns[name] for name in names})
+        return pd.DataFrame(data, copy=False)
+
+    def aligned(self, name):
+        """
+        Kolom dalam urutan baris dataset_preprocessed (via `source_row`).
+        `REGION` memberi kode wilayah, cocok sebagai `groups` untuk split.
+        """
+        if self._source_order is None:
+            self._source_order = np.argsort(self.columns[SOURCE_ROW], kind="stable")
+        if name == REGION:
+            values = self.region_codes
+        elif name == YEAR:
+            values = self.years
+        else:
+            values = self.columns[name]
+        return np.asarray(values)[self._source_order]
+
+    @classmethod
+    def from_frame(cls, df, columns=None, region_col=REGION, year_col=YEAR, metadata=None):
+        """
+        Bangun panel dari DataFrame berisi kolom wilayah & tahun. Jika belum
+        ada `source_row`, posisi baris `df` dipakai.
+        """
+        names = [c for c in (columns or df.columns) if c not in (region_col, year_col)]
+        region = df[region_col].astype("category").cat
+        codes = region.codes.to_numpy()
+        years = df[year_col].to_numpy()
+        if (codes < 0).any() or pd.isna(df[year_col]).any():
+            raise ValueError(f"Kolom '{region_col}' dan '{year_col}' tidak boleh kosong")
+        order = np.lexsort((years, codes))
+
+        data = {}
+        if SOURCE_ROW not in names:
+            data[SOURCE_ROW] = order.astype(np.int32)
+        for name in names:
+            data[name] = df[name].iloc[order].reset_index(drop=True)
+        frame = pd.DataFrame(data)
+        keys = (codes[order].astype(np.int64) << _YEAR_BITS) | years[order].astype(np.int64)
+        duplicated = np.flatnonzero(np.diff(keys) == 0)
+        if len(duplicated):
+            i = order[duplicated[0]]
+            raise ValueError(f"Duplikat (wilayah, tahun): {df[region_col].iloc[i]!r}, {df[year_col].iloc[i]}")
+        columns = {
+            name: (frame[name].array if isinstance(frame[name].dtype, pd.CategoricalDtype) else frame[name].to_numpy())
+            for name in frame.columns
+        }
+        return cls(list(region.categories), codes[order], years[order], columns, metadata=metadata)
+
+    def save(self, path, categorical=None):
+        """Tulis panel ke direktori columnar (atomik)."""
+        metadata = dict(self.metadata, panel={"region": REGION, "year": YEAR, "n_regions": len(self.regions)})
+        return write_columnar(self.to_frame(), path, metadata=metadata, categorical=[REGION, *(categorical or [])])
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """Buka panel dari direktori columnar; kolom numerik di-memory-map."""
+        meta = read_metadata(path)
+        if meta is None or "panel" not in meta["metadata"]:
+            raise FileNotFoundError(f"Panel tidak ditemukan di: {path}")
+        df = read_columnar(path, mmap_mode=mmap_mode)
+        region = df[REGION].array
+        columns = {
+            name: (df[name].array if isinstance(df[name].dtype, pd.CategoricalDtype) else df[name].to_numpy())
+            for name in df.columns if name not in (REGION, YEAR)
+        }
+        metadata = {k: v for k, v in meta["metadata"].items() if k != "panel"}
+        return cls(list(region.categories), region.codes, df[YEAR].to_numpy(), columns, metadata=metadata)
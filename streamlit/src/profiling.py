@@ -0,0 +1,171 @@
+"""
+Stage-level spans: wall time, CPU time, peak RSS dan (opsional) puncak
+tracemalloc per stage, ditulis sebagai JSON trace.
+
+Tracer yang tidak aktif mengembalikan satu context manager no-op yang sama
+untuk setiap `span()`, sehingga instrumentasi bisa dibiarkan di kode tanpa
+biaya berarti. Trace juga memuat `traceEvents` (format Chrome trace) agar
+bisa dibuka di Perfetto / chrome://tracing.
+"""
+
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import re
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_NOOP = contextlib.nullcontext()
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss dalam KiB di Linux (byte di macOS; cukup untuk perbandingan relatif)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class _Span:
+    __slots__ = ("tracer", "record", "wall_start", "cpu_start", "rss_start", "child_peak", "profiler")
+
+    def __init__(self, tracer, record):
+        self.tracer = tracer
+        self.record = record
+        self.child_peak = 0
+        self.profiler = None
+
+    def __enter__(self):
+        tracer = self.tracer
+        stack = tracer._stack
+        self.record["parent"] = stack[-1].record["name"] if stack else None
+        self.record["depth"] = len(stack)
+        if tracer.trace_memory:
+            # reset_peak() membuang puncak milik parent; simpan dulu di parent
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        # cProfile tidak bisa bersarang: hanya stage tingkat atas yang diprofil
+        if tracer.profile_dir and not stack:
+            self.profiler = cProfile.Profile()
+        stack.append(self)
+        self.rss_start = _max_rss_mb()
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.enable()
+        return self.record
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profiler is not None:
+            self.profiler.disable()
+        wall_end = time.perf_counter()
+        cpu_end = time.process_time()
+        tracer = self.tracer
+        record = self.record
+        record["start_seconds"] = self.wall_start - tracer._origin
+        record["wall_seconds"] = wall_end - self.wall_start
+        record["cpu_seconds"] = cpu_end - self.cpu_start
+        rss_end = _max_rss_mb()
+        if rss_end is not None:
+            record["peak_rss_mb"] = rss_end
+            record["peak_rss_growth_mb"] = rss_end - self.rss_start
+        tracer._stack.pop()
+        if tracer.trace_memory:
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            record["peak_traced_mb"] = peak / 2**20
+            if tracer._stack:
+                parent = tracer._stack[-1]
+                parent.child_peak = max(parent.child_peak, peak)
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.profiler is not None:
+            os.makedirs(tracer.profile_dir, exist_ok=True)
+            safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", record["name"])
+            tracer._n_profiles += 1
+            path = os.path.join(tracer.profile_dir, f"{tracer._n_profiles:02d}-{safe}.prof")
+            self.profiler.dump_stats(path)
+            record["profile"] = path
+        tracer.spans.append(record)
+        return False
+
+
+class Tracer:
+    """
+    Pencatat span per stage.
+
+    Args:
+        enabled (bool): Jika False, `span()` adalah no-op.
+        trace_memory (bool): Catat puncak alokasi tracemalloc per span
+            (memperlambat alokasi Python; aktifkan hanya saat diperlukan).
+        profile_dir (str): Jika diisi, dump cProfile per stage tingkat atas.
+    """
+
+    def __init__(self, enabled=True, trace_memory=False, profile_dir=None):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.profile_dir = profile_dir if enabled else None
+        self.spans = []
+        self._stack = []
+        self._origin = time.perf_counter()
+        self._n_profiles = 0
+        self._started_tracemalloc = False
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def span(self, name, **attrs):
+        """Context manager untuk satu stage; `attrs` ikut ditulis ke trace."""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, {"name": name, **attrs})
+
+    def close(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def to_dict(self):
+        spans = sorted(self.spans, key=lambda s: s["start_seconds"])
+        return {
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "pid": os.getpid(),
+            "trace_memory": self.trace_memory,
+            "spans": spans,
+            # Format Chrome trace: event "complete" dalam mikrodetik
+            "traceEvents": [
+                {
+                    "name": s["name"], "ph": "X", "pid": os.getpid(), "tid": 0,
+                    "ts": s["start_seconds"] * 1e6, "dur": s["wall_seconds"] * 1e6,
+                    "args": {k: v for k, v in s.items() if k not in ("name", "start_seconds", "wall_seconds")},
+                }
+                for s in spans
+            ],
+        }
+
+    def summary(self):
+        """Teks ringkas: satu baris per span, diindentasi sesuai kedalaman."""
+        lines = []
+        for s in sorted(self.spans, key=lambda s: s["start_seconds"]):
+            line = f"{'  ' * s['depth']}{s['name']:<{32 - 2 * s['depth']}} {s['wall_seconds']:>8.3f}s wall {s['cpu_seconds']:>8.3f}s cpu"
+            if "peak_rss_mb" in s:
+                line += f" {s['peak_rss_mb']:>8.1f} MB rss"
+            if "peak_traced_mb" in s:
+                line += f" {s['peak_traced_mb']:>8.1f} MB traced"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def save(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=4, default=str)
+        return path
+
+
+NULL_TRACER = Tracer(enabled=False)
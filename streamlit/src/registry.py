@@ -0,0 +1,35 @@
+"""
+Registry artifact: setiap view mendeklarasikan artifact yang dibutuhkannya.
+
+View menulis `REQUIRES = ("model", ...)` di level modul dan menerima dict
+artifact tersebut lewat `show(artifacts)`. App hanya memuat kebutuhan view
+yang sedang dibuka, jadi halaman statis tidak pernah memuat model atau
+dataset (beserta pandas/numpy/sklearn) saat cold start.
+"""
+
+from src.loader import (load_audit, load_dataset, load_drift, load_explainer, load_metrics, load_model,
+                        load_panel, load_predictor, load_sensitivity)
+
+ARTIFACTS = {
+    "model": load_model,
+    "predictor": load_predictor,
+    "sensitivity": load_sensitivity,
+    "explainer": load_explainer,
+    "dataset": load_dataset,
+    "panel": load_panel,
+    "metrics": load_metrics,
+    "drift": load_drift,
+    "audit": load_audit,
+}
+
+def requirements(module):
+    """Nama artifact yang dideklarasikan view (`REQUIRES`, default kosong)."""
+    names = tuple(getattr(module, "REQUIRES", ()))
+    unknown = [name for name in names if name not in ARTIFACTS]
+    if unknown:
+        raise KeyError(f"{module.__name__} requires unknown artifact(s) {unknown}; known: {sorted(ARTIFACTS)}")
+    return names
+
+def require(names):
+    """Muat (dari cache Streamlit) hanya artifact yang diminta."""
+    return {name: ARTIFACTS[name]() for name in names}
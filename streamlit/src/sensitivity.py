@@ -0,0 +1,209 @@
+"""
+Analisis sensitivitas what-if untuk halaman prediksi.
+
+Satu atau dua input disapu di atas grid rapat (mis. 200 x 200) sementara
+input lain tetap pada nilai dasar. Input kategorikal (skor pendidikan S,
+1-4) hanya disapu pada levelnya. Seluruh grid dihitung sekaligus:
+
+* skor manual lewat satu panggilan `hitung_skor_kesejahteraan_batch`,
+* kategori manual lewat `kode_kategori_batch`,
+* kelas Random Forest lewat satu panggilan `FlatForest.predict_proba` atas
+  matriks (n_titik, n_fitur). Prediksi forest konstan di antara dua
+  threshold berurutan sebuah fitur, jadi hanya satu titik wakil per
+  interval threshold di setiap sumbu yang dievaluasi (hasilnya identik,
+  biasanya jauh lebih sedikit baris dari 200 x 200).
+
+`SensitivitySweeper` menyimpan hasil per (input dasar, sumbu) dalam LRU
+kecil, jadi mengganti tab atau tampilan tidak menghitung ulang grid.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from src.logic import LABEL_KATEGORI, hitung_skor_kesejahteraan_batch, kode_kategori_batch
+
+# Input form -> nama fitur model (None: hanya dipakai skor manual)
+INPUT_FEATURES = {
+    "P": None,
+    "M": "jumlah_penduduk_miskin",
+    "U": "jumlah_pengangguran_terbuka",
+    "Y": "pdrb_total_adhk",
+    "S": "harapan_lama_sekolah",
+}
+INPUT_LABELS = {
+    "P": "Jumlah Penduduk (Jiwa)",
+    "M": "Penduduk Miskin (Jiwa)",
+    "U": "Pengangguran Terbuka (Jiwa)",
+    "Y": "PDRB ADHK (Rupiah)",
+    "S": "Skor Rata-rata Lama Sekolah (1-4)",
+}
+INPUTS = tuple(INPUT_FEATURES)
+# Input kategorikal -> level yang valid; disapu per level, bukan kontinu
+LEVELS = {"S": np.arange(1.0, 5.0)}
+
+def default_range(key, base):
+    """Rentang sapuan bawaan untuk satu input di sekitar nilai dasarnya."""
+    value = float(base[key])
+    if key == "S":
+        return 1.0, 4.0
+    if key == "P":
+        return max(1.0, value / 4), max(value * 4, 2.0)
+    if key in ("M", "U"):
+        # Sampai 40% penduduk atau 4x nilai dasar
+        return 0.0, max(value * 4, float(base["P"]) * 0.4, 1.0)
+    return 0.0, max(value * 4, 1e10)
+
+def axis_values(key, lo, hi, resolution):
+    """Titik sapuan satu sumbu: level di [lo, hi] untuk input kategorikal, selain itu linspace."""
+    if key in LEVELS:
+        levels = LEVELS[key]
+        return levels[(levels >= lo) & (levels <= hi)]
+    return np.linspace(lo, hi, resolution)
+
+def model_matrix(columns, features):
+    """Matriks fitur (n_titik, n_fitur) berurutan seperti `features` model."""
+    inverse = {feature: key for key, feature in INPUT_FEATURES.items() if feature}
+    return np.column_stack([np.ravel(columns[inverse[f]]) for f in features])
+
+def threshold_bins(forest, feature, values):
+    """
+    Kelompokkan `values` satu fitur menurut interval threshold forest.
+
+    Nilai dengan jumlah threshold `< x` yang sama mengambil arah yang sama di
+    setiap node (`x > threshold`), sehingga prediksinya identik.
+
+    Returns:
+        tuple: (indeks nilai wakil tiap kelompok, kelompok tiap nilai)
+    """
+    index = list(forest.feature_names).index(feature)
+    nodes = np.asarray(forest.feature) == index
+    nodes &= np.asarray(forest.children)[:, 0] != np.arange(len(nodes))  # bukan leaf
+    thresholds = np.unique(np.asarray(forest.threshold, dtype=np.float64)[nodes])
+    bins = np.searchsorted(thresholds, values, side="left")
+    _, first, inverse = np.unique(bins, return_index=True, return_inverse=True)
+    return first, inverse.ravel()
+
+def _forest_sweep(forest, columns, x_key, x_values, y_key, y_values):
+    """Probabilitas forest atas grid (ny, nx), dievaluasi pada titik wakil saja."""
+    reps = []
+    for key, values in ((x_key, x_values), (y_key, y_values)):
+        if key is None or INPUT_FEATURES[key] is None:
+            # Input di luar fitur model (mis. P) tidak mengubah prediksi
+            reps.append((np.zeros(1, dtype=np.intp), np.zeros(len(values), dtype=np.intp)))
+        else:
+            reps.append(threshold_bins(forest, INPUT_FEATURES[key], values))
+    (x_first, x_inverse), (y_first, y_inverse) = reps
+
+    sub = dict(columns)
+    sub[x_key] = x_values[x_first][np.newaxis, :]
+    if y_key is not None:
+        sub[y_key] = y_values[y_first][:, np.newaxis]
+    shape = (len(y_first), len(x_first))
+    grid = {key: np.broadcast_to(sub[key], shape) for key in INPUTS}
+    proba = forest.predict_proba(model_matrix(grid, forest.feature_names)).reshape(*shape, -1)
+    return proba[y_inverse[:, np.newaxis], x_inverse[np.newaxis, :]], shape[0] * shape[1]
+
+def sweep(base, axes, forest=None):
+    """
+    Evaluasi grid sensitivitas.
+
+    Args:
+        base (dict): Nilai dasar P, M, U, Y, S.
+        axes (list): Satu atau dua (kunci input, array nilai); sumbu pertama
+            adalah x (kolom), sumbu kedua y (baris).
+        forest (FlatForest): Model untuk kelas RF; None = hanya skor manual.
+
+    Returns:
+        dict: Array berbentuk (len(y), len(x)) — `skor`, `kategori` (indeks
+        LABEL_KATEGORI), dan jika ada model `kelas_rf` (indeks LABEL_KATEGORI)
+        serta `probabilitas_rf` dan `titik_rf` (baris yang benar-benar
+        dievaluasi model) — plus nilai sumbu `x`/`y`.
+    """
+    if not 1 <= len(axes) <= 2:
+        raise ValueError("Sensitivitas mendukung satu atau dua input")
+    keys = [key for key, _ in axes]
+    if len(set(keys)) != len(keys) or any(key not in INPUT_FEATURES for key in keys):
+        raise ValueError(f"Input sapuan tidak valid: {keys}")
+    for key, values in axes:
+        if key in LEVELS and not np.isin(values, LEVELS[key]).all():
+            raise ValueError(f"Input {key} hanya bernilai {LEVELS[key].astype(int).tolist()}")
+    x_key, x_values = axes[0]
+    y_key, y_values = axes[1] if len(axes) == 2 else (None, np.zeros(1))
+    x_values = np.asarray(x_values, dtype=np.float64)
+    y_values = np.asarray(y_values, dtype=np.float64)
+
+    # Input yang tidak disapu tetap skalar; broadcasting menghasilkan grid (ny, nx)
+    columns = {key: np.float64(base[key]) for key in INPUTS}
+    columns[x_key] = x_values[np.newaxis, :]
+    if y_key is not None:
+        columns[y_key] = y_values[:, np.newaxis]
+    shape = (len(y_values), len(x_values))
+
+    skor = hitung_skor_kesejahteraan_batch(*(columns[key] for key in INPUTS))[0].reshape(shape)
+    result = {
+        "x": x_values,
+        "y": y_values if y_key is not None else None,
+        "skor": skor,
+        "kategori": kode_kategori_batch(skor),
+    }
+    if forest is not None:
+        proba, n_rows = _forest_sweep(forest, columns, x_key, x_values, y_key, y_values)
+        # Kolom probabilitas -> posisi di LABEL_KATEGORI agar sebanding dengan kategori manual
+        posisi = np.array([list(LABEL_KATEGORI).index(label) for label in forest.class_labels], dtype=np.int8)
+        terbaik = proba.argmax(axis=2)
+        result["kelas_rf"] = posisi[terbaik]
+        result["probabilitas_rf"] = np.take_along_axis(proba, terbaik[..., np.newaxis], axis=2)[..., 0]
+        result["titik_rf"] = n_rows
+    return result
+
+
+class SensitivitySweeper:
+    """
+    `sweep` dengan LRU per (input dasar, sumbu) untuk satu versi model.
+
+    Args:
+        forest (FlatForest): Model aktif, atau None.
+        maxsize (int): Jumlah grid yang disimpan.
+    """
+
+    def __init__(self, forest=None, maxsize=32):
+        self.forest = forest
+        self.maxsize = max(1, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def sweep(self, base, axes, resolution=200):
+        """
+        Grid untuk `axes` (list (kunci, rentang (lo, hi) atau None = bawaan))
+        dengan `resolution` titik per sumbu (input kategorikal: levelnya).
+        Hasil dibagi antar pemanggil: jangan diubah.
+        """
+        base = {key: float(base[key]) for key in INPUTS}
+        spec = tuple(
+            (key, *(map(float, bounds) if bounds is not None else default_range(key, base)))
+            for key, bounds in axes
+        )
+        cache_key = (tuple(base.values()), spec, int(resolution))
+        with self._lock:
+            if cache_key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(cache_key)
+                return self._cache[cache_key]
+            self.misses += 1
+        result = sweep(base, [(key, axis_values(key, lo, hi, resolution)) for key, lo, hi in spec], self.forest)
+        for arr in result.values():
+            if isinstance(arr, np.ndarray):
+                arr.flags.writeable = False
+        with self._lock:
+            self._cache[cache_key] = result
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._cache), "maxsize": self.maxsize}
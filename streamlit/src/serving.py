@@ -0,0 +1,248 @@
+"""
+Building blocks for the headless prediction service.
+
+MicroBatcher mengumpulkan request yang datang bersamaan menjadi satu batch
+sebelum memanggil model, LatencyHistogram mencatat distribusi latensi
+dengan bucket tetap (memori konstan, aman dipakai dari banyak thread), dan
+CachedPredictor menyimpan hasil prediksi per input dalam LRU terbatas.
+"""
+
+import bisect
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+# Batas atas bucket (detik), kelipatan sqrt(2) dari 50us sampai ~13s
+DEFAULT_BUCKETS = tuple(float(b) for b in np.geomspace(50e-6, 50e-6 * 2**18, 37))
+
+class LatencyHistogram:
+    """Histogram latensi dengan bucket tetap dan estimasi persentil."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # bucket terakhir = overflow
+        self._total = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        idx = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[idx] += 1
+            self._total += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    def _percentile(self, counts, n, q):
+        target = q * n
+        cumulative = 0
+        for idx, count in enumerate(counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.buckets[idx] if idx < len(self.buckets) else self._max
+        return self._max
+
+    def snapshot(self):
+        """Ringkasan histogram dalam milidetik (siap di-serialisasi ke JSON)."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._total
+            max_seen = self._max
+        n = sum(counts)
+        upper = [b * 1e3 for b in self.buckets] + [None]
+        result = {
+            "count": n,
+            "mean_ms": (total / n * 1e3) if n else 0.0,
+            "max_ms": max_seen * 1e3,
+            "buckets": [{"le_ms": le, "count": c} for le, c in zip(upper, counts)],
+        }
+        for name, q in (("p50_ms", 0.50), ("p90_ms", 0.90), ("p99_ms", 0.99)):
+            result[name] = self._percentile(counts, n, q) * 1e3 if n else 0.0
+        return result
+
+
+class _Pending:
+    __slots__ = ("instances", "future")
+
+    def __init__(self, instances):
+        self.instances = instances
+        self.future = Future()
+
+
+_STOP = object()
+
+class MicroBatcher:
+    """
+    Menggabungkan request bersamaan menjadi micro-batch.
+
+    Worker thread mengambil request pertama dari antrean, lalu menunggu paling
+    lama `max_wait_ms` untuk request berikutnya sampai jumlah instance mencapai
+    `max_batch_size`. `predict_batch(instances)` dipanggil sekali per batch dan
+    hasilnya dibagi kembali ke Future masing-masing request.
+
+    Args:
+        predict_batch (callable): list[dict] -> list hasil dengan panjang sama.
+        max_batch_size (int): Jumlah instance maksimum per batch.
+        max_wait_ms (float): Waktu tunggu maksimum setelah request pertama.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=64, max_wait_ms=2.0):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1e3
+        self.batch_latency = LatencyHistogram()
+        self.n_batches = 0
+        self.n_instances = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, instances):
+        """Antrekan list instance, mengembalikan Future berisi list hasil."""
+        pending = _Pending(list(instances))
+        self._queue.put(pending)
+        return pending.future
+
+    def stats(self):
+        """Statistik batch: jumlah batch, rata-rata ukuran, dan histogram latensi model."""
+        return {
+            "batches": self.n_batches,
+            "instances": self.n_instances,
+            "mean_batch_size": self.n_instances / self.n_batches if self.n_batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1e3,
+            "model_latency": self.batch_latency.snapshot(),
+        }
+
+    def close(self, timeout=None):
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _collect(self, first):
+        batch = [first]
+        size = len(first.instances)
+        deadline = time.monotonic() + self.max_wait
+        stop = False
+        while size < self.max_batch_size:
+            try:
+                # Ambil yang sudah mengantre tanpa menunggu, baru kemudian tunggu sisa waktu
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+            size += len(item.instances)
+        return batch, stop
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch, stop = self._collect(first)
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch):
+        instances = [inst for pending in batch for inst in pending.instances]
+        start = time.perf_counter()
+        try:
+            results = self.predict_batch(instances)
+        except Exception as exc:
+            for pending in batch:
+                pending.future.set_exception(exc)
+            return
+        self.batch_latency.record(time.perf_counter() - start)
+        self.n_batches += 1
+        self.n_instances += len(instances)
+
+        offset = 0
+        for pending in batch:
+            n = len(pending.instances)
+            pending.future.set_result(results[offset:offset + n])
+            offset += n
+
+
+class CachedPredictor:
+    """
+    Prediksi satu baris lewat LRU cache terbatas.
+
+    Key adalah tuple fitur yang dinormalisasi ke float (urutan fitur artifact),
+    sehingga input yang sama dari sesi mana pun tidak memanggil model lagi.
+    Cache miss dihitung dengan FlatForest di thread pemanggil: numpy murni,
+    tanpa fan-out thread `n_jobs` milik sklearn.
+
+    Args:
+        forest (FlatForest): Forest dari artifact model.
+        maxsize (int): Jumlah entri maksimum sebelum entri terlama dibuang.
+        version (str): Versi model (dicatat di audit log).
+    """
+
+    def __init__(self, forest, maxsize=4096, version=None):
+        self.forest = forest
+        self.version = version
+        self.features = list(forest.feature_names)
+        self.labels = list(forest.class_labels)
+        self.maxsize = max(1, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(values):
+        return tuple(float(v) for v in values)
+
+    def predict_proba(self, values):
+        """Probabilitas kelas (array read-only, urut `labels`) untuk satu input."""
+        key = self.normalize(values)
+        with self._lock:
+            proba = self._cache.get(key)
+            if proba is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return proba
+            self.misses += 1
+        # Model dipanggil di luar lock; dua miss bersamaan untuk key yang sama
+        # hanya menghitung ulang hasil yang identik
+        proba = self.forest.predict_proba(np.array([key], dtype=np.float64))[0]
+        proba.setflags(write=False)
+        with self._lock:
+            self._cache[key] = proba
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return proba
+
+    def predict(self, values):
+        """(label kelas, dict label -> probabilitas) untuk satu input (urut `features`)."""
+        proba = self.predict_proba(values)
+        return self.labels[int(np.argmax(proba))], dict(zip(self.labels, proba.tolist()))
+
+    def stats(self):
+        with self._lock:
+            hits, misses, size = self.hits, self.misses, len(self._cache)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": self.evictions,
+            "size": size,
+            "maxsize": self.maxsize,
+            "hit_rate": hits / total if total else 0.0,
+        }
@@ -1,11 +1,19 @@
 import streamlit as st
 from src.components import render_header, card_begin, card_end
-from src.loader import load_dataset
 
-def show():
+REQUIRES = ("dataset", "panel")
+
+FITUR = {
+    "jumlah_penduduk_miskin": "Penduduk Miskin",
+    "jumlah_pengangguran_terbuka": "Pengangguran Terbuka",
+    "pdrb_total_adhk": "PDRB ADHK",
+    "harapan_lama_sekolah": "Skor Lama Sekolah",
+}
+
+def show(artifacts):
     render_header("📊 Dataset Kesejahteraan", "Data Historis Indikator Ekonomi & Sosial")
     
-    df = load_dataset()
+    df = artifacts["dataset"]
     
     card_begin()
     st.markdown("### Preview Data")
@@ -13,3 +21,30 @@ def show():
     
     st.markdown(f"**Total Data:** {df.shape[0]} baris, {df.shape[1]} kolom")
     card_end()
+    
+    panel = artifacts["panel"]
+    if panel is None:
+        st.info("Panel per wilayah belum dibangun. Jalankan ulang preprocessing/preprocessing.py.")
+        return
+    
+    # Riwayat satu wilayah: slice bersebelahan dari panel, tanpa memindai ulang dataset
+    card_begin()
+    st.markdown("### Riwayat per Kabupaten/Kota")
+    wilayah = st.selectbox("Kabupaten/Kota", panel.regions)
+    rows = panel.region_slice(wilayah)
+    riwayat = panel.history(wilayah, columns=list(FITUR) + ["kesejahteraan"]).rename(columns=FITUR)
+    
+    tahun = riwayat.index
+    
+    fitur = st.selectbox("Indikator", list(FITUR), format_func=FITUR.get)
+    col_chart, col_delta = st.columns(2)
+    with col_chart:
+        st.line_chart(riwayat[FITUR[fitur]])
+    with col_delta:
+        st.bar_chart({"tahun": tahun.to_numpy(), "Perubahan YoY (%)": panel.yoy_delta(fitur, pct=True)[rows] * 100},
+                     x="tahun")
+    
+    st.caption(f"{len(tahun)} tahun data ({tahun.min()}-{tahun.max()}); "
+               f"perubahan YoY kosong untuk tahun pertama atau tahun yang hilang.")
+    st.dataframe(riwayat, use_container_width=True)
+    card_end()
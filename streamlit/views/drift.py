@@ -0,0 +1,123 @@
+import streamlit as st
+from src.components import render_header, card_begin, card_end
+from src.drift import PSI_DRIFT, PSI_WARNING
+from src.registry import require
+from src.sensitivity import INPUT_FEATURES, INPUT_LABELS
+
+REQUIRES = ("drift",)
+
+LABEL_FITUR = {feature: INPUT_LABELS[key] for key, feature in INPUT_FEATURES.items() if feature}
+
+def show(artifacts):
+    render_header("📡 Monitoring Drift", "Distribusi Input Prediksi vs Data Training")
+
+    monitor = artifacts["drift"]
+    if monitor is None:
+        st.warning("Snapshot data training tidak tersedia; monitoring drift tidak aktif.")
+        return
+
+    report = monitor.report()
+    card_begin()
+    st.markdown("### Ringkasan")
+    col_n, col_status, col_kelas = st.columns(3)
+    with col_n:
+        st.metric("Prediksi Tercatat", f"{report['count']:,}",
+                  help=f"{report['skipped']} baris dengan nilai kosong dilewati")
+    with col_status:
+        st.metric("Status", report["status"])
+    with col_kelas:
+        psi_kelas = report["class_psi"]
+        st.metric("PSI Kelas Prediksi", "-" if psi_kelas != psi_kelas else f"{psi_kelas:.3f}")
+
+    reference = monitor.reference
+    st.caption(f"Snapshot training: {reference['count']:,} baris"
+               f"{' dari ' + reference['source'] if reference.get('source') else ''}. "
+               f"PSI < {PSI_WARNING} stabil, {PSI_WARNING}-{PSI_DRIFT} perlu dipantau, ≥ {PSI_DRIFT} drift. "
+               f"KS di atas nilai kritis (α = 0.05) menandakan distribusi berbeda. "
+               f"Statistik disimpan di memori server dan dimulai ulang saat model dilatih ulang.")
+    if not report["count"]:
+        st.info("Belum ada prediksi tercatat. Setiap analisis di halaman Prediksi dicatat di sini, "
+                "atau unggah satu batch CSV di bawah.")
+    else:
+        st.dataframe(
+            [{
+                "Fitur": LABEL_FITUR.get(row["name"], row["name"]),
+                "Mean": row["mean"],
+                "Mean Training": row["ref_mean"],
+                "Std": row["std"],
+                "Std Training": row["ref_std"],
+                "Median (perkiraan)": row["median"],
+                "PSI": row["psi"],
+                "KS": row["ks"],
+                "KS Kritis": row["ks_critical"],
+                "Status": row["status"],
+            } for row in report["features"]],
+            use_container_width=True,
+            hide_index=True,
+        )
+    card_end()
+
+    if report["count"]:
+        col_kelas, col_fitur = st.columns(2)
+        with col_kelas:
+            card_begin()
+            st.markdown("#### Distribusi Kelas")
+            kelas = report["classes"]
+            st.bar_chart({
+                "Kelas": list(kelas),
+                "Training": [v["training"] for v in kelas.values()],
+                "Prediksi": [v["prediksi"] for v in kelas.values()],
+            }, x="Kelas", y=["Training", "Prediksi"], stack=False)
+            card_end()
+        with col_fitur:
+            card_begin()
+            st.markdown("#### Histogram per Fitur")
+            nama = st.selectbox("Fitur", monitor.features, format_func=lambda f: LABEL_FITUR.get(f, f))
+            j = monitor.features.index(nama)
+            edges = reference["features"][j]["edges"]
+            batas = ["semua"]
+            if edges:
+                batas = ([f"< {edges[0]:,.4g}"] + [f"{lo:,.4g} – {hi:,.4g}" for lo, hi in zip(edges, edges[1:])]
+                         + [f"≥ {edges[-1]:,.4g}"])
+            st.bar_chart({
+                "Bin": [f"{k:02d}. {b}" for k, b in enumerate(batas)],
+                "Training": reference["features"][j]["proportions"],
+                "Prediksi": report["features"][j]["proportions"],
+            }, x="Bin", y=["Training", "Prediksi"], stack=False)
+            card_end()
+
+    card_begin()
+    st.markdown("#### Catat Batch")
+    with st.form("drift_batch"):
+        upload = st.file_uploader("CSV dengan kolom fitur model", type=["csv"])
+        submit = st.form_submit_button("Catat sebagai satu batch")
+    if submit and upload is not None:
+        _record_batch(monitor, upload)
+    if st.button("Reset statistik"):
+        monitor.reset()
+        st.rerun()
+    card_end()
+
+def _record_batch(monitor, upload):
+    """Prediksi RF satu batch lalu catat input dan kelasnya dalam satu update."""
+    import numpy as np
+    import pandas as pd
+
+    artifact = require(("model",))["model"]
+    df = pd.read_csv(upload)
+    missing = [f for f in monitor.features if f not in df.columns]
+    if missing:
+        st.error(f"Kolom berikut tidak ditemukan: {missing}")
+        return
+    X = df[monitor.features].to_numpy(dtype=np.float64)
+    predicted = None
+    if artifact is not None:
+        complete = ~np.isnan(X).any(axis=1)
+        labels = np.asarray(artifact.forest.class_labels, dtype=object)
+        predicted = np.full(len(X), None, dtype=object)
+        if complete.any():
+            forest_features = list(artifact.features)
+            order = [monitor.features.index(f) for f in forest_features]
+            predicted[complete] = labels[artifact.forest.predict_proba(X[complete][:, order]).argmax(axis=1)]
+    monitor.update(X, predicted)
+    st.rerun()
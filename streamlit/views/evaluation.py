@@ -1,13 +1,14 @@
 import streamlit as st
 import os
 from src.components import render_header, card_begin, card_end
-from src.loader import load_metrics
 from src.config import IMG_DIR
 
-def show():
+REQUIRES = ("metrics",)
+
+def show(artifacts):
     render_header("📈 Evaluasi Model", "Metrik Performa & Analisis Feature Importance")
     
-    metrics = load_metrics()
+    metrics = artifacts["metrics"]
     
     # Metrics Evaluation
     card_begin()
@@ -15,11 +16,33 @@ def show():
     col1, col2, col3 = st.columns(3)
     
     accuracy = metrics.get('accuracy', 0) * 100
+    report = metrics.get('classification_report', {})
     
     with col1:
         st.metric("Akurasi Model", f"{accuracy:.2f}%")
+    if 'macro avg' in report:
+        with col2:
+            st.metric("Macro F1-Score", f"{report['macro avg']['f1-score'] * 100:.2f}%")
+    if 'top_k_accuracy' in metrics:
+        with col3:
+            st.metric("Top-2 Accuracy", f"{metrics['top_k_accuracy'].get('2', 0) * 100:.2f}%",
+                      help=f"Log loss: {metrics.get('log_loss', 0):.4f}")
     
     st.info("Model Random Forest mencapai akurasi yang sangat tinggi validasi pola data yang dipelajari.")
+    
+    # Metrik per kelas (dari confusion matrix yang sama di metrics.json)
+    labels = metrics.get('labels') or [k for k in report if k not in ('accuracy', 'macro avg', 'weighted avg')]
+    if labels:
+        per_class = metrics.get('per_class', {})
+        rows = []
+        for label in labels:
+            row = {"Kelas": label, **{k.title(): v for k, v in report[label].items()}}
+            if label in per_class:
+                row["ROC AUC"] = per_class[label]['roc_auc']
+                row["Rata-rata Prob. Kelas Asli"] = per_class[label]['mean_true_proba']
+            rows.append(row)
+        st.markdown("#### Metrik per Kelas")
+        st.dataframe(rows, use_container_width=True, hide_index=True)
     card_end()
     
     # Visualizations
@@ -44,3 +67,19 @@ def show():
         else:
             st.warning("Feature Importance image not found.")
         card_end()
+    
+    # Permutation importance di data uji (tidak bias ke fitur berkardinalitas tinggi)
+    permutation = metrics.get('permutation_importance')
+    if permutation:
+        card_begin()
+        st.markdown("#### Permutation Importance (Data Uji)")
+        ci = int(permutation['confidence'] * 100)
+        rows = [
+            {"Fitur": name, "Penurunan Akurasi": r['mean'], f"CI {ci}% Bawah": r['ci_low'],
+             f"CI {ci}% Atas": r['ci_high']}
+            for name, r in sorted(permutation['features'].items(), key=lambda item: -item[1]['mean'])
+        ]
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+        st.caption(f"Rata-rata penurunan akurasi saat satu fitur diacak ({permutation['n_repeats']} kali, "
+                   f"{permutation['n_rows']} baris uji, akurasi dasar {permutation['baseline'] * 100:.2f}%).")
+        card_end()
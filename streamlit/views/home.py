@@ -1,7 +1,9 @@
 import streamlit as st
 from src.components import render_header, card_begin, card_end
 
-def show():
+REQUIRES = ()
+
+def show(artifacts):
     render_header("📊 Prediksi Kesejahteraan Masyarakat Jawa Barat", "Perhitungan Skor Manual & Validasi Random Forest")
     
     card_begin()
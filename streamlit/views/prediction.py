@@ -1,22 +1,17 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from src.components import render_header, card_begin, card_end, result_box
-from src.loader import load_all_artifacts
-from src.logic import hitung_skor_kesejahteraan, tentukan_kategori, get_css_class
+from src.config import SENSITIVITY_RESOLUTION
+from src.logic import LABEL_KATEGORI, hitung_skor_kesejahteraan, tentukan_kategori, get_css_class
+from src.registry import require
+from src.sensitivity import INPUT_FEATURES, INPUT_LABELS, LEVELS
 
-def show():
-    render_header("🔮 Prediksi Kesejahteraan", "Analisis Manual & Validasi Machine Learning")
-    
-    data = load_all_artifacts()
-    artifacts = data["model_artifacts"]
-    
-    if not artifacts:
-        st.error("Model artifacts could not be loaded.")
-        return
+REQUIRES = ("predictor", "sensitivity", "explainer")
+
+# Warna kategori, dari "Sangat Tidak Sejahtera" ke "Sangat Sejahtera"
+WARNA_KATEGORI = ['#ef473a', '#f7797d', '#f9d423', '#a8e063', '#38ef7d']
 
-    # ML artifacts unpacking skipped as unused
+def show(artifacts):
+    render_header("🔮 Prediksi Kesejahteraan", "Analisis Manual & Validasi Machine Learning")
     
     col_input, col_result = st.columns([1, 1.2])
     
@@ -34,7 +29,14 @@ def show():
             submit = st.form_submit_button("🔍 Analisis Kesejahteraan", use_container_width=True)
         card_end()
         
+    # Input terakhir yang di-submit disimpan agar hasil (dan mode sensitivitas)
+    # tetap tampil saat widget lain di halaman memicu rerun
     if submit:
+        st.session_state["prediksi_input"] = {"P": P, "M": M, "U": U, "Y": Y, "S": S}
+    base = st.session_state.get("prediksi_input")
+    
+    if base:
+        P, M, U, Y, S = (base[k] for k in "PMUYS")
         with col_result:
             # 1. Calculate Score
             skor_final, pdrb_score, edu_score, poverty_impact, unemployment_impact = hitung_skor_kesejahteraan(P, M, U, Y, S)
@@ -51,6 +53,52 @@ def show():
             
             st.metric("Skor Kesejahteraan", f"{skor_final:.2f}")
             
+            # 2. Validasi Random Forest (LRU cache dibagi antar sesi)
+            predictor = artifacts["predictor"]
+            if predictor is not None:
+                fitur = {f: base[k] for k, f in INPUT_FEATURES.items() if f}
+                kelas_rf, probabilitas = predictor.predict([fitur[f] for f in predictor.features])
+                if submit:
+                    # Monitor drift dimuat saat prediksi pertama, bukan saat halaman dibuka
+                    monitor = require(("drift",))["drift"]
+                    if monitor is not None:
+                        monitor.observe([fitur[f] for f in monitor.features], kelas_rf)
+                
+                st.divider()
+                st.markdown("#### Validasi Random Forest")
+                col_rf, col_cocok = st.columns(2)
+                with col_rf:
+                    st.metric("Prediksi RF", kelas_rf, help=f"Probabilitas: {probabilitas[kelas_rf] * 100:.1f}%")
+                with col_cocok:
+                    st.metric("Kesesuaian dengan Skor Manual", "✅ Sesuai" if kelas_rf == kategori else "⚠️ Berbeda")
+                
+                # Kelas diurutkan dari kategori terendah ke tertinggi
+                urutan = [k for k in LABEL_KATEGORI if k in probabilitas]
+                st.dataframe(
+                    [{"Kelas": k, "Probabilitas": probabilitas[k]} for k in urutan],
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={"Probabilitas": st.column_config.ProgressColumn(format="%.2f", min_value=0.0, max_value=1.0)},
+                )
+                stats = predictor.stats()
+                st.caption(f"Cache prediksi: {stats['hits']} hit / {stats['misses']} miss "
+                           f"({stats['size']}/{stats['maxsize']} entri)")
+            else:
+                st.warning("Model Random Forest tidak tersedia; hanya skor manual yang ditampilkan.")
+
+            if submit:
+                # Audit: diantrekan saja, writer latar (src.audit) yang menulis ke disk
+                record = {
+                    "model_version": predictor.version if predictor is not None else None,
+                    "jumlah_penduduk": P,
+                    **{f: base[k] for k, f in INPUT_FEATURES.items() if f},
+                    "skor": float(skor_final),
+                    "kategori": kategori,
+                }
+                if predictor is not None:
+                    record.update(kelas_rf=kelas_rf, probabilitas_rf=float(probabilitas[kelas_rf]))
+                require(("audit",))["audit"].log(record)
+
             # Visualization Logic
             st.divider()
             st.markdown("#### Analisis Komponen")
@@ -59,7 +107,8 @@ def show():
             categories = ['PDRB (+)', 'Pendidikan (+)', 'Kemiskinan (-)', 'Pengangguran (-)']
             values = [pdrb_score, edu_score, poverty_impact, unemployment_impact]
             
-            # Bar Chart with Color Logic
+            # Bar Chart with Color Logic (plotly baru diimpor saat grafik pertama digambar)
+            import plotly.graph_objects as go
             colors = ['#38ef7d', '#38ef7d', '#ef473a', '#ef473a']
             fig_bar = go.Figure(go.Bar(
                 x=categories,
@@ -75,6 +124,136 @@ def show():
                 height=300,
                 margin=dict(l=20, r=20, t=40, b=20)
             )
-            st.plotly_chart(fig_bar, use_container_width=True)
+            
+            explainer = artifacts["explainer"]
+            if predictor is not None and explainer is not None:
+                col_bar, col_shap = st.columns(2)
+                with col_bar:
+                    st.plotly_chart(fig_bar, use_container_width=True)
+                with col_shap:
+                    _show_attribution(explainer, [fitur[f] for f in explainer.features], kelas_rf)
+            else:
+                st.plotly_chart(fig_bar, use_container_width=True)
 
             card_end()
+
+        _show_sensitivity(artifacts["sensitivity"], base)
+
+def _show_attribution(explainer, nilai, kelas):
+    """Atribusi fitur (TreeSHAP) untuk probabilitas kelas RF yang diprediksi."""
+    import plotly.graph_objects as go
+    
+    hasil = explainer.explain(nilai)
+    k = hasil["labels"].index(kelas)
+    atribusi = hasil["shap"][:, k]
+    input_fitur = {f: key for key, f in INPUT_FEATURES.items() if f}
+    nama = [INPUT_LABELS[input_fitur[f]] if f in input_fitur else f for f in hasil["features"]]
+    fig = go.Figure(go.Bar(
+        x=atribusi * 100,
+        y=nama,
+        orientation='h',
+        marker_color=['#38ef7d' if a >= 0 else '#ef473a' for a in atribusi],
+        text=[f"{a * 100:+.1f}" for a in atribusi],
+        textposition='auto'
+    ))
+    fig.update_layout(
+        title=f"Kontribusi Fitur ke Prediksi RF: {kelas}",
+        xaxis_title="Poin probabilitas (%)",
+        template="plotly_white",
+        height=300,
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    metode = "TreeSHAP" if hasil["method"] == "treeshap" else "atribusi jalur (Saabas)"
+    st.caption(f"{metode}: rata-rata model {hasil['base'][k] * 100:.1f}% + kontribusi "
+               f"= {(hasil['base'][k] + atribusi.sum()) * 100:.1f}% untuk kelas {kelas}")
+
+def _kategori_colorscale():
+    """Colorscale bertingkat: satu warna penuh per indeks kategori (zmin -0.5, zmax 4.5)."""
+    n = len(WARNA_KATEGORI)
+    scale = []
+    for i, warna in enumerate(WARNA_KATEGORI):
+        scale += [[i / n, warna], [(i + 1) / n, warna]]
+    return scale
+
+def _show_sensitivity(sweeper, base):
+    """Heatmap what-if: sapu satu atau dua input di sekitar input yang di-submit."""
+    st.divider()
+    st.markdown("#### 🎚️ Analisis Sensitivitas")
+    st.caption("Sapu satu atau dua input pada grid rapat sementara input lain tetap; "
+               "seluruh grid dihitung dalam satu panggilan batch dan di-cache per input.")
+    
+    pilihan = list(INPUT_LABELS)
+    col_x, col_y, col_res = st.columns([1, 1, 1])
+    with col_x:
+        x_key = st.selectbox("Sumbu X", pilihan, index=pilihan.index("M"), format_func=INPUT_LABELS.get,
+                             key="sens_x")
+    with col_y:
+        sisa = [None] + [k for k in pilihan if k != x_key]
+        y_key = st.selectbox("Sumbu Y", sisa, index=sisa.index("Y") if "Y" in sisa else 0,
+                             format_func=lambda k: "— (satu input)" if k is None else INPUT_LABELS[k], key="sens_y")
+    with col_res:
+        resolusi = st.slider("Titik per sumbu", 50, 300, SENSITIVITY_RESOLUTION, step=50, key="sens_res")
+    
+    axes = [(x_key, None)] + ([(y_key, None)] if y_key else [])
+    hasil = sweeper.sweep(base, axes, resolusi)
+    
+    import plotly.graph_objects as go
+    labels = list(LABEL_KATEGORI)
+    tab_skor, tab_kategori, tab_rf = st.tabs(["Skor Manual", "Kategori Manual", "Kelas Random Forest"])
+    layout = dict(template="plotly_white", height=420, margin=dict(l=20, r=20, t=30, b=20),
+                  xaxis_title=INPUT_LABELS[x_key], yaxis_title=INPUT_LABELS[y_key] if y_key else None)
+    for axis, key in (("xaxis", x_key), ("yaxis", y_key)):
+        if key in LEVELS:
+            layout[f"{axis}_tickvals"] = LEVELS[key].tolist()
+    
+    def titik_dasar(fig):
+        if y_key:
+            fig.add_trace(go.Scatter(x=[base[x_key]], y=[base[y_key]], mode="markers", name="Input",
+                                     marker=dict(symbol="x", size=12, color="black"), showlegend=False))
+    
+    def heatmap(z, **kwargs):
+        return go.Heatmap(x=hasil["x"], y=hasil["y"], z=z, **kwargs)
+    
+    kategori_kwargs = dict(zmin=-0.5, zmax=len(labels) - 0.5, colorscale=_kategori_colorscale(),
+                           colorbar=dict(tickvals=list(range(len(labels))), ticktext=labels))
+    
+    with tab_skor:
+        if y_key:
+            fig = go.Figure(heatmap(hasil["skor"], colorscale="RdYlGn", colorbar=dict(title="Skor")))
+        else:
+            fig = go.Figure(go.Scatter(x=hasil["x"], y=hasil["skor"][0], name="Skor",
+                                       mode="markers" if x_key in LEVELS else "lines"))
+            fig.add_vline(x=base[x_key], line_dash="dot")
+            layout["yaxis_title"] = "Skor"
+        titik_dasar(fig)
+        fig.update_layout(**layout)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    def kelas_chart(z, nama):
+        if y_key:
+            fig = go.Figure(heatmap(z, **kategori_kwargs))
+        else:
+            fig = go.Figure(go.Scatter(x=hasil["x"], y=z[0], mode="lines", line_shape="hv", name=nama))
+            fig.add_vline(x=base[x_key], line_dash="dot")
+            fig.update_yaxes(tickvals=list(range(len(labels))), ticktext=labels, range=[-0.5, len(labels) - 0.5])
+        titik_dasar(fig)
+        fig.update_layout(**dict(layout, yaxis_title=INPUT_LABELS[y_key] if y_key else None))
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with tab_kategori:
+        kelas_chart(hasil["kategori"], "Kategori manual")
+    
+    with tab_rf:
+        if "kelas_rf" not in hasil:
+            st.warning("Model Random Forest tidak tersedia; hanya skor manual yang disapu.")
+        else:
+            kelas_chart(hasil["kelas_rf"], "Kelas RF")
+            sesuai = float((hasil["kelas_rf"] == hasil["kategori"]).mean())
+            st.caption(f"Kelas RF sama dengan kategori manual di {sesuai * 100:.1f}% grid · "
+                       f"model dievaluasi pada {hasil['titik_rf']:,} titik wakil "
+                       f"dari {hasil['skor'].size:,} titik grid")
+    
+    stats = sweeper.stats()
+    st.caption(f"Cache sensitivitas: {stats['hits']} hit / {stats['misses']} miss "
+               f"({stats['size']}/{stats['maxsize']} grid)")
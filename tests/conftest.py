@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT_DIR, "streamlit")
+MODELLING_DIR = os.path.join(ROOT_DIR, "modelling")
+PREPROCESSING_DIR = os.path.join(ROOT_DIR, "preprocessing")
+DATASET_PATH = os.path.join(PREPROCESSING_DIR, "dataset_preprocessed.csv")
+RAW_DATASET_PATH = os.path.join(ROOT_DIR, "dataset", "dataset_akhir", "dataset_final.csv")
+
+# The app and the pipeline scripts import their siblings as top-level modules
+for path in (APP_DIR, MODELLING_DIR, PREPROCESSING_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope="session")
+def trained():
+    """Forest trained exactly like RandomForestAnalyzer.train_model."""
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+    from src.flat_forest import FlatForest
+
+    df = pd.read_csv(DATASET_PATH)
+    X = df.drop("kesejahteraan", axis=1)
+    y = LabelEncoder().fit_transform(df["kesejahteraan"])
+    X_train, X_test, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+    scaler = StandardScaler()
+    model = RandomForestClassifier(
+        n_estimators=100, max_depth=10, min_samples_split=5, min_samples_leaf=2,
+        random_state=42, n_jobs=1, class_weight="balanced",
+    )
+    model.fit(scaler.fit_transform(X_train), y_train)
+    flat = FlatForest.from_sklearn(model, scaler, feature_names=X.columns.tolist())
+    return model, scaler, flat, X, X_test
@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+import pytest
+
+from conftest import DATASET_PATH
+from src.artifacts import load_artifact, save_artifact, sha256_file
+from src.compression import select_trees
+
+
+def test_artifact_roundtrip_is_memory_mapped(trained, tmp_path):
+    model, scaler, flat, X, _ = trained
+    mapping = {int(c): f"kelas_{c}" for c in model.classes_}
+    save_artifact(tmp_path / "artifact", flat, scaler, mapping, flat.feature_names,
+                  hyperparameters=model.get_params(), data_hash=sha256_file(DATASET_PATH))
+
+    artifact = load_artifact(str(tmp_path / "artifact"))
+    assert artifact.features == flat.feature_names
+    assert artifact.mapping == mapping
+    assert artifact.manifest["hyperparameters"]["max_depth"] == 10
+    assert isinstance(artifact.forest.threshold, np.memmap)
+    np.testing.assert_array_equal(artifact.forest.predict_proba(X), flat.predict_proba(X))
+    np.testing.assert_array_equal(artifact.scaler_params[0], scaler.mean_)
+
+
+def test_artifact_falls_back_to_joblib(trained, tmp_path):
+    model, scaler, flat, X, _ = trained
+    pkl = tmp_path / "model.pkl"
+    joblib.dump({"model": model, "scaler": scaler, "mapping": {0: "a", 1: "b", 2: "c", 3: "d", 4: "e"},
+                 "features": flat.feature_names}, pkl)
+    artifact = load_artifact(str(tmp_path / "missing"), str(pkl))
+    assert artifact.version is None
+    np.testing.assert_array_equal(artifact.forest.predict_proba(X), flat.predict_proba(X))
+
+
+def test_readers_wait_out_a_directory_swap(trained, tmp_path, monkeypatch):
+    model, scaler, flat, X, _ = trained
+    mapping = {int(c): str(c) for c in model.classes_}
+    path = tmp_path / "artifact"
+    save_artifact(path, select_trees(flat, [0]), scaler, mapping, flat.feature_names)
+
+    # Hold the writer in the gap where the old directory is moved aside and the new one is not in place yet
+    in_gap, rename = threading.Event(), os.rename
+
+    def slow_rename(src, dst):
+        rename(src, dst)
+        if ".old-" in str(dst):
+            in_gap.set()
+            time.sleep(0.3)
+
+    monkeypatch.setattr(os, "rename", slow_rename)
+    writer = threading.Thread(target=save_artifact, args=(path, flat, scaler, mapping, flat.feature_names))
+    writer.start()
+    assert in_gap.wait(5) and not path.exists()
+    artifact = load_artifact(str(path))
+    writer.join()
+    assert artifact is not None and artifact.forest.n_trees == flat.n_trees
+    np.testing.assert_array_equal(artifact.forest.predict_proba(X), flat.predict_proba(X))
+
+
+def test_arrays_from_a_newer_version_are_rejected(trained, tmp_path):
+    model, scaler, flat, X, _ = trained
+    mapping = {int(c): str(c) for c in model.classes_}
+    path = tmp_path / "artifact"
+    save_artifact(path, select_trees(flat, [0]), scaler, mapping, flat.feature_names)
+
+    # Manifest read, then the directory is swapped before the arrays are opened
+    stale = load_artifact(str(path))
+    save_artifact(path, flat, scaler, mapping, flat.feature_names)
+    with pytest.raises(ValueError, match="changed|replaced"):
+        stale.forest
+    with pytest.raises(ValueError):
+        stale.scaler_params
+    np.testing.assert_array_equal(load_artifact(str(path)).forest.predict_proba(X), flat.predict_proba(X))
+
+    # One array rewritten under an unchanged manifest: its shape no longer matches
+    stale = load_artifact(str(path))
+    np.save(path / "roots.npy", np.zeros(1, dtype=stale.manifest["arrays"]["roots"]["dtype"]))
+    with pytest.raises(ValueError, match="'roots'"):
+        stale.forest
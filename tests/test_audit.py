@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+
+from src.audit import AuditLog, AuditReader
+
+
+def test_batched_writer_rotates_and_reader_queries_by_time(tmp_path):
+    log = AuditLog(str(tmp_path), batch_size=10, flush_interval=0.01, segment_bytes=1000)
+    for i in range(100):
+        log.log({"ts": 1000.0 + i, "jumlah_penduduk_miskin": i, "kategori": "Cukup"})
+    assert log.flush(timeout=10)
+    stats = log.stats()
+    assert stats["records"] == 100 and stats["dropped"] == 0 and stats["errors"] == 0
+    assert stats["segments"] > 1
+
+    reader = AuditReader(str(tmp_path))
+    assert [r["jumlah_penduduk_miskin"] for r in reader.read()] == list(range(100))
+    assert [r["ts"] for r in reader.read(1042, 1045)] == [1042.0, 1043.0, 1044.0]
+    frames = list(reader.iter_frames(chunk_rows=40))
+    assert [len(f) for f in frames] == [40, 40, 20]
+
+    # Crash between data and index write: the unindexed tail is still read, a torn last line is skipped
+    log.close()
+    with open(reader.segments()[-1], "ab") as f:
+        f.write(json.dumps({"ts": 5000.0, "jumlah_penduduk_miskin": -1}).encode() + b'\n{"ts": 50')
+    assert [r["ts"] for r in reader.read(start=2000)] == [5000.0]
+
+
+def test_drops_are_counted_exactly_and_flush_never_hangs(tmp_path):
+    log = AuditLog(str(tmp_path), batch_size=1, flush_interval=0.0, max_queue=2)
+    release = threading.Event()
+    write = log._write
+
+    def slow_write(batch):
+        release.wait(10)
+        write(batch)
+
+    log._write = slow_write
+    log.log({"i": 0})
+    deadline = time.monotonic() + 5
+    while log.stats()["queued"] and time.monotonic() < deadline:
+        time.sleep(0.001)  # the writer takes record 0 and blocks in slow_write
+    log.log({"i": 1})
+    log.log({"i": 2})
+    log.log({"i": 3})
+    assert log.stats()["dropped"] == 1
+
+    # Queue full and writer stuck: flush gives up after its timeout
+    start = time.monotonic()
+    assert log.flush(timeout=0.2) is False
+    assert time.monotonic() - start < 2
+    release.set()
+    assert log.flush(timeout=10)
+    assert log.stats()["records"] == 3
+
+    # Many threads logging into a tiny queue: every record is either written or counted as dropped
+    def client(k):
+        for i in range(2000):
+            log.log({"i": k * 10000 + i})
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    log.close(10)
+    stats = log.stats()
+    assert stats["records"] + stats["dropped"] == 4 + 8 * 2000
+
+    # After close nothing is queued: records are dropped and flush returns at once
+    log.log({"i": -1})
+    assert log.stats()["dropped"] == stats["dropped"] + 1 and log.stats()["queued"] == 0
+    assert log.flush() is False
+    assert sum(1 for _ in AuditReader(str(tmp_path)).read()) == stats["records"]
+
+
+def test_close_gives_up_on_a_stuck_writer(tmp_path):
+    log = AuditLog(str(tmp_path), batch_size=1, flush_interval=0.0, max_queue=3)
+    release = threading.Event()
+    write = log._write
+
+    def stuck_write(batch):
+        release.wait(10)
+        write(batch)
+
+    log._write = stuck_write
+    log.log({"i": 0})
+    deadline = time.monotonic() + 5
+    while log.stats()["queued"] and time.monotonic() < deadline:
+        time.sleep(0.001)  # the writer takes record 0 and blocks
+    for i in range(1, 5):
+        log.log({"i": i})
+    assert log.stats()["queued"] == 3 and log.stats()["dropped"] == 1
+
+    # No room for the stop marker: the queued records are counted as dropped instead of waiting
+    start = time.monotonic()
+    log.close(timeout=0.2)
+    assert time.monotonic() - start < 2
+    assert log.stats()["dropped"] == 4 and log.stats()["queued"] == 1  # only the stop marker
+
+    # The writer finishes its batch once unblocked, then stops
+    release.set()
+    log._thread.join(5)
+    assert not log._thread.is_alive()
+    stats = log.stats()
+    assert stats["records"] == 1 and stats["records"] + stats["dropped"] == 5
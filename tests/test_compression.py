@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+
+from compress_forest import MIN_AGREEMENT, choose, compress_forest, min_evaluation_rows, supported_accuracy_drop
+from conftest import DATASET_PATH, MODELLING_DIR
+from src.artifacts import load_artifact, save_artifact
+from src.compression import collapse_subtrees, compress, forest_nbytes, select_trees
+
+
+def test_compression_keeps_predictions_consistent(trained, tmp_path):
+    model, scaler, flat, X, _ = trained
+    order = np.arange(flat.n_trees)[::-1]
+    np.testing.assert_allclose(select_trees(flat, order).predict_proba(X), flat.predict_proba(X), atol=1e-12)
+
+    # Tolerance 0 only merges identical sibling leaves: probabilities are unchanged
+    exact, _ = collapse_subtrees(flat, tolerance=0.0)
+    np.testing.assert_allclose(exact.predict_proba(X), flat.predict_proba(X), atol=1e-12)
+
+    small, collapsed = compress(flat, order[:20], collapse_tolerance=1.0)
+    assert collapsed > 0 and small.value.dtype == np.uint8 and small.threshold.dtype == np.float32
+    assert forest_nbytes(small) * 10 < forest_nbytes(flat)
+    subset = select_trees(flat, order[:20])
+    assert (small.predict(X) == subset.predict(X)).mean() > 0.95
+
+    save_artifact(tmp_path / "small", small, scaler, {int(c): str(c) for c in model.classes_}, flat.feature_names)
+    np.testing.assert_array_equal(load_artifact(str(tmp_path / "small")).forest.predict_proba(X),
+                                  small.predict_proba(X))
+
+
+def test_choose_requires_agreement_with_the_full_forest():
+    candidates = [
+        {"n_trees": 1, "bytes": 1024, "p99_ms": 0.01, "accuracy": 0.95, "agreement_with_full": 0.95},
+        {"n_trees": 5, "bytes": 4096, "p99_ms": 0.02, "accuracy": 0.95, "agreement_with_full": 0.99},
+        {"n_trees": 9, "bytes": 8192, "p99_ms": 0.03, "accuracy": 0.96, "agreement_with_full": 1.0},
+    ]
+    # Same accuracy as the full forest is not enough: the 1-tree forest disagrees on 5% of rows
+    assert choose(candidates, 0.95, max_accuracy_drop=0.01)["n_trees"] == 5
+    assert MIN_AGREEMENT >= 0.99
+    assert choose(candidates, 0.95, max_accuracy_drop=0.01, min_agreement=None)["n_trees"] == 1
+    assert choose(candidates, 0.95, max_size_kb=6, max_accuracy_drop=0.01)["n_trees"] == 5
+    assert choose(candidates, 0.95, max_size_kb=0.5) is None
+
+
+def test_evaluation_set_too_small_for_the_accuracy_bound_is_refused(tmp_path):
+    # No disagreement on n rows rules out a 1% disagreement rate at 95% only from n = 299 on
+    assert min_evaluation_rows(0.01) == 299
+    assert 0.99 ** 299 <= 0.05 < 0.99 ** 298
+    assert min_evaluation_rows(None) == 0
+
+    output = str(tmp_path / "compressed")
+    report = compress_forest(os.path.join(MODELLING_DIR, "rf_model_kesejahteraan"),
+                             os.path.join(MODELLING_DIR, "rf_model_kesejahteraan.pkl"),
+                             DATASET_PATH, output, max_accuracy_drop=0.01)
+    assert report["evaluation_rows"] < report["min_evaluation_rows"] == 299
+    assert report["refused"] and report["compressed"] is None
+    assert not os.path.exists(output) and os.path.exists(report["report_path"])
+
+
+def test_default_flags_compress_the_shipped_model_to_a_size_budget(tmp_path):
+    # Without --max-accuracy-drop the bound adapts to the evaluation half instead of refusing
+    for n in (1, 29, 41, 299, 1000):
+        assert min_evaluation_rows(supported_accuracy_drop(n)) <= n
+    assert supported_accuracy_drop(299) == 0.01 and supported_accuracy_drop(0) == 1.0
+
+    output = str(tmp_path / "compressed")
+    report = compress_forest(os.path.join(MODELLING_DIR, "rf_model_kesejahteraan"),
+                             os.path.join(MODELLING_DIR, "rf_model_kesejahteraan.pkl"),
+                             DATASET_PATH, output, max_size_kb=96)
+    assert report["accuracy_drop_derived"] and not report["refused"]
+    assert report["budget"]["max_accuracy_drop"] == supported_accuracy_drop(report["evaluation_rows"])
+    chosen = report["compressed"]
+    assert chosen["bytes"] <= 96 * 1024 and chosen["agreement_with_full"] >= MIN_AGREEMENT
+    assert report["full"]["accuracy"] - chosen["accuracy"] <= report["budget"]["max_accuracy_drop"] + 1e-12
+    assert load_artifact(output).forest.n_trees == chosen["n_trees"]
@@ -0,0 +1,43 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from conftest import DATASET_PATH
+from src.drift import DriftMonitor, training_reference
+
+FEATURES = ["jumlah_penduduk_miskin", "jumlah_pengangguran_terbuka", "pdrb_total_adhk", "harapan_lama_sekolah"]
+
+
+def test_streaming_sketches_match_batch_statistics():
+    df = pd.read_csv(DATASET_PATH)
+    X = df[FEATURES].to_numpy(dtype=np.float64)
+    labels = df["kesejahteraan"].to_numpy()
+    # The snapshot goes into metrics.json
+    reference = json.loads(json.dumps(training_reference(X, labels, FEATURES)))
+
+    monitor = DriftMonitor(reference)
+    for row, label in zip(X[:100], labels[:100]):
+        monitor.observe(row, label)
+    monitor.update(X[100:], labels[100:])
+    monitor.observe([np.nan, 1.0, 1.0, 1.0], "Cukup")
+    report = monitor.report()
+
+    assert report["count"] == len(X) and report["skipped"] == 1
+    for j, row in enumerate(report["features"]):
+        assert np.isclose(row["mean"], X[:, j].mean()) and np.isclose(row["std"], X[:, j].std(ddof=1))
+        assert row["min"] == X[:, j].min() and row["max"] == X[:, j].max()
+        # Same data as the snapshot: no drift
+        assert row["psi"] < 1e-9 and row["ks"] < 1e-9
+    assert report["class_psi"] < 1e-9 and report["status"] == "Stabil"
+
+    # Poverty doubled, predictions all one class: both flagged
+    monitor.reset()
+    shifted = X.copy()
+    shifted[:, 0] *= 2
+    monitor.update(shifted, ["Sangat Tidak Sejahtera"] * len(X))
+    report = monitor.report()
+    assert report["features"][0]["status"] == "Drift signifikan"
+    assert report["features"][0]["ks"] > report["features"][0]["ks_critical"]
+    assert report["features"][1]["psi"] < 1e-9
+    assert report["class_psi"] > 0.25 and report["status"] == "Drift signifikan"
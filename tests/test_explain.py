@@ -0,0 +1,54 @@
+import numpy as np
+
+from src.artifacts import load_artifact, save_artifact
+from src.compression import select_trees
+from src.explain import EXACT_MEMORY_BUDGET, MAX_EXACT_FEATURES, ForestExplainer
+from src.flat_forest import FlatForest
+
+
+def test_explanations_are_additive_and_cover_roundtrips(trained, tmp_path):
+    model, scaler, flat, X, X_test = trained
+    rows = X_test.to_numpy()[:10]
+    explainer = ForestExplainer(flat)
+    assert explainer.method == "treeshap"
+    phi = explainer.shap_values(rows)
+    assert phi.shape == (10, X.shape[1], flat.n_classes)
+    np.testing.assert_allclose(explainer.expected_value + phi.sum(axis=1), flat.predict_proba(rows), atol=1e-12)
+
+    # Features a tree never splits on get no attribution from it
+    stump = select_trees(flat, [0])
+    unused = np.setdiff1d(np.arange(X.shape[1]), stump.feature[stump.children[:, 0] != np.arange(len(stump.feature))])
+    assert np.all(ForestExplainer(stump).shap_values(rows)[:, unused] == 0)
+
+    # Artifacts keep the node cover; forests without it fall back to path attribution
+    save_artifact(tmp_path / "art", flat, scaler, {int(c): str(c) for c in model.classes_}, flat.feature_names)
+    loaded = load_artifact(str(tmp_path / "art")).forest
+    np.testing.assert_array_equal(loaded.cover, flat.cover)
+    no_cover = FlatForest(**{name: getattr(flat, name) for name in FlatForest.ARRAY_NAMES},
+                          max_depth=flat.max_depth, feature_names=flat.feature_names)
+    saabas = ForestExplainer(no_cover)
+    assert saabas.method == "saabas"
+    np.testing.assert_allclose(saabas.expected_value + saabas.shap_values(rows).sum(axis=1),
+                               flat.predict_proba(rows), atol=1e-12)
+
+
+def test_treeshap_chunks_fit_the_memory_budget(trained):
+    _, _, flat, X, X_test = trained
+    rows = X_test.to_numpy()[:40]
+    n_nodes = len(flat.feature)
+    row_bytes = 8 * 2 ** X.shape[1] * n_nodes
+    explainer = ForestExplainer(flat)
+    assert explainer.chunk_size == EXACT_MEMORY_BUDGET // row_bytes
+    assert ForestExplainer(flat, chunk_size=10 ** 9).chunk_size == explainer.chunk_size
+    assert MAX_EXACT_FEATURES <= 6
+
+    # A budget of three rows: smaller blocks, same values
+    small = ForestExplainer(flat, memory_budget=3 * row_bytes)
+    assert small.method == "treeshap" and small.chunk_size == 3
+    np.testing.assert_allclose(small.shap_values(rows), explainer.shap_values(rows), atol=1e-12)
+
+    # Not even one row fits: path attribution instead of a huge allocation
+    fallback = ForestExplainer(flat, memory_budget=row_bytes - 1)
+    assert fallback.method == "saabas"
+    np.testing.assert_allclose(fallback.expected_value + fallback.shap_values(rows).sum(axis=1),
+                               flat.predict_proba(rows), atol=1e-12)
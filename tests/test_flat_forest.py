@@ -0,0 +1,53 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def _boundary_probes(flat, X, n_nodes=500, seed=0):
+    """Rows that sit exactly on, just below and just above folded thresholds."""
+    rng = np.random.default_rng(seed)
+    internal = np.flatnonzero(flat.children[:, 0] != np.arange(len(flat.feature)))
+    rows = []
+    for node in rng.choice(internal, n_nodes):
+        base = X.iloc[rng.integers(len(X))].to_numpy(dtype=np.float64)
+        t = flat.threshold[node]
+        for v in (t, np.nextafter(t, np.inf), np.nextafter(t, -np.inf)):
+            row = base.copy()
+            row[flat.feature[node]] = v
+            rows.append(row)
+    return pd.DataFrame(rows, columns=X.columns)
+
+
+def test_predict_proba_matches_sklearn_exactly(trained):
+    model, scaler, flat, X, X_test = trained
+    for data in (X_test, X, _boundary_probes(flat, X)):
+        expected = model.predict_proba(scaler.transform(data))
+        np.testing.assert_array_equal(flat.predict_proba(data), expected)
+        np.testing.assert_array_equal(flat.predict(data), model.predict(scaler.transform(data)))
+
+
+def test_single_row_and_chunked_batches(trained):
+    model, scaler, flat, X, _ = trained
+    row = X.iloc[[7]]
+    np.testing.assert_array_equal(
+        flat.predict_proba(row.to_numpy()[0]), model.predict_proba(scaler.transform(row))
+    )
+    np.testing.assert_array_equal(flat.predict_proba(X, chunk_size=50), flat.predict_proba(X))
+
+
+def test_single_row_faster_than_sklearn(trained):
+    model, scaler, flat, X, _ = trained
+    row = X.iloc[[0]]
+
+    def median_time(fn, repeat=15):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return np.median(times)
+
+    sklearn_time = median_time(lambda: model.predict_proba(scaler.transform(row)))
+    flat_time = median_time(lambda: flat.predict_proba(row))
+    assert flat_time * 5 < sklearn_time
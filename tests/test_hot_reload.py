@@ -0,0 +1,62 @@
+import gc
+import json
+import os
+
+from src.hot_reload import ArtifactWatcher
+
+
+class Box:
+    def __init__(self, data):
+        self.data = data
+
+
+def _write(path, data, mtime_ns):
+    with open(path, "w") as f:
+        json.dump(data, f)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _reload(watcher):
+    started = watcher.check(now=float("inf"))
+    watcher.wait()
+    return started
+
+
+def test_watcher_swaps_new_content_and_frees_old_versions(tmp_path):
+    path = str(tmp_path / "metrics.json")
+    _write(path, {"accuracy": 0.9}, 1_000_000_000)
+
+    def read():
+        with open(path) as f:
+            return Box(json.load(f))
+
+    watcher = ArtifactWatcher(read, [path], interval=0.0)
+    first = watcher.get()
+    assert first.data == {"accuracy": 0.9} and watcher.version == 1
+
+    # Unchanged files: nothing to do
+    assert not _reload(watcher)
+
+    # Only the mtime changes: same version
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert _reload(watcher)
+    assert watcher.get() is first and watcher.version == 1
+
+    # Half-written file: the old version stays active
+    with open(path, "w") as f:
+        f.write('{"accur')
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+    assert _reload(watcher)
+    assert watcher.get() is first and watcher.stats()["failures"] == 1
+
+    # New content: swapped in; the old version lives only while a session holds it
+    _write(path, {"accuracy": 0.95}, 4_000_000_000)
+    assert _reload(watcher)
+    assert watcher.get().data == {"accuracy": 0.95} and watcher.version == 2
+    assert watcher.stats()["retired_alive"] == 1
+    derived = watcher.derived("size", lambda box: len(box.data))
+    assert derived == 1 and watcher.derived("size", lambda box: -1) == 1
+
+    del first
+    gc.collect()
+    assert watcher.stats()["retired_alive"] == 0
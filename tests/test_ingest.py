@@ -0,0 +1,31 @@
+import filecmp
+
+import numpy as np
+import pandas as pd
+
+from conftest import DATASET_PATH, RAW_DATASET_PATH
+from ingest import FINAL_COLUMNS, run_ingestion
+from preprocessing import run_preprocessing
+
+
+def test_ingestion_rebuilds_dataset_final(tmp_path):
+    options = dict(output_dir=str(tmp_path / "ingested"), cache_dir=str(tmp_path / "cache"), workers=1)
+    df = run_ingestion(**options)
+    expected = pd.read_csv(RAW_DATASET_PATH, encoding="utf-8-sig")[FINAL_COLUMNS]
+
+    assert list(df.columns[:len(FINAL_COLUMNS)]) == FINAL_COLUMNS and len(df) == len(expected)
+    for col in FINAL_COLUMNS:
+        if col == "skor":
+            # The CSV keeps 10 significant digits
+            np.testing.assert_allclose(df[col].to_numpy(), expected[col].to_numpy(), rtol=1e-9)
+        else:
+            assert (df[col].to_numpy() == expected[col].to_numpy()).all(), col
+
+    # Second run reads every source from the cache (strings come back as categoricals)
+    cached = run_ingestion(**options)
+    pd.testing.assert_frame_equal(cached.astype(df.dtypes.to_dict()), df)
+
+    # The rebuilt table feeds preprocessing and gives the committed training table
+    output = tmp_path / "dataset_preprocessed.csv"
+    run_preprocessing(output_path=str(output), from_raw=True, ingest_options=options)
+    assert filecmp.cmp(output, DATASET_PATH, shallow=False)
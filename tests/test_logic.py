@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from conftest import RAW_DATASET_PATH
+from src.logic import (
+    BATAS_KATEGORI,
+    hitung_skor_kesejahteraan,
+    hitung_skor_kesejahteraan_batch,
+    tentukan_kategori,
+    tentukan_kategori_batch,
+)
+
+
+def test_batch_score_matches_scalar_formula():
+    df = pd.read_csv(RAW_DATASET_PATH, encoding="utf-8-sig")
+    columns = [df[c].to_numpy(dtype=np.float64) for c in (
+        "jumlah_penduduk", "jumlah_penduduk_miskin", "jumlah_pengangguran_terbuka", "pdrb_total_adhk", "harapan_lama_sekolah",
+    )]
+    # P == 0 rows and a NaN input ride along with the real data
+    P, M, U, Y, S = (np.concatenate([c, extra]) for c, extra in zip(
+        columns, ([0.0, 0.0, 1e6], [5e4, 0.0, np.nan], [1e4, 0.0, 2e4], [1e11, 0.0, 1e11], [3.0, 4.0, 2.0]),
+    ))
+
+    batch = hitung_skor_kesejahteraan_batch(P, M, U, Y, S)
+    scalar = np.array([hitung_skor_kesejahteraan(*row) for row in zip(P, M, U, Y, S)], dtype=np.float64)
+    assert len(batch) == 5 and all(k.dtype == np.float64 for k in batch)
+    np.testing.assert_array_equal(np.column_stack(batch), scalar)
+    assert hitung_skor_kesejahteraan(0, 1, 1, 1, 1) == (0, 0, 0, 0, 0)
+    assert np.isnan(batch[0][-1])
+
+    # Scalars broadcast against a column
+    np.testing.assert_array_equal(hitung_skor_kesejahteraan_batch(P[0], M, U[0], Y[0], 3)[3], M / P[0] * 50)
+
+
+def test_batch_category_matches_scalar_at_boundaries():
+    skor = np.concatenate([
+        BATAS_KATEGORI,
+        np.nextafter(BATAS_KATEGORI, -np.inf),
+        np.nextafter(BATAS_KATEGORI, np.inf),
+        [-1e9, 0.0, 1e9, np.inf, -np.inf, np.nan],
+        np.linspace(-50, 200, 1001),
+    ])
+    expected = [tentukan_kategori(s) for s in skor]
+    assert tentukan_kategori_batch(skor).tolist() == expected
+    assert tentukan_kategori_batch(np.array([20.0]))[0] == "Tidak Sejahtera"
@@ -0,0 +1,100 @@
+import math
+
+import numpy as np
+from sklearn.metrics import (
+    classification_report,
+    confusion_matrix,
+    log_loss,
+    roc_auc_score,
+    top_k_accuracy_score,
+)
+
+from src.metrics import AUC_BINS, EvaluationAccumulator, format_report, report_from_confusion
+
+LABELS = ["a", "b", "c", "d", "e"]
+
+
+def _sample(n=2000, seed=0, decimals=2):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, len(LABELS), n)
+    # Forest-like probabilities biased towards the true class; rounded to 1/100 by default (many ties)
+    votes = rng.dirichlet(np.ones(len(LABELS)), n) + np.eye(len(LABELS))[y] * rng.random((n, 1))
+    proba = votes / votes.sum(axis=1, keepdims=True)
+    if decimals is not None:
+        proba = np.round(proba, decimals)
+        proba[:, -1] = 1 - proba[:, :-1].sum(axis=1)
+    # Class "e" is never predicted: exercises zero_division
+    proba[:, 3] += proba[:, 4]
+    proba[:, 4] = 0.0
+    return y, proba
+
+
+def _chunked(y, proba, chunk=333):
+    evaluation = EvaluationAccumulator(LABELS)
+    for start in range(0, len(y), chunk):
+        evaluation.update(y[start:start + chunk], proba[start:start + chunk])
+    return evaluation.result()
+
+
+def test_metrics_match_sklearn():
+    y, proba = _sample()
+    result = _chunked(y, proba)
+    classes = np.arange(len(LABELS))
+
+    cm = confusion_matrix(y, proba.argmax(axis=1), labels=classes)
+    assert result["confusion_matrix"] == cm.tolist()
+    expected = classification_report(y, proba.argmax(axis=1), labels=classes, target_names=LABELS,
+                                     output_dict=True, zero_division=0)
+    assert result["classification_report"].keys() == expected.keys()
+    for key, row in expected.items():
+        if key == "accuracy":
+            assert math.isclose(result["classification_report"][key], row)
+        else:
+            for name, value in row.items():
+                assert math.isclose(result["classification_report"][key][name], value, abs_tol=1e-12), (key, name)
+    assert report_from_confusion(cm, LABELS) == result["classification_report"]
+    assert format_report(result["classification_report"], LABELS) == classification_report(
+        y, proba.argmax(axis=1), labels=classes, target_names=LABELS, zero_division=0)
+
+    for k, value in result["top_k_accuracy"].items():
+        assert math.isclose(value, top_k_accuracy_score(y, proba, k=int(k), labels=classes)), k
+    assert math.isclose(result["log_loss"], log_loss(y, proba, labels=classes))
+    onehot = np.eye(len(LABELS))[y]
+    assert math.isclose(result["brier_score"], np.square(proba - onehot).sum(axis=1).mean())
+
+
+def test_histogram_auc_bias_is_bounded_by_shared_bins():
+    y, proba = _sample(decimals=None)
+    result = _chunked(y, proba)
+    biased = 0
+    for i, label in enumerate(LABELS):
+        positive = y == i
+        exact = roc_auc_score(positive, proba[:, i])
+        # A positive/negative pair in the same bin counts 1/2; sklearn does the
+        # same only for equal scores, so the rest of the shared-bin pairs bound the bias
+        bins = np.minimum((proba[:, i] * AUC_BINS).astype(int), AUC_BINS - 1)
+        shared = (np.bincount(bins[positive], minlength=AUC_BINS)
+                  * np.bincount(bins[~positive], minlength=AUC_BINS)).sum()
+        values = np.unique(proba[:, i], return_inverse=True)[1]
+        tied = (np.bincount(values[positive], minlength=values.max() + 1)
+                * np.bincount(values[~positive], minlength=values.max() + 1)).sum()
+        bound = 0.5 * (shared - tied) / (positive.sum() * (~positive).sum())
+        assert abs(result["per_class"][label]["roc_auc"] - exact) <= bound + 1e-12, label
+        biased += result["per_class"][label]["roc_auc"] != exact
+    assert biased
+    # Scores on distinct bins: the histogram AUC is exact
+    y, proba = _sample(seed=1)
+    proba = (np.floor(proba * AUC_BINS) + 0.5) / AUC_BINS
+    result = _chunked(y, proba)
+    for i, label in enumerate(LABELS):
+        assert math.isclose(result["per_class"][label]["roc_auc"], roc_auc_score(y == i, proba[:, i]))
+    assert math.isclose(result["macro_roc_auc"], np.mean([roc_auc_score(y == i, proba[:, i]) for i in range(len(LABELS))]))
+
+
+def test_empty_and_single_class_chunks():
+    evaluation = EvaluationAccumulator(LABELS).update([], np.empty((0, len(LABELS))))
+    assert evaluation.result()["n_samples"] == 0
+    result = evaluation.update([1, 1], np.tile([0.1, 0.6, 0.1, 0.1, 0.1], (2, 1))).result()
+    # One-vs-rest AUC is undefined without both positives and negatives
+    assert result["macro_roc_auc"] is None and result["per_class"]["b"]["roc_auc"] is None
+    assert result["accuracy"] == 1.0 and result["top_k_accuracy"]["1"] == 1.0
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.panel import REGION, SOURCE_ROW, YEAR, PanelStore
+
+
+def _frame(seed=0):
+    rng = np.random.default_rng(seed)
+    rows = [(region, year) for region in ("Bandung", "Garut", "Bogor", "Depok") for year in range(2010, 2016)
+            if not (region == "Garut" and year == 2012)]  # a gap in one region's years
+    df = pd.DataFrame(rows, columns=[REGION, YEAR])
+    df["nilai"] = rng.normal(100, 10, len(df))
+    df.loc[(df[REGION] == "Depok") & (df[YEAR] == 2013), "nilai"] = 0.0
+    df["kelas"] = pd.Categorical(rng.choice(["x", "y"], len(df)))
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def test_locate_and_history_match_pandas():
+    df = _frame()
+    panel = PanelStore.from_frame(df)
+    assert len(panel) == len(df) and panel.year_range == (2010, 2015)
+    for i, (region, year) in enumerate(zip(df[REGION], df[YEAR])):
+        idx = panel.locate(region, year)
+        assert panel.columns[SOURCE_ROW][idx] == i
+        assert panel.row(region, year, ["nilai", "kelas"]) == {"nilai": df["nilai"][i], "kelas": df["kelas"][i]}
+
+    with pytest.raises(KeyError):
+        panel.locate("Garut", 2012)
+    with pytest.raises(KeyError):
+        panel.locate("Bandung", 2016)
+    with pytest.raises(KeyError):
+        panel.locate("Cianjur", 2010)
+
+    expected = df[df[REGION] == "Garut"].sort_values(YEAR).set_index(YEAR)["nilai"]
+    pd.testing.assert_series_equal(panel.history("Garut", ["nilai"])["nilai"], expected, check_names=False)
+
+
+def test_yoy_delta_skips_region_boundaries_and_gaps():
+    df = _frame()
+    panel = PanelStore.from_frame(df)
+    frame = panel.to_frame().assign(delta=panel.yoy_delta("nilai"), pct=panel.yoy_delta("nilai", pct=True))
+
+    by_year = frame.set_index([REGION, YEAR])["nilai"]
+    for (region, year), row in frame.set_index([REGION, YEAR]).iterrows():
+        if (region, year - 1) not in by_year.index:
+            assert np.isnan(row["delta"]) and np.isnan(row["pct"]), (region, year)
+            continue
+        prev = by_year[(region, year - 1)]
+        assert row["delta"] == row["nilai"] - prev
+        if prev == 0:
+            assert np.isnan(row["pct"])
+        else:
+            assert row["pct"] == (row["nilai"] - prev) / prev
+    # The first year of every region and the year after Garut's gap
+    assert np.isnan(frame["delta"]).sum() == 4 + 1
+
+
+def test_aligned_restores_source_order_and_survives_save(tmp_path):
+    df = _frame()
+    panel = PanelStore.from_frame(df)
+    np.testing.assert_array_equal(panel.aligned("nilai"), df["nilai"].to_numpy())
+    np.testing.assert_array_equal(panel.aligned(YEAR), df[YEAR].to_numpy())
+    codes = panel.aligned(REGION)
+    assert [panel.regions[c] for c in codes] == df[REGION].tolist()
+
+    panel.save(str(tmp_path / "panel"), categorical=["kelas"])
+    loaded = PanelStore.load(str(tmp_path / "panel"))
+    assert loaded.regions == panel.regions
+    np.testing.assert_array_equal(loaded.aligned("nilai"), df["nilai"].to_numpy())
+    assert loaded.locate("Depok", 2013) == panel.locate("Depok", 2013)
+    assert list(loaded.columns["kelas"]) == list(panel.columns["kelas"])
+
+
+def test_duplicate_region_year_is_rejected():
+    df = _frame()
+    with pytest.raises(ValueError, match="Duplikat"):
+        PanelStore.from_frame(pd.concat([df, df.iloc[[3]]], ignore_index=True))
@@ -0,0 +1,30 @@
+import filecmp
+import os
+
+from conftest import DATASET_PATH, RAW_DATASET_PATH
+from preprocessing import run_preprocessing
+from src.columnar import columnar_dir, read_table
+from src.panel import PanelStore, panel_dir
+
+
+def _files(directory):
+    return sorted(os.listdir(directory))
+
+
+def test_preprocessing_reproduces_committed_outputs(tmp_path):
+    output = tmp_path / os.path.basename(DATASET_PATH)
+    df, _ = run_preprocessing(RAW_DATASET_PATH, str(output))
+    assert filecmp.cmp(output, DATASET_PATH, shallow=False)
+
+    # Columnar copy and panel: same files, byte for byte (the panel records the CSV's hash)
+    for directory in (columnar_dir, panel_dir):
+        committed, fresh = directory(DATASET_PATH), directory(str(output))
+        assert _files(fresh) == _files(committed)
+        match, mismatch, errors = filecmp.cmpfiles(committed, fresh, _files(committed), shallow=False)
+        assert not mismatch and not errors, mismatch + errors
+
+    # What training reads back: the table, and the panel aligned to it
+    table = read_table(str(output))
+    assert table.equals(read_table(DATASET_PATH)) and len(table) == len(df)
+    panel = PanelStore.load(panel_dir(str(output)))
+    assert (panel.aligned("harapan_lama_sekolah") == table["harapan_lama_sekolah"].to_numpy()).all()
@@ -0,0 +1,93 @@
+import json
+import os
+
+import pytest
+
+from conftest import DATASET_PATH
+from src.profiling import _NOOP, NULL_TRACER, Tracer
+
+
+def test_nested_spans_record_parent_depth_and_errors(tmp_path):
+    tracer = Tracer()
+    with tracer.span("outer", rows=3) as outer:
+        with tracer.span("inner"):
+            pass
+        with pytest.raises(KeyError):
+            with tracer.span("failing"):
+                raise KeyError("x")
+    assert outer["rows"] == 3
+
+    spans = {s["name"]: s for s in tracer.spans}
+    assert (spans["outer"]["parent"], spans["outer"]["depth"]) == (None, 0)
+    assert (spans["inner"]["parent"], spans["inner"]["depth"]) == ("outer", 1)
+    assert spans["failing"]["error"] == "KeyError" and "error" not in spans["outer"]
+    assert spans["inner"]["start_seconds"] >= spans["outer"]["start_seconds"]
+    assert spans["outer"]["wall_seconds"] >= spans["inner"]["wall_seconds"] + spans["failing"]["wall_seconds"]
+
+    # Chrome trace events: one complete event per span, in start order, in microseconds
+    with open(tracer.save(str(tmp_path / "deep" / "trace.json"))) as f:
+        trace = json.load(f)
+    assert [s["name"] for s in trace["spans"]] == ["outer", "inner", "failing"]
+    events = trace["traceEvents"]
+    assert [e["name"] for e in events] == ["outer", "inner", "failing"] and {e["ph"] for e in events} == {"X"}
+    assert events[1]["ts"] == pytest.approx(spans["inner"]["start_seconds"] * 1e6)
+    assert events[1]["dur"] == pytest.approx(spans["inner"]["wall_seconds"] * 1e6)
+    assert events[1]["args"]["parent"] == "outer" and events[0]["args"]["rows"] == 3
+    assert tracer.summary().splitlines()[1].startswith("  inner")
+
+
+def test_parent_peak_includes_children_across_reset_peak():
+    tracer = Tracer(trace_memory=True)
+    try:
+        with tracer.span("outer"):
+            with tracer.span("allocating"):
+                block = bytearray(16 * 2**20)
+                del block
+            with tracer.span("small"):
+                pass
+    finally:
+        tracer.close()
+    spans = {s["name"]: s for s in tracer.spans}
+    # "small" reset the tracemalloc peak; the 16 MiB block is still counted for its parent
+    assert spans["allocating"]["peak_traced_mb"] >= 16
+    assert spans["small"]["peak_traced_mb"] < 16
+    assert spans["outer"]["peak_traced_mb"] >= spans["allocating"]["peak_traced_mb"]
+
+
+def test_profile_is_dumped_for_top_level_spans_only(tmp_path):
+    tracer = Tracer(profile_dir=str(tmp_path / "prof"))
+    for name in ("load data", "fit"):
+        with tracer.span(name):
+            with tracer.span("nested"):
+                sum(range(1000))
+    spans = tracer.spans
+    assert sorted(os.listdir(tmp_path / "prof")) == ["01-load_data.prof", "02-fit.prof"]
+    assert all("profile" not in s for s in spans if s["name"] == "nested")
+    assert [s["profile"] for s in spans if s["depth"] == 0] == [
+        str(tmp_path / "prof" / "01-load_data.prof"), str(tmp_path / "prof" / "02-fit.prof")]
+
+
+def test_disabled_tracer_is_a_shared_noop(tmp_path):
+    tracer = Tracer(enabled=False, trace_memory=True, profile_dir=str(tmp_path / "prof"))
+    assert tracer.span("a") is _NOOP and tracer.span("b", rows=1) is _NOOP
+    assert not tracer.trace_memory and tracer.profile_dir is None
+    with tracer.span("a"):
+        pass
+    assert tracer.spans == [] and not (tmp_path / "prof").exists()
+    assert NULL_TRACER.span("fit") is _NOOP
+
+
+def test_training_without_a_tracer_writes_no_trace(tmp_path):
+    from train_rf_model import RandomForestAnalyzer
+
+    analyzer = RandomForestAnalyzer(
+        data_path=DATASET_PATH,
+        model_save_path=str(tmp_path / "model.pkl"),
+        metrics_save_path=str(tmp_path / "metrics.json"),
+        img_dir=str(tmp_path),
+        trace_path=str(tmp_path / "trace.json"),
+    )
+    assert analyzer.tracer is NULL_TRACER
+    analyzer.run_complete_analysis(render=False, permutation_repeats=0)
+    assert (tmp_path / "metrics.json").exists()
+    assert not (tmp_path / "trace.json").exists() and NULL_TRACER.spans == []
@@ -0,0 +1,76 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from conftest import DATASET_PATH, MODELLING_DIR
+from render_figures import FIGURES, render_figures
+from src.artifacts import load_artifact, save_artifact
+from src.compression import select_trees
+
+ARTIFACT_DIR = os.path.join(MODELLING_DIR, "rf_model_kesejahteraan")
+MODEL_PATH = os.path.join(MODELLING_DIR, "rf_model_kesejahteraan.pkl")
+METRICS_PATH = os.path.join(MODELLING_DIR, "metrics.json")
+
+# Fresh interpreter: sys.modules holds only what training itself imported
+_TRAINING_PROBE = """
+import json, sys
+sys.path.insert(0, {modelling!r})
+from train_rf_model import RandomForestAnalyzer
+RandomForestAnalyzer(data_path={data!r}, model_save_path={model!r}, metrics_save_path={metrics!r},
+                     img_dir={img!r}).run_complete_analysis(render=False)
+print(json.dumps(sorted(m for m in ("matplotlib", "seaborn") if m in sys.modules)))
+"""
+
+
+def _rendered(status):
+    return sorted(name for name, result in status.items() if not isinstance(result, str))
+
+
+def test_unchanged_figures_are_cached(tmp_path, monkeypatch):
+    import render_figures as module
+
+    monkeypatch.setattr(module, "DPI", 30)  # workers=1 renders in this process
+    metrics_path = tmp_path / "metrics.json"
+    shutil.copy(METRICS_PATH, metrics_path)
+    img_dir = str(tmp_path / "img")
+
+    def render(artifact_dir=ARTIFACT_DIR, force=False):
+        return render_figures(str(metrics_path), artifact_dir, MODEL_PATH, img_dir, workers=1, force=force)
+
+    assert _rendered(render()) == sorted(FIGURES)
+    assert sorted(os.listdir(img_dir)) == sorted([*FIGURES.values(), "figures.json"])
+    assert render() == {name: "cached" for name in FIGURES}
+
+    # Only the figure whose inputs changed is drawn again
+    with open(metrics_path) as f:
+        metrics = json.load(f)
+    name = next(iter(metrics["feature_importance"]))
+    metrics["feature_importance"][name] += 1e-3
+    with open(metrics_path, "w") as f:
+        json.dump(metrics, f)
+    assert _rendered(render()) == ["feature_importance"]
+
+    # A new model hash invalidates every figure, and so does force
+    artifact = load_artifact(ARTIFACT_DIR)
+    save_artifact(tmp_path / "other", select_trees(artifact.forest, [0, 1]), tuple(artifact.scaler_params),
+                  artifact.mapping, artifact.features)
+    assert _rendered(render(str(tmp_path / "other"))) == sorted(FIGURES)
+    assert render(str(tmp_path / "other")) == {name: "cached" for name in FIGURES}
+    assert _rendered(render(str(tmp_path / "other"), force=True)) == sorted(FIGURES)
+
+    # A missing input is reported, not drawn
+    del metrics["feature_importance"]
+    with open(metrics_path, "w") as f:
+        json.dump(metrics, f)
+    assert render(str(tmp_path / "other"))["feature_importance"] == "missing inputs"
+
+
+def test_training_does_not_import_plotting_libraries(tmp_path):
+    code = _TRAINING_PROBE.format(modelling=MODELLING_DIR, data=DATASET_PATH, model=str(tmp_path / "model.pkl"),
+                                  metrics=str(tmp_path / "metrics.json"), img=str(tmp_path))
+    out = subprocess.run([sys.executable, "-c", code], cwd=str(tmp_path), capture_output=True, text=True, timeout=300)
+    assert out.returncode == 0, out.stderr
+    assert json.loads(out.stdout.strip().splitlines()[-1]) == []
+    assert (tmp_path / "metrics.json").exists()
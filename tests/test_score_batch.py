@@ -0,0 +1,60 @@
+import os
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import MODELLING_DIR, RAW_DATASET_PATH
+from score_batch import probability_column, score_file
+from src.logic import hitung_skor_kesejahteraan, tentukan_kategori
+
+ARTIFACT_DIR = os.path.join(MODELLING_DIR, "rf_model_kesejahteraan")
+MODEL_PATH = os.path.join(MODELLING_DIR, "rf_model_kesejahteraan.pkl")
+
+
+@pytest.fixture(scope="module")
+def scoring_input(tmp_path_factory):
+    """The raw dataset three times over, shuffled, with a row id and one row missing a feature."""
+    df = pd.read_csv(RAW_DATASET_PATH, encoding="utf-8-sig")
+    df = pd.concat([df] * 3, ignore_index=True).sample(frac=1, random_state=0).reset_index(drop=True)
+    df.insert(0, "row_id", np.arange(len(df)))
+    df.loc[17, "pdrb_total_adhk"] = np.nan
+    path = tmp_path_factory.mktemp("scoring") / "input.csv"
+    df.to_csv(path, index=False)
+    return str(path), df
+
+
+@pytest.mark.parametrize("workers,fmt", [(1, "csv"), (2, "csv"), (2, "parquet")])
+def test_score_file_matches_predict_proba_in_order(scoring_input, tmp_path, workers, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    path, df = scoring_input
+    output = str(tmp_path / f"scored.{fmt}")
+    summary = score_file(path, output, ARTIFACT_DIR, MODEL_PATH, chunk_rows=100, n_workers=workers,
+                         manual=True, keep_columns=["row_id"])
+    assert summary["rows"] == len(df) and summary["chunks"] == -(-len(df) // 100)
+    assert summary["rows_missing_features"] == 1
+    # round_trip: the fast CSV float parser can be off by one ulp
+    scored = pd.read_csv(output, float_precision="round_trip") if fmt == "csv" else pd.read_parquet(output)
+    np.testing.assert_array_equal(scored["row_id"], df["row_id"])
+
+    saved = joblib.load(MODEL_PATH)
+    features, model = saved["features"], saved["model"]
+    labels = [saved["mapping"][int(c)] for c in model.classes_]
+    complete = df[features].notna().all(axis=1).to_numpy()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)  # feature names vs the scaler's fit
+        expected = model.predict_proba(saved["scaler"].transform(df.loc[complete, features]))
+    proba = scored[[probability_column(label) for label in labels]].to_numpy()
+    np.testing.assert_array_equal(proba[complete], expected)
+    assert np.isnan(proba[~complete]).all() and scored["prediksi_rf"][~complete].isna().all()
+    assert scored["prediksi_rf"][complete].tolist() == [labels[i] for i in expected.argmax(axis=1)]
+
+    manual = [hitung_skor_kesejahteraan(*row)[0] for row in df[
+        ["jumlah_penduduk", "jumlah_penduduk_miskin", "jumlah_pengangguran_terbuka", "pdrb_total_adhk",
+         "harapan_lama_sekolah"]].itertuples(index=False)]
+    np.testing.assert_allclose(scored["skor_manual"], manual, rtol=1e-12)
+    valid = ~np.isnan(manual)
+    assert scored["kategori_manual"][valid].tolist() == [tentukan_kategori(s) for s in np.array(manual)[valid]]
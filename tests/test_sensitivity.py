@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DATASET_PATH
+from src.flat_forest import FlatForest
+from src.logic import LABEL_KATEGORI
+from src.sensitivity import INPUTS, SensitivitySweeper, model_matrix, sweep
+
+
+@pytest.fixture(scope="module")
+def labelled(trained):
+    model, scaler, _, X, _ = trained
+    labels = sorted(pd.read_csv(DATASET_PATH)["kesejahteraan"].unique())
+    return FlatForest.from_sklearn(model, scaler, feature_names=X.columns.tolist(), class_labels=labels)
+
+
+def _pointwise_classes(flat, base, axes):
+    """RF class per grid point, one forest row per point."""
+    (x_key, x), (y_key, y) = axes
+    columns = dict(base, **{x_key: np.tile(x, len(y)), y_key: np.repeat(y, len(x))})
+    grid = {k: np.broadcast_to(np.asarray(columns[k], dtype=np.float64), (x.size * y.size,)) for k in INPUTS}
+    proba = flat.predict_proba(model_matrix(grid, flat.feature_names))
+    return np.array([list(LABEL_KATEGORI).index(flat.class_labels[i]) for i in proba.argmax(axis=1)]), proba
+
+
+def test_sensitivity_sweep_matches_pointwise_predictions(labelled):
+    flat = labelled
+    base = {"P": 1e6, "M": 8e4, "U": 5e4, "Y": 1.2e11, "S": 3}
+    x, y = np.linspace(0, 4e5, 60), np.linspace(0, 5e11, 40)
+    result = sweep(base, [("M", x), ("Y", y)], flat)
+
+    expected, proba = _pointwise_classes(flat, base, [("M", x), ("Y", y)])
+    np.testing.assert_array_equal(result["kelas_rf"].ravel(), expected)
+    np.testing.assert_array_equal(result["probabilitas_rf"].ravel(), proba.max(axis=1))
+    assert result["titik_rf"] < x.size * y.size and result["skor"].shape == (len(y), len(x))
+
+
+def test_education_score_is_swept_over_its_levels_only(labelled):
+    flat = labelled
+    base = {"P": 1e6, "M": 8e4, "U": 5e4, "Y": 1.2e11, "S": 3}
+    sweeper = SensitivitySweeper(flat)
+    result = sweeper.sweep(base, [("M", None), ("S", None)], resolution=50)
+    np.testing.assert_array_equal(result["y"], [1, 2, 3, 4])
+    assert result["skor"].shape == (4, 50)
+    expected, _ = _pointwise_classes(flat, base, [("M", result["x"]), ("S", result["y"])])
+    np.testing.assert_array_equal(result["kelas_rf"].ravel(), expected)
+
+    # A custom range keeps the levels inside it; the resolution does not apply
+    np.testing.assert_array_equal(sweeper.sweep(base, [("S", (1.5, 3.2))], resolution=200)["x"], [2, 3])
+    with pytest.raises(ValueError):
+        sweep(base, [("S", np.linspace(1, 4, 7))], flat)
@@ -0,0 +1,155 @@
+import json
+import math
+import os
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+from conftest import MODELLING_DIR
+from src.serving import DEFAULT_BUCKETS, CachedPredictor, LatencyHistogram, MicroBatcher
+
+
+def test_histogram_quantiles_are_bucket_upper_bounds():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1e3)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100 and math.isclose(snapshot["mean_ms"], 50.5)
+    assert math.isclose(snapshot["max_ms"], 100.0)
+    # Buckets grow by sqrt(2): the estimate is at most that much above the true quantile
+    for name, true_ms in (("p50_ms", 50), ("p90_ms", 90), ("p99_ms", 99)):
+        assert true_ms <= snapshot[name] < true_ms * math.sqrt(2) + 1e-9, (name, snapshot[name])
+        assert snapshot[name] / 1e3 in DEFAULT_BUCKETS
+    assert sum(b["count"] for b in snapshot["buckets"]) == 100
+
+    # Above the last bucket: the overflow bucket reports the largest value seen
+    histogram.record(1e3)
+    assert histogram.snapshot()["buckets"][-1] == {"le_ms": None, "count": 1}
+    assert LatencyHistogram().snapshot()["p99_ms"] == 0.0
+
+
+def test_micro_batcher_merges_concurrent_requests():
+    sizes = []
+    release = threading.Event()
+
+    def predict_batch(instances):
+        release.wait(5)
+        sizes.append(len(instances))
+        return [x * 10 for x in instances]
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=8, max_wait_ms=50)
+    results = {}
+
+    def client(i):
+        results[i] = batcher.submit([i, i + 100]).result(timeout=10)
+
+    # The first batch blocks in the model; the other requests queue up behind it
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(12)]
+    for t in threads:
+        t.start()
+        time.sleep(0.002)
+    release.set()
+    for t in threads:
+        t.join(10)
+
+    # Each request gets its own slice back, and batches respect the size limit
+    assert results == {i: [i * 10, (i + 100) * 10] for i in range(12)}
+    assert sum(sizes) == 24 and max(sizes) <= 8 and len(sizes) < 12
+    stats = batcher.stats()
+    assert stats["batches"] == len(sizes) and stats["instances"] == 24
+    assert stats["model_latency"]["count"] == len(sizes)
+    batcher.close(5)
+
+
+def test_micro_batcher_flushes_partial_batch_after_max_wait():
+    batcher = MicroBatcher(lambda instances: [len(instances)] * len(instances), max_batch_size=64, max_wait_ms=30)
+    start = time.perf_counter()
+    assert batcher.submit(["a"]).result(timeout=5) == [1]
+    assert 0.025 <= time.perf_counter() - start < 2
+
+    # A failing model call fails every request of that batch, not the batcher
+    def failing(instances):
+        raise ValueError("boom")
+
+    batcher.predict_batch = failing
+    future = batcher.submit(["b"])
+    assert isinstance(future.exception(timeout=5), ValueError)
+    batcher.predict_batch = lambda instances: instances
+    assert batcher.submit(["c"]).result(timeout=5) == ["c"]
+    batcher.close(5)
+
+
+def test_cached_predictor_hits_misses_and_evicts_least_recent(trained):
+    _, _, flat, _, X_test = trained
+    expected = flat.predict_proba(X_test.iloc[:3].to_numpy())
+    labels = [f"class {i}" for i in range(expected.shape[1])]
+    calls = []
+
+    class CountingForest:
+        feature_names, class_labels = flat.feature_names, labels
+
+        def predict_proba(self, X):
+            calls.append(X.copy())
+            return flat.predict_proba(X)
+
+    cached = CachedPredictor(CountingForest(), maxsize=2)
+    a, b, c = (X_test.iloc[i].tolist() for i in range(3))
+
+    np.testing.assert_array_equal(cached.predict_proba(a), expected[0])
+    # numpy scalars normalize to the same key as Python floats
+    np.testing.assert_array_equal(cached.predict_proba(np.array(a)), expected[0])
+    assert cached.stats()["hits"] == 1 and len(calls) == 1
+    proba = cached.predict_proba(a)
+    assert not proba.flags.writeable
+
+    cached.predict_proba(b)  # cache: a, b
+    cached.predict_proba(a)  # a is now the most recent
+    cached.predict_proba(c)  # evicts b, not a
+    assert cached.stats() == {"hits": 3, "misses": 3, "evictions": 1, "size": 2, "maxsize": 2, "hit_rate": 0.5}
+    cached.predict_proba(a)
+    cached.predict_proba(b)
+    assert len(calls) == 4 and cached.stats()["evictions"] == 2
+
+    label, probabilities = cached.predict(c)
+    assert probabilities == dict(zip(labels, expected[2].tolist()))
+    assert label == labels[int(np.argmax(expected[2]))]
+
+
+def test_service_endpoints_report_latency():
+    from serve import PredictionServer, PredictionService, make_handler
+
+    service = PredictionService(os.path.join(MODELLING_DIR, "rf_model_kesejahteraan"),
+                                os.path.join(MODELLING_DIR, "rf_model_kesejahteraan.pkl"))
+    batcher = MicroBatcher(service.predict_batch, max_batch_size=16, max_wait_ms=1)
+    request_latency = LatencyHistogram()
+    server = PredictionServer(("127.0.0.1", 0), make_handler(service, batcher, request_latency, 10))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def call(path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode()
+        with urllib.request.urlopen(urllib.request.Request(url + path, data=data), timeout=10) as response:
+            return json.loads(response.read())
+
+    try:
+        instance = {"jumlah_penduduk": 1e6, "jumlah_penduduk_miskin": 8e4, "jumlah_pengangguran_terbuka": 5e4,
+                    "pdrb_total_adhk": 1.2e11, "harapan_lama_sekolah": 3}
+        single = call("/predict", instance)
+        many = call("/predict", {"instances": [instance] * 3})["predictions"]
+        assert many == [single] * 3
+        proba = service.forest.predict_proba(np.array([[instance[f] for f in service.features]]))[0]
+        assert single["probabilitas_rf"] == dict(zip(service.labels, proba.tolist()))
+
+        # The request latency is recorded just after the response is written
+        deadline = time.monotonic() + 5
+        while (latency := call("/metrics/latency"))["request_latency"]["count"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert latency["request_latency"]["count"] == 2
+        assert latency["batching"]["instances"] == 4
+        assert latency["batching"]["model_latency"]["p99_ms"] > 0
+    finally:
+        server.shutdown()
+        server.server_close()
+        batcher.close(5)
@@ -0,0 +1,71 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import APP_DIR
+
+HEAVY_MODULES = ("pandas", "numpy", "sklearn", "joblib", "plotly.graph_objects", "pyarrow")
+
+# Each probe runs in a fresh interpreter so sys.modules reflects only what the
+# page itself pulled in; modules streamlit already imports are subtracted
+_PAGE_PROBE = """
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+import streamlit
+from streamlit.testing.v1 import AppTest
+heavy = {heavy!r}
+baseline = {{m for m in heavy if m in sys.modules}}
+at = AppTest.from_file("app.py", default_timeout=120)
+start = time.perf_counter()
+at.run()
+if {page} is not None:
+    radio = at.sidebar.radio[0]
+    radio.set_value(radio.options[{page}]).run()
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "errors": [str(e.value) for e in at.exception],
+    "loaded": sorted(m for m in heavy if m in sys.modules and m not in baseline),
+}}))
+"""
+
+_IMPORT_PROBE = """
+import json, sys, time
+import streamlit
+start = time.perf_counter()
+import src.registry, views.home, views.prediction, views.dataset, views.evaluation, views.drift, views.about
+app_imports = time.perf_counter() - start
+start = time.perf_counter()
+import pandas
+print(json.dumps({"app_imports": app_imports, "pandas": time.perf_counter() - start}))
+"""
+
+
+def _run(code):
+    out = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, capture_output=True, text=True, timeout=300)
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("page, allowed", [
+    (None, ()),  # Home, the first paint
+    (1, ("numpy",)),  # Prediksi: manual formula only
+    (5, ()),  # About
+])
+def test_light_pages_do_not_import_heavy_modules(page, allowed):
+    result = _run(_PAGE_PROBE.format(heavy=HEAVY_MODULES, page=page))
+    assert result["errors"] == []
+    assert set(result["loaded"]) <= set(allowed), result["loaded"]
+
+
+def test_dataset_is_loaded_on_demand():
+    result = _run(_PAGE_PROBE.format(heavy=HEAVY_MODULES, page=2))
+    assert result["errors"] == []
+    assert "pandas" in result["loaded"]
+
+
+def test_importing_every_view_is_cheaper_than_pandas():
+    # Relative bound: independent of how fast the machine is
+    result = _run(_IMPORT_PROBE)
+    assert result["app_imports"] < 0.5 * result["pandas"], result
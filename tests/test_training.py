@@ -0,0 +1,138 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DATASET_PATH
+from src.panel import REGION, YEAR
+from train_rf_model import PERMUTATION_CACHE_DIR, RandomForestAnalyzer, time_folds
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    """Analyzer on the committed dataset and panel; every output goes to tmp_path."""
+    return RandomForestAnalyzer(
+        data_path=DATASET_PATH,
+        model_save_path=str(tmp_path / "model.pkl"),
+        metrics_save_path=str(tmp_path / "metrics.json"),
+        img_dir=str(tmp_path),
+    )
+
+
+def _check_partition(folds):
+    tested = np.concatenate([test for _, test in folds])
+    assert np.array_equal(np.sort(tested), np.unique(tested))
+    for train, test in folds:
+        assert len(np.intersect1d(train, test)) == 0
+    return tested
+
+
+def test_region_folds_never_share_a_region(analyzer):
+    X, y = analyzer.load_data()
+    folds = analyzer.cv_folds(X, y, scheme="region", n_folds=5)
+    tested = _check_partition(folds)
+    assert len(tested) == len(X)
+
+    regions = analyzer.panel.aligned(REGION)
+    for train, test in folds:
+        assert not set(regions[train]) & set(regions[test])
+    # Every region is held out exactly once, with all of its years
+    held_out = [set(regions[test]) for _, test in folds]
+    assert sum(len(s) for s in held_out) == len(set(regions))
+
+    # The second call reads the same folds back from the on-disk cache
+    cached = analyzer.cv_folds(X, y, scheme="region", n_folds=5)
+    for (train, test), (train_c, test_c) in zip(folds, cached):
+        assert np.array_equal(train, train_c) and np.array_equal(test, test_c)
+
+
+def test_time_folds_only_train_on_the_past(analyzer):
+    X, y = analyzer.load_data()
+    folds = analyzer.cv_folds(X, y, scheme="time", n_folds=3)
+    _check_partition(folds)
+    years = analyzer.panel.aligned(YEAR)
+    seen_test = set()
+    for train, test in folds:
+        assert years[train].max() < years[test].min()
+        assert not seen_test & set(years[test])
+        seen_test |= set(years[test])
+    # Every year after the first block is tested once
+    assert seen_test == set(np.unique(years)[-len(seen_test):])
+
+    with pytest.raises(ValueError):
+        time_folds(np.array([2020, 2021, 2022]), 3)
+
+
+def test_region_hold_out_split(analyzer):
+    analyzer.split = "region"
+    _, y = analyzer.load_data()
+    train, test = analyzer.split_indices(y)
+    regions = analyzer.panel.aligned(REGION)
+    assert not set(regions[train]) & set(regions[test])
+    assert len(train) + len(test) == len(y)
+    assert np.array_equal(analyzer.groups_train, regions[train])
+
+
+@pytest.mark.parametrize("split", ["stratified", "region"])
+def test_chunked_loader_matches_in_memory_loader(analyzer, split):
+    from sklearn.preprocessing import StandardScaler
+
+    analyzer.split = split
+    X_train, X_test, y_train, y_test, features = analyzer.load_and_prepare_data()
+    scaler = StandardScaler().fit(X_train)
+    mapping = analyzer.mapping
+
+    for chunk_rows in (37, 1 << 20):  # blocks that straddle the split, and a single block
+        analyzer.panel = None
+        Xc_train, Xc_test, yc_train, yc_test, features_c = analyzer.load_and_prepare_data_chunked(chunk_rows)
+        assert features_c == features and analyzer.mapping == mapping
+        # Same rows on each side of the split, in the same order
+        np.testing.assert_array_equal(yc_train, y_train)
+        np.testing.assert_array_equal(yc_test, y_test)
+        np.testing.assert_array_equal(Xc_test, X_test.to_numpy(dtype=np.float32))
+        # partial_fit over the blocks gives the scaler a full fit would
+        np.testing.assert_allclose(analyzer.scaler.mean_, scaler.mean_, rtol=1e-12)
+        np.testing.assert_allclose(analyzer.scaler.scale_, scaler.scale_, rtol=1e-12)
+        assert analyzer.scaler.n_samples_seen_ == len(X_train)
+        np.testing.assert_allclose(Xc_train, scaler.transform(X_train), rtol=1e-6, atol=1e-6)
+
+
+def test_permutation_importance_matches_sklearn(analyzer, trained):
+    from sklearn.inspection import permutation_importance
+    from sklearn.pipeline import make_pipeline
+
+    model, scaler, _, _, X_test_fixture = trained
+    _, X_test, _, y_test, features = analyzer.load_and_prepare_data()
+    assert X_test.index.equals(X_test_fixture.index)
+    analyzer.model, analyzer.scaler = model, scaler
+    pipeline = make_pipeline(scaler, model)
+    X = X_test.to_numpy(dtype=np.float64)
+
+    result = analyzer.permutation_importance(X_test, y_test, features, n_repeats=30, n_workers=1, random_state=7)
+    assert result["baseline"] == pipeline.score(X_test, y_test)
+
+    # Same shuffles through the sklearn pipeline: identical drops
+    for j, name in enumerate(features):
+        drops = []
+        for r in range(30):
+            shuffled = X.copy()
+            shuffled[:, j] = X[np.random.default_rng([7, j, r]).permutation(len(X)), j]
+            drops.append(result["baseline"] - pipeline.score(pd.DataFrame(shuffled, columns=features), y_test))
+        assert np.isclose(result["features"][name]["mean"], np.mean(drops), rtol=0, atol=1e-12)
+        assert np.isclose(result["features"][name]["std"], np.std(drops, ddof=1), rtol=0, atol=1e-12)
+
+    # sklearn's own shuffles: the means agree within sampling error
+    reference = permutation_importance(pipeline, X_test, y_test, scoring="accuracy", n_repeats=30, random_state=0)
+    for j, name in enumerate(features):
+        ours = result["features"][name]
+        error = np.hypot(ours["std"], reference.importances_std[j]) / np.sqrt(30)
+        assert abs(ours["mean"] - reference.importances_mean[j]) <= 4 * error + 1e-12, name
+
+    # Parallel jobs give the same numbers, and the second call comes from the on-disk cache
+    shutil.rmtree(os.path.join(os.path.dirname(analyzer.metrics_save_path), PERMUTATION_CACHE_DIR))
+    parallel = analyzer.permutation_importance(X_test, y_test, features, n_repeats=30, n_workers=2, random_state=7)
+    assert parallel["workers"] == 2 and parallel["features"] == result["features"]
+    cached = analyzer.permutation_importance(X_test, y_test, features, n_repeats=30, n_workers=1, random_state=7)
+    assert cached == parallel